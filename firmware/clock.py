@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+StudyStreak Clock Abstraction
+=============================
+
+This module provides the time source used by every StudyStreak component.
+Components receive a clock object instead of calling utime/time directly, so
+the same code can run against the real hardware clock or a virtual clock.
+
+SystemClock wraps utime on MicroPython and falls back to the standard time
+module on a host. VirtualClock keeps its own time and advances instantly when
+something sleeps, so a full day of Pomodoro sessions can be simulated on a
+Linux host in milliseconds.
+
+Both clocks expose the MicroPython ticks API (ticks_ms, ticks_us, ticks_add,
+ticks_diff) with the same wrap-around behaviour as the ESP32 port.
+
+Author: StudyStreak Project
+Environment: MicroPython for ESP32 / CPython host
+"""
+
+try:
+    import utime
+except ImportError:
+    utime = None
+
+import time
+
+# Tick counters wrap at 2**30 on MicroPython ports
+TICKS_PERIOD = 1 << 30
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALFPERIOD = TICKS_PERIOD // 2
+
+
+def _ticks_add(ticks, delta):
+    """Add delta to a wrapping tick value."""
+    return (ticks + delta) & TICKS_MAX
+
+
+def _ticks_diff(ticks1, ticks2):
+    """Signed difference ticks1 - ticks2 between two wrapping tick values."""
+    diff = (ticks1 - ticks2) & TICKS_MAX
+    if diff >= TICKS_HALFPERIOD:
+        diff -= TICKS_PERIOD
+    return diff
+
+
+class SystemClock:
+    """
+    Clock backed by the real hardware or host time source.
+    """
+
+    def ticks_ms(self):
+        """
+        Returns:
+            int: Wrapping millisecond tick counter
+        """
+        if utime is not None:
+            return utime.ticks_ms()
+        return int(time.monotonic() * 1000) & TICKS_MAX
+
+    def ticks_us(self):
+        """
+        Returns:
+            int: Wrapping microsecond tick counter
+        """
+        if utime is not None:
+            return utime.ticks_us()
+        return int(time.monotonic() * 1000000) & TICKS_MAX
+
+    def ticks_add(self, ticks, delta):
+        """
+        Args:
+            ticks (int): Tick value
+            delta (int): Offset to add (may be negative)
+
+        Returns:
+            int: Wrapped tick value
+        """
+        if utime is not None:
+            return utime.ticks_add(ticks, delta)
+        return _ticks_add(ticks, delta)
+
+    def ticks_diff(self, ticks1, ticks2):
+        """
+        Args:
+            ticks1 (int): Later tick value
+            ticks2 (int): Earlier tick value
+
+        Returns:
+            int: Signed difference ticks1 - ticks2
+        """
+        if utime is not None:
+            return utime.ticks_diff(ticks1, ticks2)
+        return _ticks_diff(ticks1, ticks2)
+
+    def sleep_ms(self, ms):
+        """
+        Block for ms milliseconds.
+
+        Args:
+            ms (int): Milliseconds to sleep
+        """
+        if utime is not None:
+            utime.sleep_ms(ms)
+        else:
+            time.sleep(ms / 1000)
+
+    def sleep_us(self, us):
+        """
+        Block for us microseconds.
+
+        Args:
+            us (int): Microseconds to sleep
+        """
+        if utime is not None:
+            utime.sleep_us(us)
+        else:
+            time.sleep(us / 1000000)
+
+    def sleep(self, seconds):
+        """
+        Block for a number of seconds.
+
+        Args:
+            seconds (float): Seconds to sleep
+        """
+        self.sleep_ms(int(seconds * 1000))
+
+    def time(self):
+        """
+        Returns:
+            int: Wall-clock time in seconds since the epoch
+        """
+        return int(time.time())
+
+
+class VirtualClock:
+    """
+    Simulated clock for host-side testing.
+
+    Time only moves when advance() or one of the sleep methods is called, and
+    sleeping returns immediately after advancing the virtual time.
+    """
+
+    def __init__(self, start_ms=0, epoch_seconds=0):
+        """
+        Initialize the virtual clock.
+
+        Args:
+            start_ms (int): Initial millisecond tick value
+            epoch_seconds (int): Wall-clock time corresponding to start_ms
+        """
+        self._now_us = start_ms * 1000
+        self._start_us = self._now_us
+        self.epoch_seconds = epoch_seconds
+        self.sleep_count = 0
+
+    def ticks_ms(self):
+        """
+        Returns:
+            int: Wrapping millisecond tick counter
+        """
+        return (self._now_us // 1000) & TICKS_MAX
+
+    def ticks_us(self):
+        """
+        Returns:
+            int: Wrapping microsecond tick counter
+        """
+        return self._now_us & TICKS_MAX
+
+    def ticks_add(self, ticks, delta):
+        """
+        Args:
+            ticks (int): Tick value
+            delta (int): Offset to add (may be negative)
+
+        Returns:
+            int: Wrapped tick value
+        """
+        return _ticks_add(ticks, delta)
+
+    def ticks_diff(self, ticks1, ticks2):
+        """
+        Args:
+            ticks1 (int): Later tick value
+            ticks2 (int): Earlier tick value
+
+        Returns:
+            int: Signed difference ticks1 - ticks2
+        """
+        return _ticks_diff(ticks1, ticks2)
+
+    def advance_us(self, us):
+        """
+        Move virtual time forward.
+
+        Args:
+            us (int): Microseconds to advance
+        """
+        if us > 0:
+            self._now_us += us
+
+    def advance(self, ms):
+        """
+        Move virtual time forward.
+
+        Args:
+            ms (int): Milliseconds to advance
+        """
+        self.advance_us(int(ms * 1000))
+
+    def sleep_ms(self, ms):
+        """
+        Advance virtual time by ms milliseconds and return immediately.
+
+        Args:
+            ms (int): Milliseconds to sleep
+        """
+        self.sleep_count += 1
+        self.advance(ms)
+
+    def sleep_us(self, us):
+        """
+        Advance virtual time by us microseconds and return immediately.
+
+        Args:
+            us (int): Microseconds to sleep
+        """
+        self.sleep_count += 1
+        self.advance_us(us)
+
+    def sleep(self, seconds):
+        """
+        Advance virtual time by a number of seconds and return immediately.
+
+        Args:
+            seconds (float): Seconds to sleep
+        """
+        self.sleep_ms(int(seconds * 1000))
+
+    def time(self):
+        """
+        Returns:
+            int: Simulated wall-clock time in seconds since the epoch
+        """
+        return self.epoch_seconds + (self._now_us - self._start_us) // 1000000
+
+    def elapsed_ms(self):
+        """
+        Returns:
+            int: Virtual milliseconds elapsed since the clock was created
+        """
+        return (self._now_us - self._start_us) // 1000
+
+
+# Shared default clock used when a component is not given one explicitly
+system_clock = SystemClock()
+
+
+# Example usage (commented out for module import)
+"""
+# Example of simulating a full day of sessions on a host
+
+from clock import VirtualClock
+from main_controller import StudyStreakController
+
+clock = VirtualClock()
+controller = StudyStreakController(clock=clock)
+controller.pomodoro_timer.start_work()
+
+# Runs 24 virtual hours; every sleep advances the virtual clock instantly
+controller.scheduler.run(duration_ms=24 * 60 * 60 * 1000)
+print("Simulated", clock.elapsed_ms() // 1000, "seconds")
+"""
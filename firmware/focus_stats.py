@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Streak and Focus Analytics for StudyStreak ESP32 Project
+========================================================
+
+This module turns the session events reported by PomodoroTimer (and the
+away-time reported by the controller) into running statistics:
+
+- focused time, completed work sessions, pauses and away-time for the
+  current day and the current week (Monday to Sunday)
+- the current and longest streak of consecutive days on which the daily
+  goal of completed work sessions was reached
+
+Each event updates the aggregates in O(1); rolling into a new day or week
+just clears the corresponding counters. Nothing is rescanned while running.
+
+The session log holds the same events, so rebuild() regenerates every
+aggregate offline from the raw records, e.g. after a reboot. History that
+has been rotated out of the log is not counted.
+
+Author: StudyStreak Project
+Environment: MicroPython for ESP32
+"""
+
+from pomodoro_logic import (STATE_WORK, EVENT_PAUSE, EVENT_PHASE_COMPLETE,
+                            EVENT_RESET, EVENT_AWAY, EVENT_ABANDON)
+
+SECONDS_PER_DAY = 86400
+
+# Completed work sessions per day that keep the streak going
+DEFAULT_DAILY_GOAL = 1
+
+# Aggregate fields
+FOCUS_MS = 0
+CYCLES = 1
+PAUSES = 2
+AWAY_MS = 3
+_FIELD_COUNT = 4
+
+
+class FocusStats:
+    """
+    Incremental daily/weekly focus aggregates and streak tracking.
+    """
+
+    def __init__(self, daily_goal=DEFAULT_DAILY_GOAL, utc_offset_s=0):
+        """
+        Initialize empty statistics.
+
+        Args:
+            daily_goal (int): Completed work sessions per day that count
+                              towards the streak
+            utc_offset_s (int): Local time offset, so days start at local midnight
+        """
+        self.daily_goal = max(1, daily_goal)
+        self.utc_offset_s = utc_offset_s
+        self.today = [0] * _FIELD_COUNT
+        self.this_week = [0] * _FIELD_COUNT
+        self.reset()
+
+    def reset(self):
+        """
+        Clear every aggregate and the streak.
+        """
+        for index in range(_FIELD_COUNT):
+            self.today[index] = 0
+            self.this_week[index] = 0
+        self.day = None
+        self.week = None
+        self.current_streak = 0
+        self.longest_streak = 0
+        self.last_goal_day = None
+        self.events_processed = 0
+
+    def day_number(self, timestamp):
+        """
+        Args:
+            timestamp (int): Wall-clock seconds
+
+        Returns:
+            int: Local day number since the epoch
+        """
+        return (timestamp + self.utc_offset_s) // SECONDS_PER_DAY
+
+    def _roll(self, timestamp):
+        """
+        Start new day/week buckets when timestamp is past the current ones.
+
+        Returns:
+            int: Day number the event is counted on
+        """
+        day = self.day_number(timestamp)
+        if self.day is not None and day <= self.day:
+            # Same day, or the clock stepped back: keep the current buckets
+            return self.day
+
+        self.day = day
+        for index in range(_FIELD_COUNT):
+            self.today[index] = 0
+
+        # Day 0 (1970-01-01) was a Thursday; weeks start on Monday
+        week = (day + 3) // 7
+        if week != self.week:
+            self.week = week
+            for index in range(_FIELD_COUNT):
+                self.this_week[index] = 0
+        return day
+
+    def _add(self, field, amount):
+        self.today[field] += amount
+        self.this_week[field] += amount
+
+    def on_event(self, event, state, timestamp, value_ms):
+        """
+        Fold one session event into the aggregates. Same signature as a
+        PomodoroTimer listener.
+
+        Args:
+            event (int): EVENT_* constant
+            state (int): Phase the event refers to
+            timestamp (int): Wall-clock seconds
+            value_ms (int): Event-specific duration in milliseconds
+        """
+        day = self._roll(timestamp)
+        self.events_processed += 1
+
+        if event == EVENT_PHASE_COMPLETE:
+            if state == STATE_WORK:
+                self._add(FOCUS_MS, value_ms)
+                self._add(CYCLES, 1)
+                if self.today[CYCLES] == self.daily_goal:
+                    self._reach_goal(day)
+        elif event == EVENT_RESET or event == EVENT_ABANDON:
+            # Time focused in an abandoned work session still counts
+            if state == STATE_WORK:
+                self._add(FOCUS_MS, value_ms)
+        elif event == EVENT_PAUSE:
+            self._add(PAUSES, 1)
+        elif event == EVENT_AWAY:
+            self._add(AWAY_MS, value_ms)
+
+    def _reach_goal(self, day):
+        """
+        Extend or restart the streak on the first day the goal is reached.
+        """
+        if self.last_goal_day == day:
+            return
+        if self.last_goal_day == day - 1:
+            self.current_streak += 1
+        else:
+            self.current_streak = 1
+        self.last_goal_day = day
+        if self.current_streak > self.longest_streak:
+            self.longest_streak = self.current_streak
+
+    def get_current_streak(self, now):
+        """
+        Args:
+            now (int): Current wall-clock seconds
+
+        Returns:
+            int: Days in the current streak; still alive today if the goal
+                 was reached yesterday, 0 once a whole day was missed
+        """
+        if self.last_goal_day is None:
+            return 0
+        if self.last_goal_day < self.day_number(now) - 1:
+            return 0
+        return self.current_streak
+
+    def rebuild(self, records):
+        """
+        Regenerate every aggregate from raw session log records.
+
+        Args:
+            records (iterable): (seq, timestamp, event, state, session_count, value_ms)
+                                tuples, oldest first, e.g. SessionLog.iter_records()
+
+        Returns:
+            int: Number of records processed
+        """
+        self.reset()
+        for record in records:
+            self.on_event(record[2], record[3], record[1], record[5])
+        return self.events_processed
+
+    def get_summary(self, now):
+        """
+        Get the statistics in display units.
+
+        Args:
+            now (int): Current wall-clock seconds
+
+        Returns:
+            dict: Daily and weekly aggregates (minutes, counts) and streaks
+        """
+        # Buckets older than today read as empty until the next event rolls them
+        day = self.day_number(now)
+        today = self.today if self.day == day else [0] * _FIELD_COUNT
+        week = self.this_week if self.week == (day + 3) // 7 else [0] * _FIELD_COUNT
+        return {
+            'today_focus_min': today[FOCUS_MS] // 60000,
+            'today_cycles': today[CYCLES],
+            'today_pauses': today[PAUSES],
+            'today_away_min': today[AWAY_MS] // 60000,
+            'week_focus_min': week[FOCUS_MS] // 60000,
+            'week_cycles': week[CYCLES],
+            'week_pauses': week[PAUSES],
+            'week_away_min': week[AWAY_MS] // 60000,
+            'current_streak': self.get_current_streak(now),
+            'longest_streak': self.longest_streak
+        }
+
+
+# Example usage (commented out for module import)
+"""
+# Example of live statistics plus a rebuild from the session log
+
+from pomodoro_logic import PomodoroTimer
+from session_log import SessionLog
+
+timer = PomodoroTimer(work_mins=25, break_mins=5)
+history = SessionLog("sessions.log")
+stats = FocusStats(daily_goal=4)
+
+stats.rebuild(history.iter_records())
+timer.add_listener(stats.on_event)
+
+summary = stats.get_summary(timer.clock.time())
+print("Streak:", summary['current_streak'], "days,", summary['today_focus_min'], "min today")
+"""
@@ -0,0 +1,729 @@
+# -*- coding: utf-8 -*-
+"""
+Monochrome Framebuffer for StudyStreak ESP32 Project
+====================================================
+
+This module provides a 1-bit-per-pixel framebuffer in the exact memory layout
+the SSD1306 controller consumes: the screen is split into 8-pixel-high pages,
+each page is `width` bytes, and bit n of a byte is pixel row n of that page
+(LSB at the top). A 128x64 screen is therefore a 1024-byte bytearray.
+
+Drawing primitives (pixels, lines, rectangles, 5x7 text and page-ordered
+bitmaps) write straight into that buffer. A sink pushes the buffer out:
+
+- SSD1306I2CSink sends it to the real display over I2C
+- HeadlessSink keeps the last frame in memory and can dump it as PBM/PNG,
+  so rendering can be asserted pixel-for-pixel on a host without the board
+
+Every drawing primitive records the column range it touched on each page.
+Sinks compare those dirty windows against the last frame they sent, trim
+unchanged columns, and transfer only the windows that really changed using
+the SSD1306 column/page addressing commands. When only the countdown digits
+and progress bar change, a refresh moves a few dozen bytes instead of 1 KB.
+
+Both sinks count frames and bytes sent, which makes render cost measurable.
+
+Author: StudyStreak Project
+Version: 1.0
+"""
+
+# Text cell size: 5x7 glyphs plus one column of spacing and one row of leading
+CHAR_WIDTH = 6
+CHAR_HEIGHT = 8
+
+# Identifies the built-in font, e.g. in layout cache keys
+FONT_NAME = "5x7"
+
+# Classic 5x7 font for ASCII 0x20-0x7E, 5 column bytes per glyph (LSB = top row)
+FONT_5X7 = (
+    b'\x00\x00\x00\x00\x00'  # ' '
+    b'\x00\x00\x5f\x00\x00'  # '!'
+    b'\x00\x07\x00\x07\x00'  # '"'
+    b'\x14\x7f\x14\x7f\x14'  # '#'
+    b'\x24\x2a\x7f\x2a\x12'  # '$'
+    b'\x23\x13\x08\x64\x62'  # '%'
+    b'\x36\x49\x55\x22\x50'  # '&'
+    b'\x00\x05\x03\x00\x00'  # "'"
+    b'\x00\x1c\x22\x41\x00'  # '('
+    b'\x00\x41\x22\x1c\x00'  # ')'
+    b'\x08\x2a\x1c\x2a\x08'  # '*'
+    b'\x08\x08\x3e\x08\x08'  # '+'
+    b'\x00\x50\x30\x00\x00'  # ','
+    b'\x08\x08\x08\x08\x08'  # '-'
+    b'\x00\x60\x60\x00\x00'  # '.'
+    b'\x20\x10\x08\x04\x02'  # '/'
+    b'\x3e\x51\x49\x45\x3e'  # '0'
+    b'\x00\x42\x7f\x40\x00'  # '1'
+    b'\x42\x61\x51\x49\x46'  # '2'
+    b'\x21\x41\x45\x4b\x31'  # '3'
+    b'\x18\x14\x12\x7f\x10'  # '4'
+    b'\x27\x45\x45\x45\x39'  # '5'
+    b'\x3c\x4a\x49\x49\x30'  # '6'
+    b'\x01\x71\x09\x05\x03'  # '7'
+    b'\x36\x49\x49\x49\x36'  # '8'
+    b'\x06\x49\x49\x29\x1e'  # '9'
+    b'\x00\x36\x36\x00\x00'  # ':'
+    b'\x00\x56\x36\x00\x00'  # ';'
+    b'\x08\x14\x22\x41\x00'  # '<'
+    b'\x14\x14\x14\x14\x14'  # '='
+    b'\x00\x41\x22\x14\x08'  # '>'
+    b'\x02\x01\x51\x09\x06'  # '?'
+    b'\x32\x49\x79\x41\x3e'  # '@'
+    b'\x7e\x11\x11\x11\x7e'  # 'A'
+    b'\x7f\x49\x49\x49\x36'  # 'B'
+    b'\x3e\x41\x41\x41\x22'  # 'C'
+    b'\x7f\x41\x41\x22\x1c'  # 'D'
+    b'\x7f\x49\x49\x49\x41'  # 'E'
+    b'\x7f\x09\x09\x09\x01'  # 'F'
+    b'\x3e\x41\x49\x49\x7a'  # 'G'
+    b'\x7f\x08\x08\x08\x7f'  # 'H'
+    b'\x00\x41\x7f\x41\x00'  # 'I'
+    b'\x20\x40\x41\x3f\x01'  # 'J'
+    b'\x7f\x08\x14\x22\x41'  # 'K'
+    b'\x7f\x40\x40\x40\x40'  # 'L'
+    b'\x7f\x02\x0c\x02\x7f'  # 'M'
+    b'\x7f\x04\x08\x10\x7f'  # 'N'
+    b'\x3e\x41\x41\x41\x3e'  # 'O'
+    b'\x7f\x09\x09\x09\x06'  # 'P'
+    b'\x3e\x41\x51\x21\x5e'  # 'Q'
+    b'\x7f\x09\x19\x29\x46'  # 'R'
+    b'\x46\x49\x49\x49\x31'  # 'S'
+    b'\x01\x01\x7f\x01\x01'  # 'T'
+    b'\x3f\x40\x40\x40\x3f'  # 'U'
+    b'\x1f\x20\x40\x20\x1f'  # 'V'
+    b'\x3f\x40\x38\x40\x3f'  # 'W'
+    b'\x63\x14\x08\x14\x63'  # 'X'
+    b'\x07\x08\x70\x08\x07'  # 'Y'
+    b'\x61\x51\x49\x45\x43'  # 'Z'
+    b'\x00\x7f\x41\x41\x00'  # '['
+    b'\x02\x04\x08\x10\x20'  # '\\'
+    b'\x00\x41\x41\x7f\x00'  # ']'
+    b'\x04\x02\x01\x02\x04'  # '^'
+    b'\x40\x40\x40\x40\x40'  # '_'
+    b'\x00\x01\x02\x04\x00'  # '`'
+    b'\x20\x54\x54\x54\x78'  # 'a'
+    b'\x7f\x48\x44\x44\x38'  # 'b'
+    b'\x38\x44\x44\x44\x20'  # 'c'
+    b'\x38\x44\x44\x48\x7f'  # 'd'
+    b'\x38\x54\x54\x54\x18'  # 'e'
+    b'\x08\x7e\x09\x01\x02'  # 'f'
+    b'\x0c\x52\x52\x52\x3e'  # 'g'
+    b'\x7f\x08\x04\x04\x78'  # 'h'
+    b'\x00\x44\x7d\x40\x00'  # 'i'
+    b'\x20\x40\x44\x3d\x00'  # 'j'
+    b'\x7f\x10\x28\x44\x00'  # 'k'
+    b'\x00\x41\x7f\x40\x00'  # 'l'
+    b'\x7c\x04\x18\x04\x78'  # 'm'
+    b'\x7c\x08\x04\x04\x78'  # 'n'
+    b'\x38\x44\x44\x44\x38'  # 'o'
+    b'\x7c\x14\x14\x14\x08'  # 'p'
+    b'\x08\x14\x14\x18\x7c'  # 'q'
+    b'\x7c\x08\x04\x04\x08'  # 'r'
+    b'\x48\x54\x54\x54\x20'  # 's'
+    b'\x04\x3f\x44\x40\x20'  # 't'
+    b'\x3c\x40\x40\x20\x7c'  # 'u'
+    b'\x1c\x20\x40\x20\x1c'  # 'v'
+    b'\x3c\x40\x30\x40\x3c'  # 'w'
+    b'\x44\x28\x10\x28\x44'  # 'x'
+    b'\x0c\x50\x50\x50\x3c'  # 'y'
+    b'\x44\x64\x54\x4c\x44'  # 'z'
+    b'\x00\x08\x36\x41\x00'  # '{'
+    b'\x00\x00\x7f\x00\x00'  # '|'
+    b'\x00\x41\x36\x08\x00'  # '}'
+    b'\x08\x04\x08\x10\x08'  # '~'
+)
+
+# Non-ASCII glyphs used by the StudyStreak screens
+EXTRA_GLYPHS = {
+    '█': b'\x7f\x7f\x7f\x7f\x7f',
+    '░': b'\x55\x2a\x55\x2a\x55',
+    '▶': b'\x7f\x3e\x1c\x08\x00',
+    '⏸': b'\x7f\x7f\x00\x7f\x7f',
+}
+
+# Glyph drawn for characters the font does not cover
+FALLBACK_CHAR = '?'
+
+
+def glyph_columns(char):
+    """
+    Get the 5 column bytes of a character's glyph.
+
+    Args:
+        char (str): Single character
+
+    Returns:
+        memoryview: 5 bytes, LSB = top row
+    """
+    code = ord(char)
+    if 0x20 <= code <= 0x7E:
+        offset = (code - 0x20) * 5
+        return memoryview(FONT_5X7)[offset:offset + 5]
+    glyph = EXTRA_GLYPHS.get(char)
+    if glyph is not None:
+        return memoryview(glyph)
+    return glyph_columns(FALLBACK_CHAR)
+
+
+def text_width(text):
+    """
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Width of the rendered text in pixels
+    """
+    return len(text) * CHAR_WIDTH
+
+
+class FrameBuffer:
+    """
+    1-bpp page-ordered framebuffer matching the SSD1306 memory layout.
+    """
+
+    def __init__(self, width=128, height=64):
+        """
+        Initialize a blank framebuffer.
+
+        Args:
+            width (int): Width in pixels
+            height (int): Height in pixels (multiple of 8)
+        """
+        self.width = width
+        self.height = height
+        self.pages = height // 8
+        self.buffer = bytearray(width * self.pages)
+
+        # Per-page dirty column range (inclusive); min > max means clean
+        self._dirty_min = bytearray(self.pages)
+        self._dirty_max = bytearray(self.pages)
+        self.mark_all_dirty()
+
+    def _mark(self, page, x0, x1):
+        """
+        Record that columns x0..x1 (inclusive) of a page were written.
+        """
+        if x0 < self._dirty_min[page]:
+            self._dirty_min[page] = x0
+        if x1 > self._dirty_max[page]:
+            self._dirty_max[page] = x1
+
+    def mark_all_dirty(self):
+        """
+        Mark the whole framebuffer as needing transfer.
+        """
+        for page in range(self.pages):
+            self._dirty_min[page] = 0
+            self._dirty_max[page] = self.width - 1
+
+    def mark_clean(self):
+        """
+        Mark the whole framebuffer as transferred.
+        """
+        for page in range(self.pages):
+            self._dirty_min[page] = 0xFF
+            self._dirty_max[page] = 0
+
+    def is_dirty(self):
+        """
+        Returns:
+            bool: True if any page has been written since the last mark_clean()
+        """
+        for page in range(self.pages):
+            if self._dirty_min[page] <= self._dirty_max[page]:
+                return True
+        return False
+
+    def dirty_windows(self, shadow=None):
+        """
+        Yield the column windows that need to be sent, one per page.
+
+        Dirty ranges are trimmed at both ends against shadow (the frame last
+        sent to the display), and pages whose dirty range is unchanged are
+        skipped entirely.
+
+        Args:
+            shadow (bytearray): Last transferred frame, or None to skip trimming
+
+        Yields:
+            tuple: (page, first_column, last_column), inclusive
+        """
+        buf = self.buffer
+        width = self.width
+        for page in range(self.pages):
+            x0 = self._dirty_min[page]
+            x1 = self._dirty_max[page]
+            if x0 > x1:
+                continue
+            if shadow is not None:
+                base = page * width
+                while x0 <= x1 and buf[base + x0] == shadow[base + x0]:
+                    x0 += 1
+                while x1 >= x0 and buf[base + x1] == shadow[base + x1]:
+                    x1 -= 1
+                if x0 > x1:
+                    continue
+            yield page, x0, x1
+
+    def fill(self, color):
+        """
+        Fill the whole buffer.
+
+        Args:
+            color (int): 1 for lit pixels, 0 for dark
+        """
+        value = 0xFF if color else 0x00
+        buf = self.buffer
+        for i in range(len(buf)):
+            buf[i] = value
+        self.mark_all_dirty()
+
+    def pixel(self, x, y, color=None):
+        """
+        Get or set a single pixel.
+
+        Args:
+            x (int): Column
+            y (int): Row
+            color (int): 1/0 to set the pixel, or None to read it
+
+        Returns:
+            int: Pixel value when reading, None when writing or out of bounds
+        """
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        index = (y >> 3) * self.width + x
+        mask = 1 << (y & 7)
+        if color is None:
+            return 1 if self.buffer[index] & mask else 0
+        self._mark(y >> 3, x, x)
+        if color:
+            self.buffer[index] |= mask
+        else:
+            self.buffer[index] &= ~mask & 0xFF
+        return None
+
+    def fill_rect(self, x, y, w, h, color):
+        """
+        Fill a rectangle, clipped to the screen.
+
+        Args:
+            x (int): Left column
+            y (int): Top row
+            w (int): Width in pixels
+            h (int): Height in pixels
+            color (int): 1 for lit pixels, 0 for dark
+        """
+        x0 = max(0, x)
+        x1 = min(self.width, x + w)
+        y0 = max(0, y)
+        y1 = min(self.height, y + h)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        buf = self.buffer
+        width = self.width
+        for page in range(y0 >> 3, ((y1 - 1) >> 3) + 1):
+            top = max(y0, page * 8) - page * 8
+            bottom = min(y1, page * 8 + 8) - page * 8
+            mask = ((0xFF << top) & (0xFF >> (8 - bottom))) & 0xFF
+            base = page * width
+            self._mark(page, x0, x1 - 1)
+            if color:
+                for i in range(base + x0, base + x1):
+                    buf[i] |= mask
+            else:
+                inverse = ~mask & 0xFF
+                for i in range(base + x0, base + x1):
+                    buf[i] &= inverse
+
+    def hline(self, x, y, w, color):
+        """Draw a horizontal line of width w starting at (x, y)."""
+        self.fill_rect(x, y, w, 1, color)
+
+    def vline(self, x, y, h, color):
+        """Draw a vertical line of height h starting at (x, y)."""
+        self.fill_rect(x, y, 1, h, color)
+
+    def rect(self, x, y, w, h, color):
+        """
+        Draw a rectangle outline.
+
+        Args:
+            x (int): Left column
+            y (int): Top row
+            w (int): Width in pixels
+            h (int): Height in pixels
+            color (int): 1 for lit pixels, 0 for dark
+        """
+        self.hline(x, y, w, color)
+        self.hline(x, y + h - 1, w, color)
+        self.vline(x, y, h, color)
+        self.vline(x + w - 1, y, h, color)
+
+    def blit(self, bitmap, x, y, w, h):
+        """
+        Copy a page-ordered bitmap (same layout as the framebuffer) onto the screen.
+
+        Pixels set in the bitmap are lit, others are cleared, so the bitmap
+        fully replaces the w x h area. Page-aligned blits copy whole bytes.
+
+        Args:
+            bitmap (bytes): Page-ordered bitmap, w bytes per 8-row page
+            x (int): Left column
+            y (int): Top row
+            w (int): Bitmap width in pixels
+            h (int): Bitmap height in pixels
+        """
+        buf = self.buffer
+        width = self.width
+        src_pages = (h + 7) >> 3
+
+        if y & 7 == 0 and h & 7 == 0 and x >= 0 and x + w <= width and y + h <= self.height:
+            # Fast path: whole bytes line up with framebuffer pages
+            for page in range(src_pages):
+                dst = ((y >> 3) + page) * width + x
+                buf[dst:dst + w] = bitmap[page * w:(page + 1) * w]
+                self._mark((y >> 3) + page, x, x + w - 1)
+            return
+
+        for col in range(w):
+            for row in range(h):
+                bit = (bitmap[(row >> 3) * w + col] >> (row & 7)) & 1
+                self.pixel(x + col, y + row, bit)
+
+    def text(self, text, x, y, color=1):
+        """
+        Draw text with the built-in 5x7 font.
+
+        Args:
+            text (str): Text to draw
+            x (int): Left column of the first character
+            y (int): Top row
+            color (int): 1 for lit text on the existing background, 0 for dark
+        """
+        for char in text:
+            if x >= self.width:
+                break
+            if x + 5 > 0:
+                columns = glyph_columns(char)
+                for col in range(5):
+                    bits = columns[col]
+                    if not bits:
+                        continue
+                    for row in range(7):
+                        if bits & (1 << row):
+                            self.pixel(x + col, y + row, color)
+            x += CHAR_WIDTH
+
+    def to_rows(self):
+        """
+        Convert the buffer to row-major form.
+
+        Returns:
+            list: height lists of width 0/1 pixel values
+        """
+        rows = []
+        for y in range(self.height):
+            base = (y >> 3) * self.width
+            bit = y & 7
+            rows.append([(self.buffer[base + x] >> bit) & 1 for x in range(self.width)])
+        return rows
+
+
+class SSD1306I2CSink:
+    """
+    Sink that pushes framebuffers to an SSD1306 controller over I2C.
+    """
+
+    def __init__(self, i2c, width=128, height=64, address=0x3C):
+        """
+        Initialize the sink and the display controller.
+
+        Args:
+            i2c: machine.I2C (or SoftI2C) bus instance
+            width (int): Display width in pixels
+            height (int): Display height in pixels
+            address (int): I2C address of the display
+        """
+        self.i2c = i2c
+        self.width = width
+        self.height = height
+        self.address = address
+        self.pages = height // 8
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.windows_sent = 0
+        self._cmd = bytearray(2)
+        self._data_prefix = b'\x40'
+
+        # Command stream selecting a column/page window: Co=0, D/C#=0 prefix
+        self._window_cmd = bytearray(b'\x00\x21\x00\x00\x22\x00\x00')
+
+        # Copy of display RAM, used to trim partial updates
+        self._shadow = bytearray(width * self.pages)
+        self._shadow_valid = False
+        self._init_display()
+
+    def write_cmd(self, cmd):
+        """
+        Send a single command byte.
+
+        Args:
+            cmd (int): SSD1306 command byte
+        """
+        self._cmd[0] = 0x80  # Co=1, D/C#=0
+        self._cmd[1] = cmd
+        self.i2c.writeto(self.address, self._cmd)
+        self.bytes_sent += 2
+
+    def write_data(self, data):
+        """
+        Send display RAM data without copying it.
+
+        Args:
+            data: Buffer (bytearray or memoryview) of page-ordered pixels
+        """
+        self.i2c.writevto(self.address, (self._data_prefix, data))
+        self.bytes_sent += 1 + len(data)
+
+    def _init_display(self):
+        """
+        Run the SSD1306 power-up sequence (horizontal addressing mode).
+        """
+        for cmd in (
+            0xAE,                                   # Display off
+            0x20, 0x00,                             # Horizontal addressing mode
+            0x40,                                   # Start line 0
+            0xA1,                                   # Segment remap
+            0xA8, self.height - 1,                  # Multiplex ratio
+            0xC8,                                   # COM scan direction remapped
+            0xD3, 0x00,                             # Display offset
+            0xDA, 0x02 if self.height == 32 else 0x12,  # COM pin config
+            0xD5, 0x80,                             # Clock divide
+            0xD9, 0xF1,                             # Pre-charge period
+            0xDB, 0x30,                             # VCOMH deselect level
+            0x81, 0xFF,                             # Contrast
+            0xA4,                                   # Display follows RAM
+            0xA6,                                   # Normal (not inverted)
+            0x8D, 0x14,                             # Charge pump on
+            0xAF,                                   # Display on
+        ):
+            self.write_cmd(cmd)
+
+    def _set_window(self, page0, page1, x0, x1):
+        """
+        Select the RAM window subsequent data bytes are written to.
+        """
+        cmd = self._window_cmd
+        cmd[2] = x0
+        cmd[3] = x1
+        cmd[5] = page0
+        cmd[6] = page1
+        self.i2c.writeto(self.address, cmd)
+        self.bytes_sent += len(cmd)
+
+    def write(self, framebuffer, full=False):
+        """
+        Push the changed parts of a frame.
+
+        Only the dirty column windows that differ from display RAM are sent.
+        The first frame (or full=True) is sent whole.
+
+        Args:
+            framebuffer (FrameBuffer): Frame to send
+            full (bool): Send the entire frame regardless of dirty state
+        """
+        buf = framebuffer.buffer
+        if full or not self._shadow_valid:
+            self._set_window(0, self.pages - 1, 0, self.width - 1)
+            self.write_data(buf)
+            self.windows_sent += 1
+        else:
+            view = memoryview(buf)
+            for page, x0, x1 in framebuffer.dirty_windows(self._shadow):
+                start = page * self.width
+                self._set_window(page, page, x0, x1)
+                self.write_data(view[start + x0:start + x1 + 1])
+                self.windows_sent += 1
+
+        self._shadow[:] = buf
+        self._shadow_valid = True
+        framebuffer.mark_clean()
+        self.frames_sent += 1
+
+    def contrast(self, value):
+        """Set display contrast (0-255)."""
+        self.write_cmd(0x81)
+        self.write_cmd(value)
+
+    def invert(self, invert):
+        """Enable or disable inverted display."""
+        self.write_cmd(0xA7 if invert else 0xA6)
+
+    def power(self, on):
+        """Turn the display panel on or off."""
+        self.write_cmd(0xAF if on else 0xAE)
+
+
+class HeadlessSink:
+    """
+    Sink that keeps frames in memory for host-side tests and previews.
+    """
+
+    def __init__(self, width=128, height=64):
+        """
+        Initialize an empty headless sink.
+
+        Args:
+            width (int): Display width in pixels
+            height (int): Display height in pixels
+        """
+        self.width = width
+        self.height = height
+        self.frame = bytearray(width * (height // 8))
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.windows_sent = 0
+        self._has_frame = False
+        self.contrast_value = 255
+        self.is_inverted = False
+        self.is_on = True
+
+    def write(self, framebuffer, full=False):
+        """
+        Capture a frame, counting the bytes a partial I2C update would send.
+
+        Args:
+            framebuffer (FrameBuffer): Frame to capture
+            full (bool): Account for a full-frame transfer
+        """
+        # Each window costs a 7-byte command stream plus a data prefix byte
+        if full or not self._has_frame:
+            self.bytes_sent += 8 + len(framebuffer.buffer)
+            self.windows_sent += 1
+        else:
+            for page, x0, x1 in framebuffer.dirty_windows(self.frame):
+                self.bytes_sent += 8 + (x1 - x0 + 1)
+                self.windows_sent += 1
+
+        self.frame[:] = framebuffer.buffer
+        self._has_frame = True
+        framebuffer.mark_clean()
+        self.frames_sent += 1
+
+    def contrast(self, value):
+        """Record display contrast (0-255)."""
+        self.contrast_value = value
+
+    def invert(self, invert):
+        """Record display inversion."""
+        self.is_inverted = invert
+
+    def power(self, on):
+        """Record display power state."""
+        self.is_on = on
+
+    def pixel(self, x, y):
+        """
+        Read a pixel of the last captured frame.
+
+        Args:
+            x (int): Column
+            y (int): Row
+
+        Returns:
+            int: 1 if lit, 0 otherwise
+        """
+        return (self.frame[(y >> 3) * self.width + x] >> (y & 7)) & 1
+
+    def to_pbm(self):
+        """
+        Encode the last frame as a binary PBM (P4) image.
+
+        Returns:
+            bytes: PBM file contents (1 = black in PBM, so lit pixels are black)
+        """
+        row_bytes = (self.width + 7) // 8
+        out = bytearray(('P4\n%d %d\n' % (self.width, self.height)).encode())
+        for y in range(self.height):
+            row = bytearray(row_bytes)
+            for x in range(self.width):
+                if self.pixel(x, y):
+                    row[x >> 3] |= 0x80 >> (x & 7)
+            out += row
+        return bytes(out)
+
+    def save_pbm(self, path):
+        """
+        Write the last frame to a PBM file.
+
+        Args:
+            path (str): Output file path
+        """
+        with open(path, 'wb') as f:
+            f.write(self.to_pbm())
+
+    def save_png(self, path, scale=1):
+        """
+        Write the last frame to a 1-bit grayscale PNG (lit pixels white).
+
+        Requires zlib, so this is intended for host-side use.
+
+        Args:
+            path (str): Output file path
+            scale (int): Integer upscaling factor
+        """
+        import struct
+        import zlib
+
+        width = self.width * scale
+        height = self.height * scale
+        row_bytes = (width + 7) // 8
+        raw = bytearray()
+        for y in range(height):
+            row = bytearray(row_bytes)
+            for x in range(width):
+                if self.pixel(x // scale, y // scale):
+                    row[x >> 3] |= 0x80 >> (x & 7)
+            raw += b'\x00' + row
+
+        def chunk(kind, data):
+            body = kind + data
+            return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body) & 0xFFFFFFFF)
+
+        header = struct.pack('>IIBBBBB', width, height, 1, 0, 0, 0, 0)
+        with open(path, 'wb') as f:
+            f.write(b'\x89PNG\r\n\x1a\n')
+            f.write(chunk(b'IHDR', header))
+            f.write(chunk(b'IDAT', zlib.compress(bytes(raw))))
+            f.write(chunk(b'IEND', b''))
+
+    def to_text(self, on='#', off='.'):
+        """
+        Render the last frame as ASCII art for quick inspection.
+
+        Returns:
+            str: height lines of width characters
+        """
+        lines = []
+        for y in range(self.height):
+            lines.append(''.join(on if self.pixel(x, y) else off for x in range(self.width)))
+        return '\n'.join(lines)
+
+
+# Example usage (commented out for module import)
+"""
+# Example of rendering headlessly and saving a preview image
+
+fb = FrameBuffer(128, 64)
+fb.text("FOCUS TIME", 34, 0)
+fb.rect(0, 32, 96, 8, 1)
+fb.fill_rect(0, 32, 40, 8, 1)
+
+sink = HeadlessSink(128, 64)
+sink.write(fb)
+sink.save_png("frame.png", scale=4)
+print(sink.to_text())
+print("Bytes per frame:", sink.bytes_sent // sink.frames_sent)
+"""
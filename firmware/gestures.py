@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+Touch Gesture Recognizer for StudyStreak ESP32 Project
+======================================================
+
+This module turns timestamped press/release edges into gestures without ever
+waiting: tap, double-tap, long-press and hold-repeat. Each pin is a small state
+machine kept in a few integers (state, press tick, next deadline), and every
+edge or deadline check is O(1).
+
+Gestures that depend on time passing with no edge (a long press while the
+finger is still down, a single tap once the double-tap window has closed) are
+emitted by update(), which the touch task calls every tick; ms_until_deadline()
+tells the task how long it may sleep before the next one is due.
+
+Author: StudyStreak Project
+Environment: MicroPython for ESP32
+"""
+
+from clock import system_clock
+
+# Gesture names passed to the callback
+GESTURE_TAP = "tap"
+GESTURE_DOUBLE_TAP = "double_tap"
+GESTURE_LONG_PRESS = "long_press"
+GESTURE_HOLD_REPEAT = "hold_repeat"
+
+# Per-pin states
+_IDLE = 0
+_PRESSED = 1          # First press, long-press deadline armed
+_HELD = 2             # Long press emitted, hold-repeat deadline armed
+_WAIT_SECOND = 3      # Released after a short press, double-tap window open
+_SECOND_PRESSED = 4   # Second press inside the double-tap window
+
+
+class GestureRecognizer:
+    """
+    Incremental tap / double-tap / long-press / hold-repeat recognizer.
+    """
+
+    def __init__(self, pins, callback=None, clock=None,
+                 long_press_ms=1000, double_tap_ms=400, repeat_ms=500):
+        """
+        Initialize per-pin state.
+
+        Args:
+            pins (list): Pins to track
+            callback (callable): Called as callback(gesture, pin) for each gesture
+            clock: Time source (SystemClock or VirtualClock), defaults to the system clock
+            long_press_ms (int): Hold time before a long press is emitted
+            double_tap_ms (int): Window after a tap for a second tap; 0 emits
+                                 taps immediately on release and disables double-tap
+            repeat_ms (int): Interval of hold-repeat events after a long press;
+                             0 disables hold-repeat
+        """
+        self.clock = clock if clock is not None else system_clock
+        self.callback = callback
+        self.long_press_ms = long_press_ms
+        self.double_tap_ms = double_tap_ms
+        self.repeat_ms = repeat_ms
+
+        self._slots = {}
+        for pin in pins:
+            if pin not in self._slots:
+                self._slots[pin] = len(self._slots)
+        count = len(self._slots)
+        self._pins = list(self._slots)
+        self._states = bytearray(count)
+        self._press_ms = [0] * count
+        self._deadline_ms = [0] * count
+
+    def on_edge(self, pin, pressed, ticks_ms):
+        """
+        Feed one debounced edge.
+
+        Args:
+            pin (int): Pin that changed
+            pressed (bool): True for a press, False for a release
+            ticks_ms (int): Tick at which the edge happened
+        """
+        slot = self._slots.get(pin)
+        if slot is None:
+            return
+
+        # Deadlines that passed before this edge happened come first
+        self._check_deadline(slot, ticks_ms)
+
+        state = self._states[slot]
+        if pressed:
+            if state == _IDLE:
+                self._states[slot] = _PRESSED
+                self._press_ms[slot] = ticks_ms
+                self._deadline_ms[slot] = self.clock.ticks_add(ticks_ms, self.long_press_ms)
+            elif state == _WAIT_SECOND:
+                self._states[slot] = _SECOND_PRESSED
+        else:
+            if state == _PRESSED:
+                if self.double_tap_ms > 0:
+                    self._states[slot] = _WAIT_SECOND
+                    self._deadline_ms[slot] = self.clock.ticks_add(ticks_ms, self.double_tap_ms)
+                else:
+                    self._states[slot] = _IDLE
+                    self._emit(GESTURE_TAP, pin)
+            elif state == _SECOND_PRESSED:
+                self._states[slot] = _IDLE
+                self._emit(GESTURE_DOUBLE_TAP, pin)
+            elif state == _HELD:
+                self._states[slot] = _IDLE
+
+    def update(self, now_ms=None):
+        """
+        Emit gestures whose deadline has passed without an edge.
+
+        Args:
+            now_ms (int): Current tick, defaults to the clock
+        """
+        if now_ms is None:
+            now_ms = self.clock.ticks_ms()
+        for slot in range(len(self._pins)):
+            self._check_deadline(slot, now_ms)
+
+    def _check_deadline(self, slot, now_ms):
+        """
+        Advance one pin's state machine if its deadline has passed.
+        """
+        state = self._states[slot]
+        if state != _PRESSED and state != _HELD and state != _WAIT_SECOND:
+            return
+        if self.clock.ticks_diff(now_ms, self._deadline_ms[slot]) < 0:
+            return
+
+        pin = self._pins[slot]
+        if state == _PRESSED:
+            self._states[slot] = _HELD
+            self._deadline_ms[slot] = self.clock.ticks_add(self._deadline_ms[slot], self.repeat_ms)
+            self._emit(GESTURE_LONG_PRESS, pin)
+        elif state == _HELD:
+            if self.repeat_ms <= 0:
+                return
+            self._deadline_ms[slot] = self.clock.ticks_add(self._deadline_ms[slot], self.repeat_ms)
+            self._emit(GESTURE_HOLD_REPEAT, pin)
+        else:
+            self._states[slot] = _IDLE
+            self._emit(GESTURE_TAP, pin)
+
+    def ms_until_deadline(self, now_ms=None):
+        """
+        Args:
+            now_ms (int): Current tick, defaults to the clock
+
+        Returns:
+            int: Milliseconds until the next pending gesture deadline, or None
+        """
+        if now_ms is None:
+            now_ms = self.clock.ticks_ms()
+
+        soonest = None
+        for slot in range(len(self._pins)):
+            state = self._states[slot]
+            if state == _IDLE or state == _SECOND_PRESSED:
+                continue
+            if state == _HELD and self.repeat_ms <= 0:
+                continue
+            remaining = max(0, self.clock.ticks_diff(self._deadline_ms[slot], now_ms))
+            if soonest is None or remaining < soonest:
+                soonest = remaining
+        return soonest
+
+    def is_pressed(self, pin):
+        """
+        Args:
+            pin (int): Pin to check
+
+        Returns:
+            bool: True while the pin is held down
+        """
+        slot = self._slots.get(pin)
+        if slot is None:
+            return False
+        state = self._states[slot]
+        return state == _PRESSED or state == _HELD or state == _SECOND_PRESSED
+
+    def reset(self):
+        """
+        Forget any gesture in progress.
+        """
+        for slot in range(len(self._pins)):
+            self._states[slot] = _IDLE
+
+    def _emit(self, gesture, pin):
+        if self.callback is not None:
+            self.callback(gesture, pin)
+
+
+# Example usage (commented out for module import)
+"""
+# Example of recognizing gestures from edges
+
+def on_gesture(gesture, pin):
+    print(gesture, "on pin", pin)
+
+gestures = GestureRecognizer([4], on_gesture, long_press_ms=3000)
+
+gestures.on_edge(4, True, 0)
+gestures.on_edge(4, False, 120)     # Short press: double-tap window opens
+gestures.update(600)                # Window closed: emits "tap"
+
+gestures.on_edge(4, True, 1000)
+gestures.update(4000)               # Still held after 3 s: emits "long_press"
+"""
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Large Digit Glyph Cache for StudyStreak ESP32 Project
+=====================================================
+
+This module pre-rasterizes the countdown characters (0-9 and ':') once at
+startup into packed, page-ordered bitmaps at a large display size. Drawing the
+MM:SS countdown is then a handful of byte-copy blits instead of per-pixel font
+rendering, and only the character cells whose digit changed since the last
+frame are redrawn; a typical one-second tick touches a single cell.
+
+Author: StudyStreak Project
+Version: 1.0
+"""
+
+from framebuffer import glyph_columns
+
+# Characters needed for an MM:SS countdown
+COUNTDOWN_CHARS = "0123456789:"
+
+
+class LargeDigitCache:
+    """
+    Cache of scaled-up countdown glyphs with per-cell change tracking.
+    """
+
+    def __init__(self, scale=2, spacing=2, chars=COUNTDOWN_CHARS):
+        """
+        Rasterize all glyphs.
+
+        Args:
+            scale (int): Integer scale factor applied to the 5x7 font
+            spacing (int): Blank columns between character cells
+            chars (str): Characters to pre-rasterize
+        """
+        self.scale = scale
+        self.cell_width = 5 * scale
+        self.height = 8 * scale  # Whole pages, so blits copy bytes directly
+        self.advance = self.cell_width + spacing
+        self.glyphs = {}
+        for char in chars:
+            self.glyphs[char] = self._rasterize(char)
+
+        # What is currently drawn, so unchanged cells can be skipped
+        self._origin = None
+        self._drawn = []
+        self.blits = 0
+
+    def _rasterize(self, char):
+        """
+        Scale one 5x7 glyph into a page-ordered bitmap.
+
+        Args:
+            char (str): Character to rasterize
+
+        Returns:
+            memoryview: cell_width bytes per page, height // 8 pages
+        """
+        scale = self.scale
+        width = self.cell_width
+        bitmap = bytearray(width * (self.height // 8))
+        top = scale // 2  # Center the 7*scale rows within the 8*scale cell
+
+        columns = glyph_columns(char)
+        for col in range(5):
+            bits = columns[col]
+            for row in range(7):
+                if not bits & (1 << row):
+                    continue
+                for dx in range(scale):
+                    x = col * scale + dx
+                    for dy in range(scale):
+                        y = top + row * scale + dy
+                        bitmap[(y >> 3) * width + x] |= 1 << (y & 7)
+
+        return memoryview(bitmap)
+
+    def text_width(self, text):
+        """
+        Args:
+            text (str): Text to measure
+
+        Returns:
+            int: Width in pixels, without trailing spacing
+        """
+        if not text:
+            return 0
+        return len(text) * self.advance - (self.advance - self.cell_width)
+
+    def invalidate(self):
+        """
+        Forget what is on screen, e.g. after the framebuffer was cleared.
+        """
+        self._origin = None
+        self._drawn = []
+
+    def draw(self, framebuffer, text, x, y):
+        """
+        Draw text with cached glyphs, blitting only cells that changed.
+
+        Args:
+            framebuffer (FrameBuffer): Target framebuffer
+            text (str): Countdown text (characters must be cached)
+            x (int): Left column
+            y (int): Top row (a multiple of 8 for byte-copy blits)
+
+        Returns:
+            int: Number of cells blitted
+        """
+        if self._origin != (x, y) or len(self._drawn) != len(text):
+            self.invalidate()
+            self._origin = (x, y)
+            self._drawn = [None] * len(text)
+
+        blitted = 0
+        for i, char in enumerate(text):
+            if self._drawn[i] == char:
+                continue
+            glyph = self.glyphs.get(char)
+            if glyph is None:
+                continue
+            framebuffer.blit(glyph, x + i * self.advance, y, self.cell_width, self.height)
+            self._drawn[i] = char
+            blitted += 1
+
+        self.blits += blitted
+        return blitted
+
+
+# Example usage (commented out for module import)
+"""
+# Example of drawing a countdown with the glyph cache
+
+fb = FrameBuffer(128, 64)
+digits = LargeDigitCache(scale=2)
+
+x = (128 - digits.text_width("25:00")) // 2
+digits.draw(fb, "25:00", x, 16)   # Blits all 5 cells
+digits.draw(fb, "24:59", x, 16)   # Blits only the 3 cells that changed
+"""
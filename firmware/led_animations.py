@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+LED Animations for StudyStreak ESP32 Project
+============================================
+
+This module provides declarative, non-blocking animations for the WS2812B LED
+strip driven by LEDHandler. Each animation computes its frame purely from the
+time elapsed since it started, so advancing it never sleeps and costs
+O(num_leds) per frame. Frames are GRB bytearrays (3 bytes per LED, WS2812
+wire order) and are written in place without allocating.
+
+Animations are stacked as layers: each layer renders over the frame produced
+by the layers beneath it. A layer can leave pixels untouched (transparent),
+which is how a flash blinks over a progress bar without erasing it.
+
+Each animation also reports when its frame next changes, so the caller can
+sleep between visible changes instead of redrawing at a fixed rate.
+
+Author: StudyStreak Project
+Version: 1.0
+"""
+
+import math
+
+# Frame interval of short continuously changing animations (fades)
+DEFAULT_FRAME_MS = 100
+
+# Frame interval of the endless breathing effect; it runs whenever the timer
+# is idle or paused, so it steps slowly to keep the CPU asleep
+BREATHING_FRAME_MS = 250
+
+
+# One breathing cycle of brightness levels (0-255), indexed by phase
+_BREATH_STEPS = 256
+_BREATH_TABLE = bytearray(int((math.sin(2 * math.pi * i / _BREATH_STEPS) + 1) / 2 * 255 + 0.5)
+                          for i in range(_BREATH_STEPS))
+
+
+def fill_rgb(buf, r, g, b, start=0, end=None):
+    """
+    Write one color, given as components, into a range of a GRB pixel buffer in place.
+
+    Args:
+        buf (bytearray): GRB pixel buffer (3 bytes per LED)
+        r (int): Red (0-255)
+        g (int): Green (0-255)
+        b (int): Blue (0-255)
+        start (int): First LED index
+        end (int): One past the last LED index, or None for the buffer end
+    """
+    if end is None:
+        end = len(buf) // 3
+    for j in range(start * 3, end * 3, 3):
+        buf[j] = g
+        buf[j + 1] = r
+        buf[j + 2] = b
+
+
+def fill_grb(buf, color, start=0, end=None):
+    """
+    Write one RGB color into a range of a GRB pixel buffer in place.
+
+    Args:
+        buf (bytearray): GRB pixel buffer (3 bytes per LED)
+        color (tuple): RGB color tuple (r, g, b)
+        start (int): First LED index
+        end (int): One past the last LED index, or None for the buffer end
+    """
+    r, g, b = color
+    fill_rgb(buf, r, g, b, start, end)
+
+
+def fill_grb_scaled(buf, color, level, start=0, end=None):
+    """
+    Write an RGB color scaled by an integer brightness level into a range
+    of a GRB pixel buffer in place, without building a scaled color.
+
+    Args:
+        buf (bytearray): GRB pixel buffer (3 bytes per LED)
+        color (tuple): RGB color tuple (r, g, b)
+        level (int): Brightness level (0-255)
+        start (int): First LED index
+        end (int): One past the last LED index, or None for the buffer end
+    """
+    r, g, b = color
+    fill_rgb(buf, r * level // 255, g * level // 255, b * level // 255, start, end)
+
+
+class Animation:
+    """
+    Base class for LED animations.
+
+    Subclasses implement render(); duration_ms of None means the animation
+    runs until it is removed.
+    """
+
+    def __init__(self, duration_ms=None):
+        """
+        Initialize the animation.
+
+        Args:
+            duration_ms (int): Total run time in milliseconds, or None for endless
+        """
+        self.duration_ms = duration_ms
+        self.start_ms = None
+
+    def start(self, now_ms):
+        """
+        Mark the animation as started.
+
+        Args:
+            now_ms (int): Current tick in milliseconds
+        """
+        self.start_ms = now_ms
+
+    def is_finished(self, elapsed_ms):
+        """
+        Args:
+            elapsed_ms (int): Milliseconds since the animation started
+
+        Returns:
+            bool: True once the animation has run for its full duration
+        """
+        return self.duration_ms is not None and elapsed_ms >= self.duration_ms
+
+    def get_ms_until_change(self, elapsed_ms):
+        """
+        Args:
+            elapsed_ms (int): Milliseconds since the animation started
+
+        Returns:
+            int: Milliseconds until the rendered frame changes (or the
+                 animation finishes), or None if it stays as it is
+        """
+        if self.duration_ms is None or elapsed_ms >= self.duration_ms:
+            return None
+        return self.duration_ms - elapsed_ms
+
+    def render(self, frame, elapsed_ms):
+        """
+        Draw the animation into the frame.
+
+        Args:
+            frame (bytearray): GRB pixel buffer holding the layers below
+            elapsed_ms (int): Milliseconds since the animation started
+        """
+        raise NotImplementedError
+
+
+class SolidAnimation(Animation):
+    """
+    A constant color on every LED.
+    """
+
+    def __init__(self, color, duration_ms=None):
+        """
+        Args:
+            color (tuple): RGB color tuple
+            duration_ms (int): Run time in milliseconds, or None for endless
+        """
+        super().__init__(duration_ms)
+        self.color = color
+
+    def render(self, frame, elapsed_ms):
+        fill_grb(frame, self.color)
+
+
+class ProgressAnimation(Animation):
+    """
+    A progress bar filling the strip, with a dimmed partial LED at the edge.
+
+    Update progress_percent in place to move the bar.
+    """
+
+    def __init__(self, color, progress_percent=0):
+        """
+        Args:
+            color (tuple): RGB color of the filled part
+            progress_percent (float): Progress percentage (0-100)
+        """
+        super().__init__(None)
+        self.color = color
+        self.progress_percent = progress_percent
+
+    def render(self, frame, elapsed_ms):
+        num_leds = len(frame) // 3
+        filled = (max(0.0, min(100.0, self.progress_percent)) / 100.0) * num_leds
+        num_lit = int(filled)
+        partial = filled - num_lit
+
+        fill_grb(frame, self.color, 0, num_lit)
+        if num_lit < num_leds:
+            if partial > 0:
+                # Dim the next LED based on partial progress
+                fill_grb_scaled(frame, self.color, int(partial * 255), num_lit, num_lit + 1)
+                num_lit += 1
+            fill_grb(frame, (0, 0, 0), num_lit, num_leds)
+
+
+class BreathingAnimation(Animation):
+    """
+    Smooth sinusoidal brightness pulsing of a single color.
+    """
+
+    def __init__(self, color, period_ms=4000, intensity=1.0, frame_ms=BREATHING_FRAME_MS):
+        """
+        Args:
+            color (tuple): Base RGB color
+            period_ms (int): Duration of one full breath in milliseconds
+            intensity (float): Peak brightness (0.0-1.0)
+            frame_ms (int): Interval between frames in milliseconds
+        """
+        super().__init__(None)
+        self.color = color
+        self.period_ms = period_ms
+        self.intensity = intensity
+        self.frame_ms = frame_ms
+        # Integer peak level, so render() does no float math
+        self._peak = int(max(0.0, min(1.0, intensity)) * 255 + 0.5)
+
+    def get_ms_until_change(self, elapsed_ms):
+        return self.frame_ms
+
+    def render(self, frame, elapsed_ms):
+        index = (elapsed_ms % self.period_ms) * _BREATH_STEPS // self.period_ms
+        fill_grb_scaled(frame, self.color, _BREATH_TABLE[index] * self._peak // 255)
+
+
+class FlashAnimation(Animation):
+    """
+    Blink a color a number of times over the layers below.
+
+    During the off half of each flash the layer is transparent.
+    """
+
+    def __init__(self, color, flash_count=3, flash_ms=500):
+        """
+        Args:
+            color (tuple): RGB color to flash
+            flash_count (int): Number of flashes
+            flash_ms (int): Duration of one on/off flash cycle in milliseconds
+        """
+        super().__init__(flash_count * flash_ms)
+        self.color = color
+        self.flash_ms = max(1, flash_ms)
+
+    def get_ms_until_change(self, elapsed_ms):
+        # Next on/off toggle, or the end of the last flash
+        if elapsed_ms >= self.duration_ms:
+            return None
+        half_ms = self.flash_ms / 2
+        toggle_ms = int((elapsed_ms // half_ms + 1) * half_ms) - elapsed_ms
+        return max(1, min(toggle_ms, self.duration_ms - elapsed_ms))
+
+    def render(self, frame, elapsed_ms):
+        if (elapsed_ms % self.flash_ms) * 2 >= self.flash_ms:
+            return
+        fill_grb(frame, self.color)
+
+
+class FadeAnimation(Animation):
+    """
+    Linear cross-fade between two colors; as a base layer it holds the end color.
+    """
+
+    def __init__(self, from_color, to_color, duration_ms=1000):
+        """
+        Args:
+            from_color (tuple): Starting RGB color
+            to_color (tuple): Final RGB color
+            duration_ms (int): Fade time in milliseconds
+        """
+        super().__init__(duration_ms)
+        self.from_color = from_color
+        self.to_color = to_color
+
+    def get_ms_until_change(self, elapsed_ms):
+        remaining_ms = self.duration_ms - elapsed_ms
+        if remaining_ms <= 0:
+            # Holding the end color
+            return None
+        return min(DEFAULT_FRAME_MS, remaining_ms)
+
+    def render(self, frame, elapsed_ms):
+        # Fade position as an integer 0-256
+        t = min(256, elapsed_ms * 256 // self.duration_ms) if self.duration_ms else 256
+        r0, g0, b0 = self.from_color
+        r1, g1, b1 = self.to_color
+        fill_rgb(frame, r0 + (r1 - r0) * t // 256, g0 + (g1 - g0) * t // 256,
+                 b0 + (b1 - b0) * t // 256)
+
+
+# Example usage (commented out for module import)
+"""
+# Example of layering a flash over a progress bar
+
+leds = LEDHandler(pin=5, num_leds=8)
+leds.setup()
+
+leds.set_base_animation(ProgressAnimation(leds.colors['red'], 40))
+leds.add_animation(FlashAnimation(leds.colors['green'], flash_count=3, flash_ms=300))
+
+# Advance from the main loop or a scheduler task; never blocks
+while leds.tick():
+    time.sleep_ms(leds.get_ms_until_next_frame())
+"""
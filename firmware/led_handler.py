@@ -14,7 +14,19 @@ Author: StudyStreak Project
 Version: 1.0
 """
 
-import time
+from clock import system_clock
+from logger import log, DEBUG
+from led_animations import (ProgressAnimation, BreathingAnimation, FlashAnimation,
+                            SolidAnimation, fill_grb)
+
+try:
+    from machine import Pin, bitstream
+except ImportError:
+    Pin = None
+    bitstream = None
+
+# WS2812 800 kHz bit timings (high0, low0, high1, low1) in nanoseconds
+WS2812_TIMING_NS = (400, 850, 800, 450)
 
 
 class LEDHandler:
@@ -26,24 +38,39 @@ class LEDHandler:
     would use the neopixel library or similar for ESP32.
     """
     
-    def __init__(self, pin, num_leds=8):
+    def __init__(self, pin, num_leds=8, clock=None):
         """
         Initialize the LED handler.
         
         Args:
             pin (int): GPIO pin number for LED data line
             num_leds (int): Number of LEDs in the strip
+            clock: Time source (SystemClock or VirtualClock), defaults to the system clock
         """
+        self.clock = clock if clock is not None else system_clock
         self.pin = pin
         self.num_leds = num_leds
         self.is_initialized = False
         
-        # LED state storage [R, G, B] for each LED
-        self.led_states = [[0, 0, 0] for _ in range(num_leds)]
+        # Preallocated pixel buffers in WS2812 GRB wire order (3 bytes per LED):
+        # base_pixels holds directly set colors, pixels is the frame sent to the strip
+        self.base_pixels = bytearray(num_leds * 3)
+        self.pixels = bytearray(num_leds * 3)
+        self._data_pin = None
+        
+        # Frame diffing: last frame pushed to the strip
+        self._last_pushed = bytearray(num_leds * 3)
+        self._has_pushed = False
+        
+        # Global brightness (0-255), applied to a copy of the frame when it is pushed
+        self.brightness = 255
+        self._scaled = bytearray(num_leds * 3)
+        self.frames_pushed = 0
+        self.frames_skipped = 0
         
-        # Animation variables
-        self._breathing_phase = 0
-        self._animation_running = False
+        # Animation layers: one base animation plus stacked overlays (e.g. flashes)
+        self.base_animation = None
+        self.animations = []
         
         # Color definitions
         self.colors = {
@@ -79,8 +106,11 @@ class LEDHandler:
         print(f"Conceptual: Initializing WS2812B LEDs on pin {self.pin}")
         print(f"Conceptual: Configuring {self.num_leds} LEDs...")
         
-        # Simulate initialization
-        time.sleep(0.1)
+        if Pin is not None and bitstream is not None:
+            self._data_pin = Pin(self.pin, Pin.OUT)
+        else:
+            # Simulate initialization
+            self.clock.sleep(0.1)
         
         # Clear all LEDs
         self.clear_all()
@@ -89,38 +119,109 @@ class LEDHandler:
         print("Conceptual: LED strip initialized successfully")
         return True
     
+    @staticmethod
+    def _is_valid_color(color):
+        """
+        Validate a user-supplied color.
+        
+        Args:
+            color: Value to check
+        
+        Returns:
+            bool: True if color is an (r, g, b) tuple/list with values 0-255
+        """
+        if not (isinstance(color, (tuple, list)) and len(color) == 3):
+            log.error("led", "Color must be a tuple/list of 3 values (R, G, B)")
+            return False
+        
+        r, g, b = color
+        if not (0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
+            log.error("led", "Color values must be between 0 and 255")
+            return False
+        
+        return True
+    
     def set_led(self, led_index, color):
         """
         Set a specific LED to a color.
         
+        This is the validated slow path for user-supplied colors; internal
+        code uses fill() or set_pixel().
+        
         Args:
             led_index (int): Index of the LED (0 to num_leds-1)
             color (tuple): RGB color tuple (r, g, b) with values 0-255
         """
         if not self.is_initialized:
-            print("ERROR: LED handler not initialized! Call setup() first.")
+            log.error("led", "LED handler not initialized! Call setup() first.")
             return False
         
         if not (0 <= led_index < self.num_leds):
-            print(f"ERROR: LED index {led_index} out of range (0-{self.num_leds-1})")
+            log.error("led", "LED index %d out of range (0-%d)", led_index, self.num_leds - 1)
             return False
         
-        if not (isinstance(color, (tuple, list)) and len(color) == 3):
-            print("ERROR: Color must be a tuple/list of 3 values (R, G, B)")
+        if not self._is_valid_color(color):
             return False
         
-        # Validate color values
         r, g, b = color
-        if not all(0 <= val <= 255 for val in [r, g, b]):
-            print("ERROR: Color values must be between 0 and 255")
-            return False
-        
-        # Store the color state
-        self.led_states[led_index] = [r, g, b]
+        self.set_pixel(led_index, r, g, b)
         
-        print(f"Conceptual: LED {led_index} set to RGB({r}, {g}, {b})")
+        if log.level <= DEBUG:
+            log.debug("led", "LED %d set to RGB(%d, %d, %d)", led_index, r, g, b)
         return True
     
+    def set_pixel(self, led_index, r, g, b):
+        """
+        Set one LED without validation (fast path).
+        
+        Writes the color in GRB wire order to both the base layer and the
+        output frame.
+        
+        Args:
+            led_index (int): Index of the LED (0 to num_leds-1)
+            r (int): Red value 0-255
+            g (int): Green value 0-255
+            b (int): Blue value 0-255
+        """
+        j = led_index * 3
+        self.base_pixels[j] = self.pixels[j] = g
+        self.base_pixels[j + 1] = self.pixels[j + 1] = r
+        self.base_pixels[j + 2] = self.pixels[j + 2] = b
+    
+    def fill(self, color, start=0, end=None):
+        """
+        Set a range of LEDs to one color without validation (fast path).
+        
+        Args:
+            color (tuple): RGB color tuple (r, g, b) with values 0-255
+            start (int): First LED index
+            end (int): One past the last LED index, or None for the strip end
+        """
+        if end is None:
+            end = self.num_leds
+        fill_grb(self.base_pixels, color, start, end)
+        fill_grb(self.pixels, color, start, end)
+    
+    def get_led(self, led_index):
+        """
+        Get the color currently shown by one LED.
+        
+        Args:
+            led_index (int): Index of the LED (0 to num_leds-1)
+        
+        Returns:
+            tuple: RGB color tuple (r, g, b)
+        """
+        j = led_index * 3
+        return (self.pixels[j + 1], self.pixels[j], self.pixels[j + 2])
+    
+    @property
+    def led_states(self):
+        """
+        list: [R, G, B] for each LED, decoded from the GRB pixel buffer.
+        """
+        return [list(self.get_led(i)) for i in range(self.num_leds)]
+    
     def set_all_leds(self, color):
         """
         Set all LEDs to the same color.
@@ -129,16 +230,17 @@ class LEDHandler:
             color (tuple): RGB color tuple (r, g, b) with values 0-255
         """
         if not self.is_initialized:
-            print("ERROR: LED handler not initialized! Call setup() first.")
+            log.error("led", "LED handler not initialized! Call setup() first.")
+            return False
+        
+        if not self._is_valid_color(color):
             return False
         
-        success = True
-        for i in range(self.num_leds):
-            if not self.set_led(i, color):
-                success = False
+        self.fill(color)
         
-        print(f"Conceptual: All LEDs set to RGB{color}")
-        return success
+        if log.level <= DEBUG:
+            log.debug("led", "All LEDs set to RGB%s", color)
+        return True
     
     def clear_all(self):
         """
@@ -146,37 +248,162 @@ class LEDHandler:
         """
         return self.set_all_leds(self.colors['off'])
     
-    def update_display(self):
+    def update_display(self, force=False):
         """
         Update the physical LED display.
         
-        In a real implementation, this would call the neopixel.write() method
-        to actually update the LED strip with the current states.
+        The GRB pixel buffer is already in WS2812 wire order, so on hardware
+        it is handed to the bit-banging driver as-is with no copy. The transfer
+        is skipped when the frame is identical to the last one pushed.
+        
+        Args:
+            force (bool): Push the frame even if it has not changed
         """
         if not self.is_initialized:
-            print("ERROR: LED handler not initialized! Call setup() first.")
+            log.error("led", "LED handler not initialized! Call setup() first.")
             return False
         
-        print("Conceptual: Updating LED display...")
-        for i, (r, g, b) in enumerate(self.led_states):
-            if r > 0 or g > 0 or b > 0:  # Only print active LEDs
-                print(f"  LED {i}: RGB({r}, {g}, {b})")
+        frame = self.pixels
+        if self.brightness < 255:
+            # Scale into the output copy so the pixel colors stay intact
+            scaled = self._scaled
+            brightness = self.brightness
+            for i in range(len(frame)):
+                scaled[i] = (frame[i] * brightness + 127) // 255
+            frame = scaled
+        
+        if not force and self._has_pushed and frame == self._last_pushed:
+            self.frames_skipped += 1
+            return True
+        
+        self._last_pushed[:] = frame
+        self._has_pushed = True
+        self.frames_pushed += 1
+        
+        if self._data_pin is not None:
+            bitstream(self._data_pin, 0, WS2812_TIMING_NS, frame)
+            return True
+        
+        if log.level <= DEBUG:
+            for i in range(self.num_leds):
+                r, g, b = self.get_led(i)
+                if r > 0 or g > 0 or b > 0:  # Only log active LEDs
+                    log.debug("led", "LED %d: RGB(%d, %d, %d)", i, r, g, b)
         
         return True
     
+    def set_base_animation(self, animation):
+        """
+        Replace the bottom animation layer.
+        
+        Args:
+            animation (Animation): New base animation, or None to keep the
+                                   directly set LED colors as the base
+        """
+        if animation is not None:
+            animation.start(self.clock.ticks_ms())
+        self.base_animation = animation
+    
+    def add_animation(self, animation):
+        """
+        Stack an animation on top of the current layers.
+        
+        Finite animations are removed automatically once finished.
+        
+        Args:
+            animation (Animation): Animation to add
+        """
+        animation.start(self.clock.ticks_ms())
+        self.animations.append(animation)
+    
+    def clear_animations(self):
+        """
+        Remove all animation layers, keeping the current LED colors.
+        """
+        self.base_animation = None
+        self.animations = []
+    
+    def tick(self, now_ms=None):
+        """
+        Advance all animation layers and push the resulting frame.
+        
+        Each layer's frame is computed from the time elapsed since it started,
+        so this never sleeps and can be called at any rate.
+        
+        Args:
+            now_ms (int): Current tick in milliseconds, or None to read the clock
+        
+        Returns:
+            bool: True while overlay animations are still running
+        """
+        if not self.is_initialized:
+            log.error("led", "LED handler not initialized! Call setup() first.")
+            return False
+        
+        if now_ms is None:
+            now_ms = self.clock.ticks_ms()
+        
+        # Directly set colors form the bottom layer when there is no base animation
+        frame = self.pixels
+        frame[:] = self.base_pixels
+        
+        if self.base_animation is not None:
+            elapsed_ms = self.clock.ticks_diff(now_ms, self.base_animation.start_ms)
+            self.base_animation.render(frame, elapsed_ms)
+        
+        # Render overlays bottom-up, dropping finished ones in place
+        i = 0
+        while i < len(self.animations):
+            animation = self.animations[i]
+            elapsed_ms = self.clock.ticks_diff(now_ms, animation.start_ms)
+            if animation.is_finished(elapsed_ms):
+                self.animations.pop(i)
+                continue
+            animation.render(frame, elapsed_ms)
+            i += 1
+        
+        self.update_display()
+        return bool(self.animations)
+    
+    def get_ms_until_next_frame(self, now_ms=None):
+        """
+        Get the time until any animation layer changes the frame.
+        
+        Args:
+            now_ms (int): Current tick in milliseconds, or None to read the clock
+        
+        Returns:
+            int: Milliseconds until tick() has something new to show, or None
+                 while the frame is static
+        """
+        if now_ms is None:
+            now_ms = self.clock.ticks_ms()
+        
+        next_ms = None
+        layers = self.animations
+        if self.base_animation is not None:
+            layers = [self.base_animation] + layers
+        for animation in layers:
+            elapsed_ms = self.clock.ticks_diff(now_ms, animation.start_ms)
+            change_ms = animation.get_ms_until_change(elapsed_ms)
+            if change_ms is not None and (next_ms is None or change_ms < next_ms):
+                next_ms = change_ms
+        return next_ms
+    
     def show_pomodoro_state(self, state, progress_percent=0):
         """
         Display visual feedback for current Pomodoro state.
         
         Args:
-            state (str): Current timer state ('IDLE', 'WORK', 'BREAK_SHORT', 'BREAK_LONG')
+            state (str): Current timer state ('IDLE', 'WORK', 'BREAK_SHORT', 'BREAK_LONG', 'PAUSED')
             progress_percent (float): Progress percentage (0-100)
         """
         if not self.is_initialized:
-            print("ERROR: LED handler not initialized! Call setup() first.")
+            log.error("led", "LED handler not initialized! Call setup() first.")
             return
         
-        print(f"LEDHandler: Showing state '{state}' with {progress_percent}% progress")
+        if log.level <= DEBUG:
+            log.debug("led", "Showing state '%s' with %d%% progress", state, progress_percent)
         
         if state == 'IDLE':
             # Dim white breathing effect
@@ -194,114 +421,89 @@ class LEDHandler:
             # Blue progress bar
             self._show_progress_bar(self.colors['blue'], progress_percent)
         
+        elif state == 'PAUSED':
+            # Orange breathing until resumed
+            self._breathing_effect(self.colors['orange'], 0.5)
+        
         else:
-            print(f"Unknown state: {state}")
-            self.clear_all()
+            log.warning("led", "Unknown state: %s", state)
+            self.set_base_animation(SolidAnimation(self.colors['off']))
         
-        self.update_display()
+        self.tick()
     
     def _show_progress_bar(self, color, progress_percent):
         """
         Display a progress bar using the LED strip.
         
+        Updates the running progress animation in place when the color matches.
+        
         Args:
             color (tuple): RGB color for the progress bar
             progress_percent (float): Progress percentage (0-100)
         """
-        # Clear all LEDs first
-        self.clear_all()
-        
-        # Calculate number of LEDs to light up
-        num_lit = int((progress_percent / 100.0) * self.num_leds)
-        
-        # Light up the appropriate number of LEDs
-        for i in range(num_lit):
-            self.set_led(i, color)
-        
-        # Show partial progress on the next LED if applicable
-        if num_lit < self.num_leds:
-            partial_progress = ((progress_percent / 100.0) * self.num_leds) - num_lit
-            if partial_progress > 0:
-                # Dim the next LED based on partial progress
-                r, g, b = color
-                dimmed_color = (
-                    int(r * partial_progress),
-                    int(g * partial_progress),
-                    int(b * partial_progress)
-                )
-                self.set_led(num_lit, dimmed_color)
+        base = self.base_animation
+        if isinstance(base, ProgressAnimation) and base.color == color:
+            base.progress_percent = progress_percent
+        else:
+            self.set_base_animation(ProgressAnimation(color, progress_percent))
     
     def _breathing_effect(self, base_color, intensity=1.0):
         """
         Create a breathing effect with the specified color.
         
+        The breathing phase follows elapsed time, so it advances smoothly no
+        matter how often the LEDs are refreshed.
+        
         Args:
             base_color (tuple): Base RGB color
             intensity (float): Breathing intensity (0.0-1.0)
         """
-        # Simple breathing calculation using phase
-        import math
-        breathing_factor = (math.sin(self._breathing_phase) + 1) / 2  # 0 to 1
-        breathing_factor *= intensity
-        
-        r, g, b = base_color
-        dimmed_color = (
-            int(r * breathing_factor),
-            int(g * breathing_factor),
-            int(b * breathing_factor)
-        )
-        
-        self.set_all_leds(dimmed_color)
-        self._breathing_phase += 0.1
+        base = self.base_animation
+        if (isinstance(base, BreathingAnimation) and base.color == base_color
+                and base.intensity == intensity):
+            return
+        self.set_base_animation(BreathingAnimation(base_color, intensity=intensity))
     
     def flash_notification(self, color, flash_count=3, duration=0.5):
         """
         Flash LEDs for notifications.
         
+        Returns immediately; the flash runs as an animation layer over the
+        current display and is advanced by tick().
+        
         Args:
             color (tuple): RGB color to flash
             flash_count (int): Number of flashes
             duration (float): Duration of each flash in seconds
         """
         if not self.is_initialized:
-            print("ERROR: LED handler not initialized! Call setup() first.")
+            log.error("led", "LED handler not initialized! Call setup() first.")
             return
         
-        print(f"LEDHandler: Flashing {flash_count} times with color RGB{color}")
-        
-        for i in range(flash_count):
-            # Flash on
-            self.set_all_leds(color)
-            self.update_display()
-            time.sleep(duration / 2)
-            
-            # Flash off
-            self.clear_all()
-            self.update_display()
-            time.sleep(duration / 2)
+        log.debug("led", "Flashing %d times with color RGB%s", flash_count, color)
+        
+        self.add_animation(FlashAnimation(color, flash_count, int(duration * 1000)))
+        self.tick()
     
     def set_brightness(self, brightness):
         """
         Set global brightness for all LEDs.
         
+        The level scales every frame as it is pushed; LED colors and
+        animations are left untouched, so brightness can be lowered and
+        restored without losing anything. Takes effect on the next push.
+        
         Args:
             brightness (float): Brightness level (0.0-1.0)
         """
         if not (0.0 <= brightness <= 1.0):
-            print("ERROR: Brightness must be between 0.0 and 1.0")
+            log.error("led", "Brightness must be between 0.0 and 1.0")
             return False
         
-        print(f"LEDHandler: Setting brightness to {brightness * 100}%")
-        
-        # Apply brightness to all current LED states
-        for i in range(self.num_leds):
-            r, g, b = self.led_states[i]
-            self.led_states[i] = [
-                int(r * brightness),
-                int(g * brightness),
-                int(b * brightness)
-            ]
+        if log.level <= DEBUG:
+            log.debug("led", "Setting brightness to %d%%", int(brightness * 100))
         
+        self.brightness = int(brightness * 255 + 0.5)
         return True
     
     def get_status(self):
@@ -315,8 +517,11 @@ class LEDHandler:
             'initialized': self.is_initialized,
             'pin': self.pin,
             'num_leds': self.num_leds,
-            'led_states': self.led_states.copy(),
-            'animation_running': self._animation_running
+            'led_states': self.led_states,
+            'animation_running': bool(self.animations),
+            'brightness': self.brightness,
+            'frames_pushed': self.frames_pushed,
+            'frames_skipped': self.frames_skipped
         }
 
 
@@ -354,10 +559,12 @@ if leds.setup():
     # Test flash notification
     print("\n--- Testing flash notification ---")
     leds.flash_notification(leds.colors['yellow'], flash_count=3)
+    while leds.tick():  # Advance the flash until it finishes
+        time.sleep(0.05)
     
     # Test different states
     print("\n--- Testing Pomodoro states ---")
-    states = ['IDLE', 'WORK', 'BREAK_SHORT', 'BREAK_LONG']
+    states = ['IDLE', 'WORK', 'BREAK_SHORT', 'BREAK_LONG', 'PAUSED']
     for state in states:
         print(f"Showing state: {state}")
         leds.show_pomodoro_state(state, 50)
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+Level-Filtered Logging for StudyStreak ESP32 Project
+====================================================
+
+This module provides the central logger used instead of print() on the hot
+paths. Records below the configured level are dropped after a single integer
+comparison, before any string is formatted. Accepted records are stored
+unformatted (message template plus arguments) in a preallocated in-RAM ring
+buffer, and are only formatted when echoed to the console or dumped.
+
+For the hottest call sites, guard the call itself so a disabled level costs
+one comparison and no argument tuple:
+
+    if log.level <= DEBUG:
+        log.debug("touch", "T%d raw value: %d", pin, value)
+
+Production builds call log.configure(level=WARNING, echo_level=OFF) so the hot
+paths run with zero formatting and zero UART writes; the ring buffer can still
+be dumped on demand.
+
+Author: StudyStreak Project
+Environment: MicroPython for ESP32
+"""
+
+from clock import system_clock
+
+try:
+    from micropython import const
+except ImportError:
+    def const(value):
+        return value
+
+# Log levels
+DEBUG = const(10)
+INFO = const(20)
+WARNING = const(30)
+ERROR = const(40)
+OFF = const(100)
+
+LEVEL_NAMES = {
+    DEBUG: "DEBUG",
+    INFO: "INFO",
+    WARNING: "WARN",
+    ERROR: "ERROR",
+}
+
+# Default number of records kept in the ring buffer
+DEFAULT_CAPACITY = 64
+
+
+class Logger:
+    """
+    Level-filtered logger backed by a fixed-size ring buffer.
+    """
+
+    def __init__(self, level=INFO, echo_level=INFO, capacity=DEFAULT_CAPACITY, clock=None):
+        """
+        Initialize the logger and preallocate the ring buffer.
+
+        Args:
+            level (int): Records below this level are discarded
+            echo_level (int): Accepted records at or above this level are also
+                              printed to the console (UART); OFF disables echo
+            capacity (int): Number of records kept in RAM
+            clock: Time source (SystemClock or VirtualClock), defaults to the system clock
+        """
+        self.clock = clock if clock is not None else system_clock
+        self.level = level
+        self.echo_level = echo_level
+        self.capacity = max(1, capacity)
+
+        # Parallel preallocated slots; records are overwritten oldest first
+        self._ticks = [0] * self.capacity
+        self._levels = bytearray(self.capacity)
+        self._sources = [None] * self.capacity
+        self._messages = [None] * self.capacity
+        self._args = [None] * self.capacity
+        self._next = 0
+        self._count = 0
+        self.overwritten = 0
+
+    def configure(self, level=None, echo_level=None, clock=None):
+        """
+        Change the filtering levels or time source.
+
+        Args:
+            level (int): New record level, or None to keep the current one
+            echo_level (int): New echo level, or None to keep the current one
+            clock: New time source, or None to keep the current one
+        """
+        if level is not None:
+            self.level = level
+        if echo_level is not None:
+            self.echo_level = echo_level
+        if clock is not None:
+            self.clock = clock
+
+    def is_enabled(self, level):
+        """
+        Args:
+            level (int): Log level
+
+        Returns:
+            bool: True if records at this level are kept
+        """
+        return level >= self.level
+
+    def log(self, level, source, message, *args):
+        """
+        Record a message if its level is enabled.
+
+        Args:
+            level (int): Log level
+            source (str): Short subsystem tag, e.g. "touch"
+            message (str): Message, with %-style placeholders for args
+            *args: Values for the placeholders; formatted lazily
+        """
+        if level < self.level:
+            return
+
+        i = self._next
+        self._ticks[i] = self.clock.ticks_ms()
+        self._levels[i] = level
+        self._sources[i] = source
+        self._messages[i] = message
+        self._args[i] = args
+
+        self._next = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            self.overwritten += 1
+
+        if level >= self.echo_level:
+            print(self._format(i))
+
+    def debug(self, source, message, *args):
+        """Record a DEBUG message."""
+        if DEBUG >= self.level:
+            self.log(DEBUG, source, message, *args)
+
+    def info(self, source, message, *args):
+        """Record an INFO message."""
+        if INFO >= self.level:
+            self.log(INFO, source, message, *args)
+
+    def warning(self, source, message, *args):
+        """Record a WARNING message."""
+        if WARNING >= self.level:
+            self.log(WARNING, source, message, *args)
+
+    def error(self, source, message, *args):
+        """Record an ERROR message."""
+        if ERROR >= self.level:
+            self.log(ERROR, source, message, *args)
+
+    def _format(self, i):
+        """
+        Format the record in slot i.
+
+        Returns:
+            str: "<ticks> <LEVEL> <source>: <message>"
+        """
+        message = self._messages[i]
+        args = self._args[i]
+        if args:
+            try:
+                message = message % args
+            except (TypeError, ValueError):
+                message = "%s %r" % (message, args)
+        level_name = LEVEL_NAMES.get(self._levels[i], str(self._levels[i]))
+        return "%d %s %s: %s" % (self._ticks[i], level_name, self._sources[i], message)
+
+    def records(self):
+        """
+        Format the buffered records, oldest first.
+
+        Returns:
+            list: Formatted record strings
+        """
+        start = (self._next - self._count) % self.capacity
+        return [self._format((start + n) % self.capacity) for n in range(self._count)]
+
+    def dump(self):
+        """
+        Print every buffered record, oldest first.
+        """
+        for line in self.records():
+            print(line)
+
+    def clear(self):
+        """
+        Drop all buffered records.
+        """
+        for i in range(self.capacity):
+            self._sources[i] = None
+            self._messages[i] = None
+            self._args[i] = None
+        self._next = 0
+        self._count = 0
+
+    def get_status(self):
+        """
+        Get logger status.
+
+        Returns:
+            dict: Levels and ring buffer usage
+        """
+        return {
+            'level': LEVEL_NAMES.get(self.level, self.level),
+            'echo_level': LEVEL_NAMES.get(self.echo_level, self.echo_level),
+            'capacity': self.capacity,
+            'buffered': self._count,
+            'overwritten': self.overwritten
+        }
+
+
+# Shared logger used by every StudyStreak module
+log = Logger()
+
+
+# Example usage (commented out for module import)
+"""
+# Example of a production configuration
+
+from logger import log, DEBUG, WARNING, OFF
+
+# Keep warnings and errors in RAM, never write to the UART
+log.configure(level=WARNING, echo_level=OFF)
+
+log.debug("touch", "T%d raw value: %d", 4, 312)   # Dropped after one comparison
+log.error("oled", "I2C write failed")             # Buffered, not printed
+
+# Later, e.g. from a serial command
+log.dump()
+"""
@@ -9,52 +9,380 @@ Author: StudyStreak Project
 Environment: MicroPython for ESP32
 """
 
-import utime
-from pomodoro_logic import PomodoroTimer, STATE_IDLE, STATE_WORK, STATE_BREAK_SHORT
+from clock import system_clock
+from pomodoro_logic import (PomodoroTimer, STATE_IDLE, STATE_WORK, STATE_BREAK_SHORT, STATE_BREAK_LONG,
+                            EVENT_NAMES, EVENT_AWAY, SNAPSHOT_SIZE, POLICY_BREAK_TAKEN,
+                            POLICY_SESSION_ABANDONED)
 from led_handler import LEDHandler
 from oled_handler import OLEDHandler
 from touch_handler import TouchHandler
 from tcrts5000_handler import PresenceSensor
+from scheduler import Scheduler
+from logger import log, DEBUG, INFO
+from profiler import Profiler
+from serial_console import SerialConsole
+from gestures import GESTURE_TAP, GESTURE_LONG_PRESS
+from session_log import SessionLog
+from snapshot_store import SnapshotStore
+from focus_stats import FocusStats
+
+try:
+    import machine
+    import esp32
+except ImportError:
+    machine = None
+    esp32 = None
 
 # Configuration constants
-MAIN_LOOP_DELAY_MS = 200  # Main loop delay to prevent excessive CPU usage
 TOUCH_DEBOUNCE_MS = 300   # Debounce time for touch inputs
+TOUCH_PIN = 4             # Main touch button
+TOUCH_IRQ_PINS = [TOUCH_PIN]  # Touch pins wired to a digital output (TTP223); the rest are polled
+TOUCH_LONG_PRESS_MS = 3000  # Hold time that resets the timer
+TOUCH_DOUBLE_TAP_MS = 0     # No double-tap action, so taps act on release
+TOUCH_HOLD_REPEAT_MS = 0    # No hold-repeat action, so a held press sets no repeat deadline
+# GPIO switching the TCRT5000 IR emitter. The documented 3-pin module
+# (VCC/GND/AO) keeps its emitter lit, so this stays None (plain readings);
+# only set it once the board adds a switched emitter, which enables
+# duty cycling and ambient-light subtraction.
+PRESENCE_EMITTER_PIN = None
+
+# Scheduler task periods
+TIMER_IDLE_PERIOD_MS = 5000     # Timer check while idle/paused (input triggers it sooner)
+TOUCH_IDLE_POLL_MS = 100        # Touch pin scan while nothing is pressed (catches taps of 100 ms+)
+TOUCH_TASK_PERIOD_MS = 50       # Touch pin scan while a polled pin is pressed
+TOUCH_IRQ_PERIOD_MS = 60000     # Safety drain when touch edges arrive by interrupt (edges trigger it)
+TOUCH_WAKE_SLICE_MS = 20        # Longest blocking sleep while touch edges arrive by interrupt
+PRESENCE_TASK_PERIOD_MS = 500   # Presence sampling fallback (the sensor adapts its own rate)
+DISPLAY_REFRESH_MS = 10000      # Fallback OLED refresh (timer changes trigger it sooner)
+LED_REFRESH_MS = 10000          # Fallback LED refresh (timer changes and animations trigger it sooner)
+SERIAL_TASK_PERIOD_MS = 200     # Debug console input poll
+HISTORY_FLUSH_MS = 300000       # Session log flush (at most this much history is lost on power loss)
+
+# Session history on the flash filesystem
+HISTORY_PATH = "sessions.log"
+HISTORY_MAX_BYTES = 64 * 1024   # Rotated to HISTORY_PATH + ".1" beyond this size
+
+# Presence policies
+BREAK_AWAY_FRACTION = 0.6   # A break spent mostly away counts as taken and ends on return
+ABANDON_AFTER_MIN = 15      # Away this long during work abandons the session
+
+# Focus statistics
+DAILY_GOAL_SESSIONS = 1   # Completed work sessions per day that keep the streak
+UTC_OFFSET_S = 0          # Local time offset, so streak days start at local midnight
+
+# Crash-safe timer snapshot (RTC memory on every event, flash slots rate-limited)
+SNAPSHOT_PATH = "snapshot"
+SNAPSHOT_FLASH_INTERVAL_MS = 30000
+
+# Power management: stages entered after the desk has been empty (no presence
+# and no touch) for this long; None disables a stage
+POWER_DIM_AFTER_MS = 60000            # Lower OLED contrast and LED brightness
+POWER_SCREEN_OFF_AFTER_MS = 300000    # OLED off, LEDs off, display/LED tasks stopped
+POWER_LIGHT_SLEEP_AFTER_MS = 900000   # MCU light sleep between scheduler deadlines
+DIMMED_CONTRAST = 16
+DIMMED_LED_BRIGHTNESS = 0.2
+LIGHT_SLEEP_TOUCH_PERIOD_MS = 2000    # Touch scan fallback in light sleep (a touch wakes the MCU)
+
+# Power states
+POWER_ACTIVE = 0
+POWER_DIMMED = 1
+POWER_SCREEN_OFF = 2
+POWER_LIGHT_SLEEP = 3
+
+POWER_STATE_NAMES = {
+    POWER_ACTIVE: "ACTIVE",
+    POWER_DIMMED: "DIMMED",
+    POWER_SCREEN_OFF: "SCREEN_OFF",
+    POWER_LIGHT_SLEEP: "LIGHT_SLEEP"
+}
+
+# Per-stage timing histograms (reported by the "timing" serial command)
+PROFILING_ENABLED = True
+
+# Logging (production: LOG_LEVEL = WARNING, LOG_ECHO_LEVEL = OFF)
+LOG_LEVEL = INFO        # Records below this level are dropped
+LOG_ECHO_LEVEL = INFO   # Records at or above this level are also written to the UART
+
+class PowerManager:
+    """
+    Steps the display, LEDs and MCU down while the desk is empty.
+    
+    ACTIVE -> DIMMED -> SCREEN_OFF -> LIGHT_SLEEP, each after its timeout
+    since the last activity (presence or touch). Any activity returns
+    straight to ACTIVE.
+    """
+    
+    def __init__(self, oled_handler, led_handler, scheduler, clock,
+                 dim_after_ms=POWER_DIM_AFTER_MS, screen_off_after_ms=POWER_SCREEN_OFF_AFTER_MS,
+                 light_sleep_after_ms=POWER_LIGHT_SLEEP_AFTER_MS):
+        """
+        Initialize in the ACTIVE state.
+        
+        Args:
+            oled_handler (OLEDHandler): Display to dim and switch off, or None
+            led_handler (LEDHandler): LEDs to dim and switch off, or None
+            scheduler (Scheduler): Scheduler whose display/LED tasks and idle
+                                   sleep are managed
+            clock: Time source (SystemClock or VirtualClock)
+            dim_after_ms (int): Inactivity before dimming, or None
+            screen_off_after_ms (int): Inactivity before screen-off, or None
+            light_sleep_after_ms (int): Inactivity before light sleep, or None
+        """
+        self.oled_handler = oled_handler
+        self.led_handler = led_handler
+        self.scheduler = scheduler
+        self.clock = clock
+        self.timeouts_ms = (
+            (POWER_LIGHT_SLEEP, light_sleep_after_ms),
+            (POWER_SCREEN_OFF, screen_off_after_ms),
+            (POWER_DIMMED, dim_after_ms)
+        )
+        
+        self.state = POWER_ACTIVE
+        self.last_activity_ms = clock.ticks_ms()
+        # Full contrast when the display never came up (simulation mode)
+        self.active_contrast = oled_handler.contrast if oled_handler is not None else 255
+        self.light_sleeps = 0
+        self._touch_period_ms = None
+        self._woken_by_touch = False
+        self.touch_handler = None
+        self._wake_pins = ()
+    
+    def set_touch_wake(self, touch_handler):
+        """
+        Wake from light sleep when one of the touch handler's interrupt-driven
+        pins goes high.
+        
+        Args:
+            touch_handler (TouchHandler): Handler with interrupts enabled
+        """
+        self.touch_handler = touch_handler
+        if machine is not None:
+            self._wake_pins = tuple(machine.Pin(pin) for pin in touch_handler.get_irq_pins())
+    
+    def note_activity(self):
+        """
+        Record user activity and return to ACTIVE.
+        """
+        self.last_activity_ms = self.clock.ticks_ms()
+        if self.state != POWER_ACTIVE:
+            self._enter(POWER_ACTIVE)
+    
+    def on_touch(self):
+        """
+        Record a touch gesture as activity.
+        
+        Returns:
+            bool: True if the screen was dark, so the touch should only wake
+                  the device and not act on the timer
+        """
+        wake_only = self.state >= POWER_SCREEN_OFF or self._woken_by_touch
+        self._woken_by_touch = False
+        self.note_activity()
+        return wake_only
+    
+    def update(self, present):
+        """
+        Advance the power state for one presence sample. O(1).
+        
+        Args:
+            present (bool): Filtered presence state
+        """
+        if present:
+            self.note_activity()
+            return
+        
+        idle_ms = self.clock.ticks_diff(self.clock.ticks_ms(), self.last_activity_ms)
+        for state, timeout_ms in self.timeouts_ms:
+            if timeout_ms is not None and idle_ms >= timeout_ms:
+                if state > self.state:
+                    self._enter(state)
+                return
+    
+    def is_display_on(self):
+        """
+        Returns:
+            bool: False while the screen is off
+        """
+        return self.state < POWER_SCREEN_OFF
+    
+    def _enter(self, state):
+        """
+        Apply the outputs of a power state.
+        """
+        previous = self.state
+        self.state = state
+        log.info("power", "Power state %s -> %s", POWER_STATE_NAMES[previous], POWER_STATE_NAMES[state])
+        
+        if state < POWER_SCREEN_OFF:
+            if previous >= POWER_SCREEN_OFF:
+                self.scheduler.set_enabled("display", True)
+                self.scheduler.set_enabled("led", True)
+            # The timer task slept until the phase end while the screen was
+            # off; rerun it so the seconds countdown resumes at once
+            self.scheduler.trigger("timer")
+            self.scheduler.trigger("display")
+            self.scheduler.trigger("led")
+        elif previous < POWER_SCREEN_OFF:
+            self.scheduler.set_enabled("display", False)
+            self.scheduler.set_enabled("led", False)
+        
+        try:
+            self._apply_outputs(state, previous)
+        except Exception as e:
+            # A handler that failed to initialize (simulation mode)
+            log.error("power", "Output update error: %s", e)
+        
+        # In light sleep the interrupt-driven touch pins wake the MCU, so the
+        # scan of any polled pins can slow down
+        touch_task = self.scheduler.get_task("touch")
+        if state == POWER_LIGHT_SLEEP:
+            self._configure_wake_sources()
+            self.scheduler.idle_sleep = self._light_sleep
+            self.scheduler.set_enabled("serial", False)
+            if touch_task is not None:
+                self._touch_period_ms = touch_task.period_ms
+                touch_task.period_ms = max(touch_task.period_ms, LIGHT_SLEEP_TOUCH_PERIOD_MS)
+        elif previous == POWER_LIGHT_SLEEP:
+            self.scheduler.idle_sleep = None
+            self.scheduler.set_enabled("serial", True)
+            if touch_task is not None and self._touch_period_ms is not None:
+                touch_task.period_ms = self._touch_period_ms
+    
+    def _apply_outputs(self, state, previous):
+        """
+        Set OLED contrast/power and LED brightness for a power state.
+        """
+        if state < POWER_SCREEN_OFF:
+            if previous >= POWER_SCREEN_OFF:
+                self.oled_handler.display_on()
+            if state == POWER_ACTIVE:
+                self.oled_handler.set_contrast(self.active_contrast)
+                self.led_handler.set_brightness(1.0)
+            else:
+                self.oled_handler.set_contrast(DIMMED_CONTRAST)
+                self.led_handler.set_brightness(DIMMED_LED_BRIGHTNESS)
+        elif previous < POWER_SCREEN_OFF:
+            self.oled_handler.display_off()
+            self.led_handler.set_brightness(0.0)
+            self.led_handler.update_display()
+    
+    def _configure_wake_sources(self):
+        """
+        Let a touch end light sleep early. The TTP223 outputs are digital, so
+        they wake the MCU through EXT1 on a high level. The presence sensor is
+        an analog reading without an interrupt line, so presence is noticed
+        when the timer wake-up at the next presence sample runs the presence
+        task.
+        """
+        if esp32 is None or not self._wake_pins:
+            return
+        try:
+            esp32.wake_on_ext1(pins=self._wake_pins, level=esp32.WAKEUP_ANY_HIGH)
+        except Exception as e:
+            log.error("power", "Touch wake-up unavailable: %s", e)
+    
+    def _light_sleep(self, delay_ms):
+        """
+        Scheduler idle hook: light-sleep the MCU until the next task deadline.
+        """
+        self.light_sleeps += 1
+        if machine is None:
+            self.clock.sleep_ms(delay_ms)
+            return
+        
+        machine.lightsleep(delay_ms)
+        if machine.wake_reason() == machine.EXT1_WAKE:
+            # Back to full speed before the touch task sees the press. The
+            # rising edge came while asleep, so queue the press by hand; its
+            # release still arrives by interrupt.
+            self._woken_by_touch = True
+            self.note_activity()
+            if self.touch_handler is not None:
+                self.touch_handler.sync_irq_pins()
+            self.scheduler.trigger("touch")
+    
+    def get_status(self):
+        """
+        Get power manager status.
+        
+        Returns:
+            dict: Power state and inactivity time
+        """
+        return {
+            'state': POWER_STATE_NAMES[self.state],
+            'idle_ms': self.clock.ticks_diff(self.clock.ticks_ms(), self.last_activity_ms),
+            'light_sleeps': self.light_sleeps
+        }
 
 class StudyStreakController:
     """
     Main application controller that orchestrates all StudyStreak components.
     """
     
-    def __init__(self):
+    def __init__(self, clock=None):
         """
         Initialize the StudyStreak controller and all subsystems.
+        
+        Args:
+            clock: Time source shared by every subsystem (SystemClock or
+                   VirtualClock), defaults to the system clock
         """
         print("🚀 Initializing StudyStreak Controller...")
         
+        self.clock = clock if clock is not None else system_clock
+        log.configure(level=LOG_LEVEL, echo_level=LOG_ECHO_LEVEL, clock=self.clock)
+        
         # Initialize Pomodoro timer (core logic)
-        self.pomodoro_timer = PomodoroTimer(work_mins=25, break_mins=5)
+        self.pomodoro_timer = PomodoroTimer(work_mins=25, break_mins=5, long_break_mins=15,
+                                            cycles_before_long_break=4, clock=self.clock)
+        self.pomodoro_timer.set_presence_policy(BREAK_AWAY_FRACTION, ABANDON_AFTER_MIN)
         print("✅ Pomodoro timer initialized")
         
-        # Initialize hardware handlers
+        # Resume the session interrupted by a reset, if any
+        self.snapshot_store = SnapshotStore(SNAPSHOT_SIZE, path=SNAPSHOT_PATH,
+                                            flash_interval_ms=SNAPSHOT_FLASH_INTERVAL_MS, clock=self.clock)
+        self.resumed = self._restore_session()
+        
+        # Append-only session history on flash
+        self.session_log = SessionLog(HISTORY_PATH, max_bytes=HISTORY_MAX_BYTES)
+        self.pomodoro_timer.add_listener(self._on_timer_event)
+        print("✅ Session history opened")
+        
+        # Streak and focus statistics, rebuilt from the history after a reboot
+        self.focus_stats = FocusStats(daily_goal=DAILY_GOAL_SESSIONS, utc_offset_s=UTC_OFFSET_S)
+        self._rebuild_stats()
+        
+        # Initialize hardware handlers; any that fail stay None (simulation mode)
+        self.led_handler = None
+        self.oled_handler = None
+        self.touch_handler = None
+        self.presence_sensor = None
         try:
             # RGB LED control (WS2812B)
-            self.led_handler = LEDHandler(pin=5, num_leds=8)
+            self.led_handler = LEDHandler(pin=5, num_leds=8, clock=self.clock)
             self.led_handler.setup()
             print("✅ LED handler initialized")
             
             # OLED display management (SSD1306)
-            self.oled_handler = OLEDHandler(width=128, height=64, i2c_address=0x3C)
+            self.oled_handler = OLEDHandler(width=128, height=64, i2c_address=0x3C, clock=self.clock)
             self.oled_handler.setup(i2c_sda_pin=21, i2c_scl_pin=22)
             print("✅ OLED handler initialized")
             
             # Capacitive touch input
-            self.touch_handler = TouchHandler(touch_pins=[4, 2, 15], threshold=500)
+            self.touch_handler = TouchHandler(touch_pins=[4, 2, 15], threshold=500, clock=self.clock)
             self.touch_handler.setup()
-            self.touch_handler.register_callback(4, self._on_touch_event)
+            self.touch_handler.set_gesture_callback(
+                self._on_gesture,
+                long_press_ms=TOUCH_LONG_PRESS_MS,
+                double_tap_ms=TOUCH_DOUBLE_TAP_MS,
+                repeat_ms=TOUCH_HOLD_REPEAT_MS
+            )
             print("✅ Touch handler initialized")
             
             # Presence sensor (TCRT5000)
-            self.presence_sensor = PresenceSensor(conceptual_adc_pin=34, threshold=2500)
+            self.presence_sensor = PresenceSensor(conceptual_adc_pin=34, threshold=2500, clock=self.clock,
+                                                  emitter_pin=PRESENCE_EMITTER_PIN)
             self.presence_sensor.setup_sensor()
             print("✅ Presence sensor initialized")
             
@@ -66,44 +394,116 @@ class StudyStreakController:
         
         # State tracking for input debouncing and system status
         self.last_touch_time_ms = 0
-        self.last_state = STATE_IDLE
+        self.last_state = self.pomodoro_timer.get_state()
         self.presence_detected = True  # Assume present initially
-          # Display welcome message
-        self._show_welcome_message()
+        self.away_since = None         # Wall-clock second the user left during a session
+        self.auto_paused = False       # Timer was paused by absence, not by the user
+        
+        # Timing histograms for each scheduler task plus the timer task's stages
+        self.profiler = Profiler() if PROFILING_ENABLED else None
+        
+        # Cooperative scheduler running each subsystem as its own task
+        self.scheduler = self._create_scheduler()
+        
+        # Display/LED power follows desk occupancy
+        self.power = PowerManager(self.oled_handler, self.led_handler, self.scheduler, self.clock)
+        
+        # Touch edges by interrupt on the pins wired to a digital output. Once
+        # no pin is left to poll, the touch task only runs when an edge
+        # arrives or a gesture deadline is due (plus a rare safety drain).
+        # The blocking loop's sleep is sliced so an edge is handled within
+        # TOUCH_WAKE_SLICE_MS.
+        if self.touch_handler is not None and self.touch_handler.is_initialized:
+            if self.touch_handler.enable_interrupts(TOUCH_IRQ_PINS, on_edge=self._on_touch_irq):
+                self.scheduler.set_period("touch", TOUCH_IRQ_PERIOD_MS)
+            if self.touch_handler.get_irq_pins():
+                self.scheduler.wake_slice_ms = TOUCH_WAKE_SLICE_MS
+                self.power.set_touch_wake(self.touch_handler)
+        
+        # Debug commands over the REPL serial port
+        self.console = self._create_console()
+        
+        # Display welcome message (a resumed session goes straight to its status)
+        if not self.resumed:
+            self._show_welcome_message()
         
         print("🎯 StudyStreak Controller ready!")
     
-    def _on_touch_event(self, event_type, pin):
+    def _on_gesture(self, gesture, pin):
         """
-        Callback function for touch events.
+        Callback function for touch gestures.
+        
+        A tap starts, pauses or resumes the timer; a long press resets it.
         
         Args:
-            event_type (str): 'press' or 'release'
-            pin (int): Touch pin that triggered the event
+            gesture (str): 'tap', 'double_tap', 'long_press' or 'hold_repeat'
+            pin (int): Touch pin the gesture happened on
         """
-        if event_type == 'press':
-            current_time_ms = utime.ticks_ms()
+        if pin != TOUCH_PIN:
+            return
+        
+        # A touch on a dark screen only wakes the device
+        if self.power.on_touch():
+            return
+        
+        if gesture == GESTURE_TAP:
+            current_time_ms = self.clock.ticks_ms()
             
             # Debounce touch input
-            if utime.ticks_diff(current_time_ms, self.last_touch_time_ms) < TOUCH_DEBOUNCE_MS:
+            if self.clock.ticks_diff(current_time_ms, self.last_touch_time_ms) < TOUCH_DEBOUNCE_MS:
                 return
             
             self.last_touch_time_ms = current_time_ms
             
             # Touch action logic based on current state
             if self.pomodoro_timer.get_state() == STATE_IDLE:
-                print("👆 Touch detected: Starting work session")
+                log.info("touch", "👆 Touch detected: Starting work session")
                 self.pomodoro_timer.start_work()
+                self._on_timer_changed()
                 self.oled_handler.show_notification("Session Started", "▶", duration=1.5)
                 self.led_handler.flash_notification(self.led_handler.colors['green'], flash_count=2)
             elif self.pomodoro_timer.is_timer_paused():
-                print("👆 Touch detected: Resuming timer")
+                log.info("touch", "👆 Touch detected: Resuming timer")
                 self.pomodoro_timer.resume()
+                self._on_timer_changed()
                 self.oled_handler.show_notification("Timer Resumed", "▶", duration=1.5)
             else:
-                print("👆 Touch detected: Pausing timer")
+                log.info("touch", "👆 Touch detected: Pausing timer")
                 self.pomodoro_timer.pause()
+                self._on_timer_changed()
                 self.oled_handler.show_notification("Timer Paused", "⏸", duration=1.5)
+        
+        elif gesture == GESTURE_LONG_PRESS:
+            log.info("touch", "🔄 Long press detected: Resetting timer")
+            self.pomodoro_timer.reset()
+            self._on_timer_changed()
+            self.oled_handler.show_notification("Timer Reset", "🔄", duration=2.0)
+            self.led_handler.flash_notification(self.led_handler.colors['purple'], flash_count=3)
+    
+    def _rebuild_stats(self):
+        """
+        Regenerate the focus statistics from the session history.
+        """
+        start_ms = self.clock.ticks_ms()
+        count = self.focus_stats.rebuild(self.session_log.iter_records())
+        log.info("stats", "Rebuilt statistics from %d records in %d ms", count,
+                 self.clock.ticks_diff(self.clock.ticks_ms(), start_ms))
+    
+    def _restore_session(self):
+        """
+        Restore the timer from the latest snapshot.
+        
+        Returns:
+            bool: True if an interrupted session was resumed
+        """
+        start_us = self.clock.ticks_us()
+        resumed = self.pomodoro_timer.restore_snapshot(self.snapshot_store.load())
+        if resumed:
+            log.info("snapshot", "Resumed %s%s in %d us",
+                     self.pomodoro_timer.get_state_name(),
+                     " [PAUSED]" if self.pomodoro_timer.is_timer_paused() else "",
+                     self.clock.ticks_diff(self.clock.ticks_us(), start_us))
+        return resumed
     
     def _show_welcome_message(self):
         """
@@ -122,32 +522,49 @@ class StudyStreakController:
             for color in colors:
                 self.led_handler.set_all_leds(self.led_handler.colors[color])
                 self.led_handler.update_display()
-                utime.sleep_ms(200)
+                self.clock.sleep_ms(200)
             
         except Exception as e:
-            print(f"Welcome message error: {e}")
+            log.error("main", "Welcome message error: %s", e)
     
     def handle_touch_input(self):
         """
         Process touch input to control the Pomodoro timer.
+        
+        Edges feed the gesture recognizer, which reports taps and long
+        presses to _on_gesture without ever waiting for the finger to lift.
+        
+        Returns:
+            int: Milliseconds until a polled press or a pending gesture (e.g.
+                 a long press in progress) must be checked, or None for the
+                 task period
         """
         try:
-            # Touch input is now handled via callbacks in _on_touch_event
-            # This method can be used for additional touch processing if needed
-            touched_pins = self.touch_handler.scan_all_pins()
-              # Handle long press for reset functionality
-            if touched_pins and 4 in touched_pins:
-                if self.touch_handler.detect_long_press(4, duration=3.0):
-                    print("🔄 Long press detected: Resetting timer")
-                    self.pomodoro_timer.reset()
-                    self.oled_handler.show_notification("Timer Reset", "🔄", duration=2.0)
-                    self.led_handler.flash_notification(self.led_handler.colors['purple'], flash_count=3)
-                    
+            self.touch_handler.poll()
+            
+            # Scan quickly only while a polled press is in progress
+            delay_ms = None
+            if self.touch_handler.is_polled_press_active():
+                delay_ms = TOUCH_TASK_PERIOD_MS
+            
+            # Come back exactly when a held press becomes a long press
+            gesture_ms = self.touch_handler.get_ms_until_gesture()
+            if gesture_ms is not None and gesture_ms < (delay_ms or self._touch_task.period_ms):
+                delay_ms = gesture_ms
+            return delay_ms
+            
         except Exception as e:
-            print(f"Touch input error: {e}")
+            log.error("touch", "Touch input error: %s", e)
+        return None
+    
     def handle_presence_sensor(self):
         """
-        Process presence sensor data to automatically pause/resume timer.
+        Process presence sensor data: auto-pause/resume work sessions and
+        apply the timer's presence policies.
+        
+        Returns:
+            int: Milliseconds until the next sample, chosen by the sensor's
+                 adaptive rate, or None for the task period
         """
         try:
             # Read current presence status
@@ -156,28 +573,83 @@ class StudyStreakController:
             # Check for presence state change
             if current_presence != self.presence_detected:
                 self.presence_detected = current_presence
-                
-                # Only auto-pause/resume during active timer states
-                if self.pomodoro_timer.get_state() != STATE_IDLE:
-                    if not self.presence_detected:
-                        print("👤 Presence lost: Auto-pausing timer")
-                        self.pomodoro_timer.pause()
-                        self.oled_handler.show_notification("Auto-Paused", "👤", duration=2.0)
-                        self.led_handler.set_all_leds(self.led_handler.colors['orange'])
-                        self.led_handler.update_display()
-                    elif self.pomodoro_timer.is_timer_paused():
-                        print("👤 Presence detected: Auto-resuming timer")
-                        self.pomodoro_timer.resume()
-                        self.oled_handler.show_notification("Auto-Resumed", "👤", duration=2.0)
+                self._track_away_time()
+            
+            self._apply_presence_policies(current_presence)
+            self.power.update(current_presence)
+            return self.presence_sensor.get_next_sample_ms()
                         
         except Exception as e:
-            print(f"Presence sensor error: {e}")    def update_display(self, current_state, time_str, progress_percent):
+            log.error("presence", "Presence sensor error: %s", e)
+        return None
+    
+    def _apply_presence_policies(self, present):
+        """
+        React to one presence sample. Evaluated on every sample, so a work
+        phase that starts while the desk is empty is paused as well.
+        
+        Breaks keep running while the user is away; that is what they are for.
+        
+        Args:
+            present (bool): Filtered presence state
+        """
+        timer = self.pomodoro_timer
+        action = timer.update_presence(present)
+        
+        if action == POLICY_SESSION_ABANDONED:
+            log.info("presence", "👤 Away for %d min: Session abandoned", ABANDON_AFTER_MIN)
+            self.auto_paused = False
+            # Not a completed session: skip the completion message and flash
+            self.last_state = STATE_IDLE
+            self._on_timer_changed()
+            self.oled_handler.show_notification("Session Ended", "👤", duration=2.0)
+            return
+        
+        if action == POLICY_BREAK_TAKEN:
+            log.info("presence", "👤 Break spent away: Starting next phase")
+            self._on_timer_changed()
+            self.oled_handler.show_notification("Break Taken", "👤", duration=2.0)
+        
+        if not timer.is_timer_paused():
+            self.auto_paused = False
+        
+        if timer.get_state() == STATE_WORK and not present and not timer.is_timer_paused():
+            log.info("presence", "👤 Presence lost: Auto-pausing timer")
+            timer.pause()
+            self.auto_paused = True
+            self._on_timer_changed()
+            self.oled_handler.show_notification("Auto-Paused", "👤", duration=2.0)
+            self.led_handler.set_all_leds(self.led_handler.colors['orange'])
+            self.led_handler.update_display()
+        elif present and self.auto_paused:
+            log.info("presence", "👤 Presence detected: Auto-resuming timer")
+            timer.resume()
+            self.auto_paused = False
+            self._on_timer_changed()
+            self.oled_handler.show_notification("Auto-Resumed", "👤", duration=2.0)
+    
+    def _track_away_time(self):
+        """
+        Record how long the user was away from the desk during a session.
+        """
+        now = self.clock.time()
+        if not self.presence_detected:
+            if self.pomodoro_timer.get_state() != STATE_IDLE:
+                self.away_since = now
+        elif self.away_since is not None:
+            away_ms = max(0, now - self.away_since) * 1000
+            self.away_since = None
+            self.session_log.append(EVENT_AWAY, self.pomodoro_timer.get_state(), now,
+                                    self.pomodoro_timer.session_count, away_ms)
+            self.focus_stats.on_event(EVENT_AWAY, self.pomodoro_timer.get_state(), now, away_ms)
+    
+    def update_display(self, current_state, time_str, progress_percent):
         """
         Update the OLED display with current timer information.
         """
         try:
             # Get session count for display
-            session_count = getattr(self.pomodoro_timer, 'session_count', 0)
+            session_count = self.pomodoro_timer.session_count
             
             # Convert time string to seconds for display handler
             time_parts = time_str.split(':')
@@ -187,18 +659,28 @@ class StudyStreakController:
             else:
                 time_remaining_seconds = 0
             
-            # Convert numeric state to string for display handler
-            state_name = self.pomodoro_timer.get_state_name()
-            
             # Update display based on current state
             self.oled_handler.show_pomodoro_status(
-                state_name, 
+                self._get_display_state_name(), 
                 time_remaining_seconds, 
-                session_count
+                session_count,
+                self.focus_stats.get_current_streak(self.clock.time()),
+                self.pomodoro_timer.get_phase_duration_seconds()
             )
             
         except Exception as e:
-            print(f"Display update error: {e}")def update_led_indicator(self, current_state):
+            log.error("oled", "Display update error: %s", e)
+    
+    def _get_display_state_name(self):
+        """
+        Returns:
+            str: Timer state name for the display and LEDs, 'PAUSED' while paused
+        """
+        if self.pomodoro_timer.is_timer_paused():
+            return 'PAUSED'
+        return self.pomodoro_timer.get_state_name()
+    
+    def update_led_indicator(self, current_state):
         """
         Update RGB LED color and effects based on current Pomodoro state.
         """
@@ -206,25 +688,23 @@ class StudyStreakController:
             # Get progress for LED effects
             progress_percent = self.pomodoro_timer.get_session_progress_percent()
             
-            # Convert numeric state to string for LED handler
-            state_name = self.pomodoro_timer.get_state_name()
-            
             # Update LEDs based on state
-            self.led_handler.show_pomodoro_state(state_name, progress_percent)
+            self.led_handler.show_pomodoro_state(self._get_display_state_name(), progress_percent)
             
         except Exception as e:
-            print(f"LED update error: {e}")
+            log.error("led", "LED update error: %s", e)
+    
     def handle_state_transitions(self, current_state):
         """
         Handle actions when timer state changes (work -> break, etc.).
         """
         if current_state != self.last_state:
-            print(f"🔄 State transition: {self.pomodoro_timer.get_state_name()}")
+            log.info("timer", "🔄 State transition: %s", self.pomodoro_timer.get_state_name())
             
             try:
                 # Trigger notification effects based on state transitions
                 if current_state == STATE_BREAK_SHORT:
-                    print("🎉 Work session completed! Break time!")
+                    log.info("timer", "🎉 Work session completed! Break time!")
                     self.led_handler.flash_notification(
                         self.led_handler.colors['green'], 
                         flash_count=3, 
@@ -236,8 +716,21 @@ class StudyStreakController:
                         duration=3.0
                     )
                     
-                elif current_state == STATE_WORK and self.last_state == STATE_BREAK_SHORT:
-                    print("💪 Break completed! Back to work!")
+                elif current_state == STATE_BREAK_LONG:
+                    log.info("timer", "🏆 Round completed! Long break!")
+                    self.led_handler.flash_notification(
+                        self.led_handler.colors['blue'], 
+                        flash_count=3, 
+                        duration=0.3
+                    )
+                    self.oled_handler.show_message(
+                        "Round Complete!", 
+                        "Take a long break. Stretch and walk!", 
+                        duration=3.0
+                    )
+                    
+                elif current_state == STATE_WORK and self.last_state in (STATE_BREAK_SHORT, STATE_BREAK_LONG):
+                    log.info("timer", "💪 Break completed! Back to work!")
                     self.led_handler.flash_notification(
                         self.led_handler.colors['red'], 
                         flash_count=3, 
@@ -250,14 +743,14 @@ class StudyStreakController:
                     )
                     
                 elif current_state == STATE_IDLE:
-                    print("✅ Timer session completed!")
+                    log.info("timer", "✅ Timer session completed!")
                     self.led_handler.flash_notification(
                         self.led_handler.colors['blue'], 
                         flash_count=5, 
                         duration=0.2
                     )
                     # Get session count for completion message
-                    session_count = getattr(self.pomodoro_timer, 'session_count', 0)
+                    session_count = self.pomodoro_timer.session_count
                     self.oled_handler.show_message(
                         "Session Complete!", 
                         f"Completed {session_count} sessions. Great work!", 
@@ -265,58 +758,265 @@ class StudyStreakController:
                     )
                 
             except Exception as e:
-                print(f"State transition effect error: {e}")
+                log.error("timer", "State transition effect error: %s", e)
             
             self.last_state = current_state
     
+    def _on_timer_event(self, event, state, timestamp, value_ms):
+        """
+        Timer listener: append the session event to the history log.
+        """
+        self.session_log.append(event, state, timestamp, self.pomodoro_timer.session_count, value_ms)
+        self.focus_stats.on_event(event, state, timestamp, value_ms)
+        if log.level <= DEBUG:
+            log.debug("history", "Event %d state %d value %d ms", event, state, value_ms)
+        
+        # Every event changes the resumable state; the snapshot task writes flash
+        self.snapshot_store.save(self.pomodoro_timer.get_snapshot())
+        self.scheduler.trigger_task(self._snapshot_task)
+    
+    def _history_task(self):
+        """
+        Scheduler task: write buffered session records to flash.
+        """
+        self.session_log.flush()
+    
+    def _flush_snapshot(self):
+        """
+        Scheduler task: write a pending snapshot to flash once the rate limit allows.
+        
+        Returns:
+            int: Milliseconds until the pending write is allowed, or None
+        """
+        return self.snapshot_store.service()
+    
+    def _on_touch_irq(self):
+        """
+        Touch ISR hook: run the touch task on the next scheduler pass.
+        """
+        self.scheduler.trigger_task(self._touch_task)
+    
+    def _on_timer_changed(self):
+        """
+        Wake the timer and display tasks after user input changed the timer.
+        """
+        self.scheduler.trigger("timer")
+        self.scheduler.trigger("display")
+    
+    def _timer_task(self):
+        """
+        Scheduler task: advance the Pomodoro timer and react to state changes.
+        
+        Returns:
+            int: Milliseconds until the timer's next observable change
+        """
+        # Update core Pomodoro timer logic
+        start_us = self.clock.ticks_us()
+        self.pomodoro_timer.update()
+        current_state = self.pomodoro_timer.get_state()
+        
+        # Handle state change notifications
+        transitions_us = self.clock.ticks_us()
+        self.handle_state_transitions(current_state)
+        
+        if self.profiler is not None:
+            self._update_stage.record(self.clock.ticks_diff(transitions_us, start_us))
+            self._transitions_stage.record(self.clock.ticks_diff(self.clock.ticks_us(), transitions_us))
+        
+        # Debug output; costs a single comparison when DEBUG is disabled
+        if log.level <= DEBUG and current_state != STATE_IDLE:
+            log.debug("timer", "📊 %s: %s (%.1f%%)%s",
+                      self.pomodoro_timer.get_state_name(),
+                      self.pomodoro_timer.get_remaining_time_str(),
+                      self.pomodoro_timer.get_session_progress_percent(),
+                      " [PAUSED]" if self.pomodoro_timer.is_timer_paused() else "")
+        
+        # The visible countdown changed (or may have); redraw now
+        self.scheduler.trigger("display")
+        self.scheduler.trigger("led")
+        
+        # Sleep until the next second boundary or phase end; with the screen
+        # off nobody sees the seconds, so only the phase end matters
+        next_change_ms = self.pomodoro_timer.get_ms_until_next_change()
+        if next_change_ms is None:
+            return TIMER_IDLE_PERIOD_MS
+        if not self.power.is_display_on():
+            return self.pomodoro_timer.get_remaining_ms()
+        return next_change_ms
+    
+    def _display_task(self):
+        """
+        Scheduler task: render the current timer status on the OLED.
+        
+        Returns:
+            int: Milliseconds until the next overlay expires, or None for the
+                 fallback refresh period
+        """
+        current_state = self.pomodoro_timer.get_state()
+        time_str = self.pomodoro_timer.get_remaining_time_str()
+        progress_percent = self.pomodoro_timer.get_session_progress_percent()
+        self.update_display(current_state, time_str, progress_percent)
+        
+        # Wake again when the current notification overlay expires
+        if self.oled_handler is None:
+            return None
+        expiry_ms = self.oled_handler.get_ms_until_overlay_expiry()
+        if expiry_ms is None:
+            return None
+        return min(expiry_ms, DISPLAY_REFRESH_MS)
+    
+    def _led_task(self):
+        """
+        Scheduler task: advance the LED indicator.
+        
+        Returns:
+            int: Milliseconds until a running animation shows its next frame,
+                 or None for the fallback refresh period while the LEDs are static
+        """
+        self.update_led_indicator(self.pomodoro_timer.get_state())
+        
+        if self.led_handler is None:
+            return None
+        frame_ms = self.led_handler.get_ms_until_next_frame()
+        if frame_ms is None:
+            return None
+        return min(frame_ms, LED_REFRESH_MS)
+    
+    def _create_scheduler(self):
+        """
+        Register every subsystem as its own periodic task.
+        
+        Returns:
+            Scheduler: Scheduler with the timer, touch, presence, display and LED tasks
+        """
+        scheduler = Scheduler(clock=self.clock, profiler=self.profiler)
+        scheduler.add_task("timer", self._timer_task, TIMER_IDLE_PERIOD_MS)
+        self._touch_task = scheduler.add_task("touch", self.handle_touch_input, TOUCH_IDLE_POLL_MS)
+        scheduler.add_task("presence", self.handle_presence_sensor, PRESENCE_TASK_PERIOD_MS)
+        scheduler.add_task("display", self._display_task, DISPLAY_REFRESH_MS)
+        scheduler.add_task("led", self._led_task, LED_REFRESH_MS)
+        scheduler.add_task("history", self._history_task, HISTORY_FLUSH_MS)
+        self._snapshot_task = scheduler.add_task("snapshot", self._flush_snapshot, SNAPSHOT_FLASH_INTERVAL_MS)
+        
+        # Finer stages inside the timer task, resolved once for the hot path
+        if self.profiler is not None:
+            self._update_stage = self.profiler.stage("update")
+            self._transitions_stage = self.profiler.stage("transitions")
+        return scheduler
+    
+    def _create_console(self):
+        """
+        Register the debug commands and, on the board, the console poll task.
+        
+        Returns:
+            SerialConsole: The console (inactive when stdin cannot be polled)
+        """
+        console = SerialConsole()
+        console.register("timing", self._cmd_timing, "Per-stage p50/p99/max in us; 'timing reset' clears")
+        console.register("log", self._cmd_log, "Dump the in-RAM log buffer")
+        console.register("history", self._cmd_history, "Print the last session records ('history N')")
+        console.register("power", self._cmd_power, "Show the power state")
+        console.register("stats", self._cmd_stats, "Focus statistics and streaks; 'stats rebuild' rescans the history")
+        
+        if console.setup():
+            self.scheduler.add_task("serial", console.poll, SERIAL_TASK_PERIOD_MS)
+        return console
+    
+    def _cmd_timing(self, *args):
+        """
+        Serial command: print the timing histograms, or reset them.
+        """
+        if self.profiler is None:
+            print("Profiling is disabled")
+            return
+        
+        if args and args[0] == "reset":
+            self.profiler.reset()
+            print("Timing histograms cleared")
+            return
+        
+        for line in self.profiler.report():
+            print(line)
+    
+    def _cmd_log(self, *args):
+        """
+        Serial command: dump the in-RAM log buffer.
+        """
+        log.dump()
+    
+    def _cmd_power(self, *args):
+        """
+        Serial command: print the power manager status.
+        """
+        print(self.power.get_status())
+    
+    def _cmd_stats(self, *args):
+        """
+        Serial command: print the focus statistics, optionally rebuilding them first.
+        """
+        if args and args[0] == "rebuild":
+            self._rebuild_stats()
+        summary = self.focus_stats.get_summary(self.clock.time())
+        for key in sorted(summary):
+            print("%-16s %d" % (key, summary[key]))
+    
+    def _cmd_history(self, *args):
+        """
+        Serial command: print the most recent session log records.
+        """
+        count = int(args[0]) if args else 10
+        recent = []
+        for record in self.session_log.iter_records():
+            recent.append(record)
+            if len(recent) > count:
+                recent.pop(0)
+        for seq, timestamp, event, state, sessions, value_ms in recent:
+            print("%6d %10d %-14s state=%d sessions=%d %d ms" % (
+                seq, timestamp, EVENT_NAMES.get(event, "?"), state, sessions, value_ms))
+        print(self.session_log.get_status())
+    
     def run(self):
         """
         Main application loop.
+        
+        Runs the cooperative scheduler; each subsystem is serviced at its own
+        period and the CPU idles until the next task deadline. The timer task
+        only wakes when the countdown visibly changes or input arrives.
         """
         print("🏃 Starting StudyStreak main loop...")
         
         try:
-            while True:
-                # Update core Pomodoro timer logic
-                self.pomodoro_timer.update()
-                
-                # Get current timer information
-                current_state = self.pomodoro_timer.get_state()
-                time_str = self.pomodoro_timer.get_remaining_time_str()
-                progress_percent = self.pomodoro_timer.get_session_progress_percent()
-                
-                # Handle input processing
-                self.handle_touch_input()
-                self.handle_presence_sensor()
-                
-                # Handle state change notifications
-                self.handle_state_transitions(current_state)
-                
-                # Update output devices
-                self.update_display(current_state, time_str, progress_percent)
-                self.update_led_indicator(current_state)
-                
-                # Debug output (remove in production)
-                if current_state != STATE_IDLE:
-                    state_name = self.pomodoro_timer.get_state_name()
-                    pause_indicator = " [PAUSED]" if self.pomodoro_timer.is_timer_paused() else ""
-                    print(f"📊 {state_name}: {time_str} ({progress_percent:.1f}%){pause_indicator}")
-                
-                # Main loop delay to prevent excessive CPU usage
-                utime.sleep_ms(MAIN_LOOP_DELAY_MS)
-                
+            self.scheduler.run()
+            
         except KeyboardInterrupt:
             print("\n🛑 StudyStreak stopped by user")
         except Exception as e:
-            print(f"❌ StudyStreak error: {e}")
+            log.error("main", "❌ StudyStreak error: %s", e)
             # TODO: Log error and attempt graceful recovery
         finally:
+            # Keep the buffered session history
+            self.session_log.flush()
             # TODO: Cleanup hardware resources
             # self.led_handler.cleanup()
             # self.oled_handler.cleanup()
             # self.touch_handler.cleanup()
             # self.sensor_handler.cleanup()
             print("🔌 StudyStreak controller shutdown complete")
+    
+    async def run_async(self):
+        """
+        Main application loop as a uasyncio/asyncio coroutine.
+        
+        Use this instead of run() when other coroutines share the event loop.
+        """
+        print("🏃 Starting StudyStreak main loop (async)...")
+        
+        try:
+            await self.scheduler.run_async()
+        finally:
+            self.scheduler.stop()
+            self.session_log.flush()
+            print("🔌 StudyStreak controller shutdown complete")
 
 def main():
     """
@@ -11,6 +11,8 @@ Author: StudyStreak Project
 Version: 1.0 (Specification Compliant)
 """
 
+from framebuffer import FrameBuffer
+
 
 class OledDisplay:
     """
@@ -41,6 +43,9 @@ class OledDisplay:
         # Initialize state
         self.is_initialized = False
         
+        # Shared 1-bpp page-ordered framebuffer (SSD1306 memory layout)
+        self.framebuffer = FrameBuffer(width, height)
+        
         # Initialize display buffer as a dictionary for testing purposes
         self.display_buffer = {
             'line1': '',
@@ -79,6 +84,7 @@ class OledDisplay:
         print("Conceptual: OLED display cleared.")
         
         # Clear the display buffer
+        self.framebuffer.fill(0)
         self.display_buffer = {
             'line1': '',
             'line2': '',
@@ -106,6 +112,7 @@ class OledDisplay:
         
         # Update display buffer based on y coordinate
         self.display_buffer[f'line_at_{y}'] = text
+        self.framebuffer.text(str(text), x, y)
     
     def show_pomodoro_status(self, state_str, time_str):
         """
@@ -13,19 +13,62 @@ Author: StudyStreak Project
 Version: 1.0
 """
 
-import time
+from clock import system_clock
+from framebuffer import FrameBuffer, HeadlessSink, SSD1306I2CSink, CHAR_WIDTH, CHAR_HEIGHT
+from glyph_cache import LargeDigitCache
+from text_layout import LayoutCache, layout_line
+from logger import log, DEBUG, INFO
+
+try:
+    from machine import I2C, Pin
+except ImportError:
+    I2C = None
+    Pin = None
+
+# Maximum number of queued overlays; the oldest is dropped beyond this
+MAX_OVERLAYS = 4
+
+# Line used for the compact status footer while an overlay is shown
+OVERLAY_STATUS_LINE = 7
+
+# Line where the large countdown starts; it spans this line and the next
+COUNTDOWN_LINE = 2
+
+# States whose status screen shows the large countdown
+TIMED_STATES = ('WORK', 'BREAK_SHORT', 'BREAK_LONG', 'PAUSED')
+
+
+class Overlay:
+    """
+    A timed notification or message drawn over the status screen.
+    
+    Overlays expire on their own at expires_ms instead of blocking the caller.
+    """
+    
+    def __init__(self, key, lines, expires_ms):
+        """
+        Initialize an overlay.
+        
+        Args:
+            key (str): Identity used to coalesce repeated overlays
+            lines (list): (line_number, text) pairs to draw centered
+            expires_ms (int): Tick at which the overlay disappears
+        """
+        self.key = key
+        self.lines = lines
+        self.expires_ms = expires_ms
 
 
 class OLEDHandler:
     """
     Handler for SSD1306 OLED display control.
     
-    This class provides conceptual interface for controlling SSD1306 displays
-    without actual hardware interaction. In a real implementation, this
-    would use the ssd1306 library for MicroPython.
+    Text and graphics are rendered into a 1-bpp page-ordered FrameBuffer,
+    which show() hands to a sink: the SSD1306 over I2C on the board, or a
+    HeadlessSink on a host where frames can be inspected or saved as images.
     """
     
-    def __init__(self, width=128, height=64, i2c_address=0x3C):
+    def __init__(self, width=128, height=64, i2c_address=0x3C, clock=None):
         """
         Initialize the OLED handler.
         
@@ -33,13 +76,27 @@ class OLEDHandler:
             width (int): Display width in pixels
             height (int): Display height in pixels
             i2c_address (int): I2C address of the display (typically 0x3C or 0x3D)
+            clock: Time source (SystemClock or VirtualClock), defaults to the system clock
         """
+        self.clock = clock if clock is not None else system_clock
         self.width = width
         self.height = height
         self.i2c_address = i2c_address
         self.is_initialized = False
         
-        # Display buffer simulation
+        # 1-bpp framebuffer in SSD1306 layout; each text line is one 8-pixel page
+        self.framebuffer = FrameBuffer(width, height)
+        self.chars_per_line = width // CHAR_WIDTH
+        self.sink = None
+        
+        # Countdown digits are pre-rasterized once; only changed cells are redrawn
+        self.digit_cache = LargeDigitCache(scale=2)
+        self._status_screen = None
+        
+        # Memoized truncation, centering and word wrap for repeated strings
+        self.layout_cache = LayoutCache()
+        
+        # Text mirror of each line for console output and debugging
         self.display_buffer = []
         self.current_line = 0
         self.current_column = 0
@@ -49,15 +106,28 @@ class OLEDHandler:
         self.is_inverted = False
         self.is_on = True
         
+        # Non-blocking overlay queue (newest last) and last status for redraws
+        self._overlays = []
+        self._last_status = None
+        
+        # Frame diffing: what is on screen and the last frame pushed over I2C
+        self._drawn_key = None
+        self._last_frame = bytearray(len(self.framebuffer.buffer))
+        self._has_pushed = False
+        self.frames_pushed = 0
+        self.frames_skipped = 0
+        
         print(f"OLEDHandler: Created for {width}x{height} display at I2C address 0x{i2c_address:02X}")
     
-    def setup(self, i2c_sda_pin=21, i2c_scl_pin=22):
+    def setup(self, i2c_sda_pin=21, i2c_scl_pin=22, sink=None):
         """
         Initialize the OLED display.
         
         Args:
             i2c_sda_pin (int): GPIO pin for I2C SDA line
             i2c_scl_pin (int): GPIO pin for I2C SCL line
+            sink: Frame sink to use; by default the SSD1306 over I2C when
+                  running on the board, otherwise a HeadlessSink
         
         Returns:
             bool: True if initialization successful, False otherwise
@@ -67,8 +137,15 @@ class OLEDHandler:
         print(f"Conceptual: Display resolution: {self.width}x{self.height}")
         print(f"Conceptual: I2C address: 0x{self.i2c_address:02X}")
         
-        # Simulate initialization delay
-        time.sleep(0.2)
+        if sink is not None:
+            self.sink = sink
+        elif I2C is not None:
+            i2c = I2C(0, sda=Pin(i2c_sda_pin), scl=Pin(i2c_scl_pin), freq=400000)
+            self.sink = SSD1306I2CSink(i2c, self.width, self.height, self.i2c_address)
+        else:
+            self.sink = HeadlessSink(self.width, self.height)
+            # Simulate initialization delay
+            self.clock.sleep(0.2)
         
         # Clear display buffer
         self.clear()
@@ -82,27 +159,52 @@ class OLEDHandler:
         Clear the display buffer and screen.
         """
         if not self.is_initialized:
-            print("ERROR: OLED display not initialized! Call setup() first.")
+            log.error("oled", "OLED display not initialized! Call setup() first.")
             return False
         
+        self.framebuffer.fill(0)
         self.display_buffer = []
         self.current_line = 0
         self.current_column = 0
+        self._drawn_key = None
+        self._status_screen = None
+        self.digit_cache.invalidate()
         
-        print("Conceptual: Display cleared")
+        if log.level <= DEBUG:
+            log.debug("oled", "Display cleared")
         return True
     
-    def show(self):
+    def show(self, force=False):
         """
         Update the physical display with the buffer contents.
         
-        In a real implementation, this would call the display.show() method
-        to push the buffer to the actual OLED display.
+        Hands the framebuffer to the sink (I2C or headless). The transfer is
+        skipped when the framebuffer is identical to the last pushed frame.
+        
+        Args:
+            force (bool): Push the frame even if it has not changed
         """
         if not self.is_initialized:
-            print("ERROR: OLED display not initialized! Call setup() first.")
+            log.error("oled", "OLED display not initialized! Call setup() first.")
             return False
         
+        buffer = self.framebuffer.buffer
+        if not force and self._has_pushed and buffer == self._last_frame:
+            self.framebuffer.mark_clean()
+            self.frames_skipped += 1
+            return True
+        
+        # The sink sends only the dirty page windows unless a full frame is needed
+        full = force or not self._has_pushed
+        self._last_frame[:] = buffer
+        self._has_pushed = True
+        self.frames_pushed += 1
+        self.sink.write(self.framebuffer, full=full)
+        
+        # The console view of a headless display follows the log echo level
+        if not isinstance(self.sink, HeadlessSink) or log.echo_level > INFO:
+            return True
+        
         print("Conceptual: Updating OLED display...")
         print("=" * 32)
         
@@ -116,7 +218,7 @@ class OLEDHandler:
         print("=" * 32)
         return True
     
-    def print_line(self, text, line=None, center=False):
+    def print_line(self, text, line=None, center=False, cached=True):
         """
         Print text on a specific line.
         
@@ -124,9 +226,11 @@ class OLEDHandler:
             text (str): Text to display
             line (int): Line number (0-based), None for current line
             center (bool): Whether to center the text
+            cached (bool): Whether to use the layout cache; pass False for
+                           text that changes every update
         """
         if not self.is_initialized:
-            print("ERROR: OLED display not initialized! Call setup() first.")
+            log.error("oled", "OLED display not initialized! Call setup() first.")
             return False
         
         if line is not None:
@@ -136,19 +240,21 @@ class OLEDHandler:
         while len(self.display_buffer) <= self.current_line:
             self.display_buffer.append("")
         
-        # Format text
-        display_text = str(text)
-        if center and len(display_text) < 20:  # Assuming ~20 chars per line
-            padding = (20 - len(display_text)) // 2
-            display_text = " " * padding + display_text
-        
-        # Truncate if too long
-        if len(display_text) > 20:
-            display_text = display_text[:17] + "..."
+        # Truncate and center (cached for repeated strings)
+        if cached:
+            text, display_text, x = self.layout_cache.line(str(text), self.width, center)
+        else:
+            text, display_text, x = layout_line(str(text), self.width, center)
         
         self.display_buffer[self.current_line] = display_text
         
-        print(f"Conceptual: Line {self.current_line}: '{display_text}'")
+        # Redraw the line's page in the framebuffer
+        y = self.current_line * CHAR_HEIGHT
+        self.framebuffer.fill_rect(0, y, self.width, CHAR_HEIGHT, 0)
+        self.framebuffer.text(text, x, y)
+        
+        if log.level <= DEBUG:
+            log.debug("oled", "Line %d: '%s'", self.current_line, display_text)
         return True
     
     def print_centered(self, text, line=None):
@@ -161,25 +267,71 @@ class OLEDHandler:
         """
         return self.print_line(text, line, center=True)
     
-    def show_pomodoro_status(self, state, time_remaining, session_count=0):
+    def show_pomodoro_status(self, state, time_remaining, session_count=0, streak_days=0, phase_duration=0):
         """
         Display current Pomodoro timer status.
         
+        If a notification or message overlay is active it is drawn instead,
+        with a compact status footer, until it expires.
+        
         Args:
-            state (str): Current timer state ('IDLE', 'WORK', 'BREAK_SHORT', 'BREAK_LONG')
+            state (str): Current timer state ('IDLE', 'WORK', 'BREAK_SHORT', 'BREAK_LONG', 'PAUSED')
             time_remaining (int): Remaining time in seconds
             session_count (int): Number of completed work sessions
+            streak_days (int): Current daily streak, shown on the idle screen
+            phase_duration (int): Full duration of the current phase in seconds,
+                                  for the progress bar (0 hides the bar)
         """
         if not self.is_initialized:
-            print("ERROR: OLED display not initialized! Call setup() first.")
+            log.error("oled", "OLED display not initialized! Call setup() first.")
             return
         
-        self.clear()
+        self._last_status = (state, time_remaining, session_count, streak_days, phase_duration)
+        self._expire_overlays()
+        self._render()
+    
+    def _render(self):
+        """
+        Draw the top overlay, or the last known status if none is active.
         
-        # Format time as MM:SS
-        minutes = time_remaining // 60
-        seconds = time_remaining % 60
-        time_str = f"{minutes:02d}:{seconds:02d}"
+        Skips rebuilding the buffer when the same overlay/status is already on screen.
+        """
+        if self._overlays:
+            key = (self._overlays[-1], self._last_status)
+        else:
+            key = self._last_status
+        
+        if key is not None and key == self._drawn_key:
+            self.frames_skipped += 1
+            return
+        
+        if self._overlays:
+            self._draw_overlay(self._overlays[-1])
+        elif self._last_status is not None:
+            state, time_remaining, session_count, streak_days, phase_duration = self._last_status
+            if self._status_screen == (state, session_count, streak_days) and state in TIMED_STATES:
+                # Same screen, only the time moved: leave the static lines alone
+                self._draw_time(time_remaining, phase_duration)
+            else:
+                self._draw_status(state, time_remaining, session_count, streak_days, phase_duration)
+        else:
+            self.clear()
+        
+        self._drawn_key = key
+        self.show()
+    
+    def _draw_status(self, state, time_remaining, session_count, streak_days=0, phase_duration=0):
+        """
+        Draw the status screen into the buffer.
+        
+        Args:
+            state (str): Current timer state
+            time_remaining (int): Remaining time in seconds
+            session_count (int): Number of completed work sessions
+            streak_days (int): Current daily streak
+            phase_duration (int): Full duration of the current phase in seconds
+        """
+        self.clear()
         
         # Display state-specific information
         if state == 'IDLE':
@@ -188,32 +340,56 @@ class OLEDHandler:
             self.print_centered("Touch to Start", 4)
             if session_count > 0:
                 self.print_centered(f"Sessions: {session_count}", 6)
+            if streak_days > 0:
+                self.print_centered(f"Streak: {streak_days} day{'s' if streak_days != 1 else ''}", 7)
         
         elif state == 'WORK':
             self.print_centered("FOCUS TIME", 0)
-            self.print_centered(time_str, 2)
-            self.show_progress_bar(time_remaining, 25 * 60, line=4)  # 25min work session
             if session_count > 0:
                 self.print_centered(f"Session {session_count + 1}", 6)
         
         elif state == 'BREAK_SHORT':
             self.print_centered("SHORT BREAK", 0)
-            self.print_centered(time_str, 2)
-            self.show_progress_bar(time_remaining, 5 * 60, line=4)  # 5min break
             self.print_centered("Relax a bit!", 6)
         
         elif state == 'BREAK_LONG':
             self.print_centered("LONG BREAK", 0)
-            self.print_centered(time_str, 2)
-            self.show_progress_bar(time_remaining, 15 * 60, line=4)  # 15min break
             self.print_centered("Take a walk!", 6)
         
         elif state == 'PAUSED':
             self.print_centered("PAUSED", 0)
-            self.print_centered(time_str, 2)
-            self.print_centered("Touch to Resume", 4)
+            self.print_centered("Touch to Resume", 6)
         
-        self.show()
+        if state in TIMED_STATES:
+            self._draw_time(time_remaining, phase_duration)
+        self._status_screen = (state, session_count, streak_days)
+    
+    def _draw_time(self, time_remaining, phase_duration):
+        """
+        Draw the large countdown and the progress bar.
+        
+        The countdown is blitted from the digit cache, which skips cells that
+        already show the right character.
+        
+        Args:
+            time_remaining (int): Remaining time in seconds
+            phase_duration (int): Full duration of the current phase in seconds
+        """
+        minutes = time_remaining // 60
+        seconds = time_remaining % 60
+        time_str = f"{minutes:02d}:{seconds:02d}"
+        
+        # Keep the text mirror in step for console output
+        while len(self.display_buffer) <= COUNTDOWN_LINE:
+            self.display_buffer.append("")
+        padding = max(0, (self.chars_per_line - len(time_str)) // 2)
+        self.display_buffer[COUNTDOWN_LINE] = " " * padding + time_str
+        
+        x = (self.width - self.digit_cache.text_width(time_str)) // 2
+        self.digit_cache.draw(self.framebuffer, time_str, x, COUNTDOWN_LINE * CHAR_HEIGHT)
+        
+        if phase_duration > 0:
+            self.show_progress_bar(time_remaining, phase_duration, line=4)
     
     def show_progress_bar(self, current_time, total_time, line=4, width=16):
         """
@@ -240,7 +416,7 @@ class OLEDHandler:
         percentage = int(progress * 100)
         bar_with_percent = f"{bar} {percentage:3d}%"
         
-        self.print_line(bar_with_percent, line)
+        self.print_line(bar_with_percent, line, cached=False)
     
     def show_message(self, title, message, duration=None):
         """
@@ -252,64 +428,135 @@ class OLEDHandler:
             duration (float): Optional auto-dismiss duration in seconds
         """
         if not self.is_initialized:
-            print("ERROR: OLED display not initialized! Call setup() first.")
+            log.error("oled", "OLED display not initialized! Call setup() first.")
             return
         
-        self.clear()
-        self.print_centered(title, 1)
-        self.print_centered("-" * len(title), 2)
-        
-        # Split message into lines if needed
-        words = message.split()
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            if len(current_line + " " + word) <= 20:
-                if current_line:
-                    current_line += " " + word
-                else:
-                    current_line = word
-            else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = word
-        
-        if current_line:
-            lines.append(current_line)
-        
-        # Display message lines
-        for i, line in enumerate(lines[:3]):  # Max 3 lines for message
-            self.print_centered(line, 4 + i)
-        
-        self.show()
+        # Title, underline and wrapped body (cached for repeated messages)
+        overlay_lines = self.layout_cache.message(title, message, self.width)
         
         if duration:
-            print(f"Conceptual: Message will auto-dismiss in {duration} seconds")
-            time.sleep(duration)
+            if log.level <= DEBUG:
+                log.debug("oled", "Message will auto-dismiss in %s seconds", duration)
+            self._push_overlay(title, overlay_lines, duration)
+        else:
             self.clear()
+            for line_number, text in overlay_lines:
+                self.print_centered(text, line_number)
             self.show()
     
     def show_notification(self, text, icon="!", duration=2.0):
         """
         Show a brief notification message.
         
+        Returns immediately; the notification is queued as an overlay and
+        expires by itself after duration seconds.
+        
         Args:
             text (str): Notification text
             icon (str): Icon character to display
-            duration (float): Display duration in seconds
+            duration (float): Display duration in seconds (0 draws it until the next redraw)
         """
         if not self.is_initialized:
-            print("ERROR: OLED display not initialized! Call setup() first.")
+            log.error("oled", "OLED display not initialized! Call setup() first.")
             return
         
-        self.clear()
-        self.print_centered(f"[{icon}]", 1)
-        self.print_centered(text, 3)
-        self.show()
+        overlay_lines = [(1, f"[{icon}]"), (3, text)]
         
         if duration > 0:
-            time.sleep(duration)
+            self._push_overlay(text, overlay_lines, duration)
+        else:
+            self.clear()
+            for line_number, line_text in overlay_lines:
+                self.print_centered(line_text, line_number)
+            self.show()
+    
+    def _push_overlay(self, key, lines, duration):
+        """
+        Queue an overlay and draw it immediately.
+        
+        An overlay with the same key replaces the queued one (coalescing
+        repeats) and the oldest overlay is dropped when the queue is full.
+        
+        Args:
+            key (str): Identity used to coalesce repeated overlays
+            lines (list): (line_number, text) pairs to draw centered
+            duration (float): Display duration in seconds
+        """
+        expires_ms = self.clock.ticks_add(self.clock.ticks_ms(), int(duration * 1000))
+        
+        for overlay in self._overlays:
+            if overlay.key == key:
+                self._overlays.remove(overlay)
+                break
+        
+        self._overlays.append(Overlay(key, lines, expires_ms))
+        if len(self._overlays) > MAX_OVERLAYS:
+            self._overlays.pop(0)
+        
+        self._render()
+    
+    def _expire_overlays(self):
+        """
+        Drop overlays whose display time has passed.
+        
+        Returns:
+            bool: True if any overlay expired
+        """
+        if not self._overlays:
+            return False
+        
+        now_ms = self.clock.ticks_ms()
+        active = [o for o in self._overlays if self.clock.ticks_diff(o.expires_ms, now_ms) > 0]
+        expired = len(active) != len(self._overlays)
+        self._overlays = active
+        return expired
+    
+    def _draw_overlay(self, overlay):
+        """
+        Draw an overlay into the buffer with a compact status footer.
+        
+        Args:
+            overlay (Overlay): Overlay to draw
+        """
+        self.clear()
+        for line_number, text in overlay.lines:
+            self.print_centered(text, line_number)
+        
+        if self._last_status is not None:
+            state, time_remaining = self._last_status[:2]
+            if state != 'IDLE':
+                minutes = time_remaining // 60
+                seconds = time_remaining % 60
+                self.print_line(f"{state} {minutes:02d}:{seconds:02d}", OVERLAY_STATUS_LINE,
+                                center=True, cached=False)
+    
+    def update(self):
+        """
+        Expire finished overlays and redraw if the visible screen changed.
+        
+        Call this from the display task; it never blocks.
+        
+        Returns:
+            bool: True if the screen was redrawn
+        """
+        if not self.is_initialized or not self._expire_overlays():
+            return False
+        
+        self._render()
+        return True
+    
+    def get_ms_until_overlay_expiry(self):
+        """
+        Get the time until the next overlay expires.
+        
+        Returns:
+            int: Milliseconds until the earliest expiry, or None if no overlay is queued
+        """
+        if not self._overlays:
+            return None
+        
+        now_ms = self.clock.ticks_ms()
+        return max(0, min(self.clock.ticks_diff(o.expires_ms, now_ms) for o in self._overlays))
     
     def set_contrast(self, contrast):
         """
@@ -319,10 +566,12 @@ class OLEDHandler:
             contrast (int): Contrast value (0-255)
         """
         if not (0 <= contrast <= 255):
-            print("ERROR: Contrast must be between 0 and 255")
+            log.error("oled", "Contrast must be between 0 and 255")
             return False
         
         self.contrast = contrast
+        if self.sink is not None:
+            self.sink.contrast(contrast)
         print(f"Conceptual: Display contrast set to {contrast}")
         return True
     
@@ -334,18 +583,25 @@ class OLEDHandler:
             invert (bool): True to invert display, False for normal
         """
         self.is_inverted = invert
+        if self.sink is not None:
+            self.sink.invert(invert)
         print(f"Conceptual: Display inversion {'enabled' if invert else 'disabled'}")
         return True
     
     def display_on(self):
         """Turn the display on."""
         self.is_on = True
+        self._has_pushed = False  # Repush the full frame on the next show()
+        if self.sink is not None:
+            self.sink.power(True)
         print("Conceptual: Display turned ON")
         return True
     
     def display_off(self):
         """Turn the display off."""
         self.is_on = False
+        if self.sink is not None:
+            self.sink.power(False)
         print("Conceptual: Display turned OFF")
         return True
     
@@ -364,7 +620,12 @@ class OLEDHandler:
             'contrast': self.contrast,
             'inverted': self.is_inverted,
             'display_on': self.is_on,
-            'buffer_lines': len(self.display_buffer)
+            'buffer_lines': len(self.display_buffer),
+            'overlays_queued': len(self._overlays),
+            'frames_pushed': self.frames_pushed,
+            'frames_skipped': self.frames_skipped,
+            'bytes_sent': self.sink.bytes_sent if self.sink is not None else 0,
+            'layout_cache': self.layout_cache.get_stats()
         }
 
 
@@ -398,7 +659,7 @@ if oled.setup(i2c_sda_pin=21, i2c_scl_pin=22):
     
     for state, time_remaining, session_count in states:
         print(f"Showing state: {state}")
-        oled.show_pomodoro_status(state, time_remaining, session_count)
+        oled.show_pomodoro_status(state, time_remaining, session_count, phase_duration=time_remaining)
         time.sleep(3)
     
     # Test message display
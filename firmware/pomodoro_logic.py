@@ -5,20 +5,100 @@ StudyStreak Pomodoro Timer Logic Module
 This module provides the core Pomodoro timer logic for the ESP32-based StudyStreak project.
 It manages timing and state transitions without any hardware interaction.
 
+Phases follow a schedule table, by default four work sessions with short
+breaks in between and a long break after the fourth. The table is compiled
+once into parallel state/duration arrays, and a cursor steps through them.
+
+Every session event (start, pause, resume, phase complete, reset) is reported
+to registered listeners, which is how the session history and statistics are
+kept without the timer knowing about storage. The timer state can also be
+packed into a small fixed-size snapshot and restored after a reset.
+
+Presence policies react to the filtered presence stream in O(1) per sample:
+a break the user spent mostly away from the desk counts as taken and ends
+when they return, and a work session abandoned for too long is ended and
+logged instead of waiting paused indefinitely.
+
 Author: StudyStreak Project
 Environment: MicroPython for ESP32
 """
 
-import utime
+import struct
+
+from clock import system_clock
 
 # State constants
 STATE_IDLE = 0
 STATE_WORK = 1
 STATE_BREAK_SHORT = 2
+STATE_BREAK_LONG = 3
+
+# Session events reported to listeners
+EVENT_START = 1            # A phase started (value: phase duration in ms)
+EVENT_PAUSE = 2            # Timer paused (value: remaining ms)
+EVENT_RESUME = 3           # Timer resumed (value: ms spent paused)
+EVENT_PHASE_COMPLETE = 4   # A phase ran to its end (value: phase duration in ms)
+EVENT_RESET = 5            # Timer reset to IDLE (value: ms elapsed in the abandoned phase)
+EVENT_AWAY = 6             # User came back to the desk (value: ms away); reported by the controller
+EVENT_ABANDON = 7          # Work session ended by the presence policy (value: ms elapsed)
+
+EVENT_NAMES = {
+    EVENT_START: "START",
+    EVENT_PAUSE: "PAUSE",
+    EVENT_RESUME: "RESUME",
+    EVENT_PHASE_COMPLETE: "PHASE_COMPLETE",
+    EVENT_RESET: "RESET",
+    EVENT_AWAY: "AWAY",
+    EVENT_ABANDON: "ABANDON"
+}
+
+# Presence policy actions returned by update_presence()
+POLICY_NONE = 0
+POLICY_BREAK_TAKEN = 1        # Break ended early, the user was away for most of it
+POLICY_SESSION_ABANDONED = 2  # Work session ended after a long absence
+
+# Snapshot layout: version, state, paused, phase_index, session_count,
+# phase_duration_ms, remaining_ms, saved_at (wall-clock seconds)
+SNAPSHOT_VERSION = 2
+SNAPSHOT_FORMAT = "<BBBBHIiI"
+SNAPSHOT_SIZE = struct.calcsize(SNAPSHOT_FORMAT)
 
 # Default durations in minutes (configurable)
 DEFAULT_WORK_DURATION_MIN = 45
 DEFAULT_BREAK_SHORT_DURATION_MIN = 5
+DEFAULT_BREAK_LONG_DURATION_MIN = 15
+DEFAULT_CYCLES_BEFORE_LONG_BREAK = 4
+
+# Presence policy defaults
+DEFAULT_BREAK_AWAY_FRACTION = 0.6   # Share of a break spent away that counts it as taken
+DEFAULT_ABANDON_AFTER_MIN = 15      # Absence that abandons a work session
+
+def build_schedule(work_mins, break_mins, long_break_mins=DEFAULT_BREAK_LONG_DURATION_MIN,
+                   cycles=DEFAULT_CYCLES_BEFORE_LONG_BREAK):
+    """
+    Build the standard Pomodoro schedule: cycles x (work + short break),
+    with the last short break replaced by a long break.
+    
+    Args:
+        work_mins (int): Work session duration in minutes
+        break_mins (int): Short break duration in minutes
+        long_break_mins (int): Long break duration in minutes, or None for no long break
+        cycles (int): Work sessions per round, ending with the long break
+        
+    Returns:
+        list: (state, minutes) phases, repeated from the start after the last one
+    """
+    if not long_break_mins or cycles < 1:
+        return [(STATE_WORK, work_mins), (STATE_BREAK_SHORT, break_mins)]
+    
+    schedule = []
+    for cycle in range(cycles):
+        schedule.append((STATE_WORK, work_mins))
+        if cycle == cycles - 1:
+            schedule.append((STATE_BREAK_LONG, long_break_mins))
+        else:
+            schedule.append((STATE_BREAK_SHORT, break_mins))
+    return schedule
 
 class PomodoroTimer:
     """
@@ -28,119 +108,438 @@ class PomodoroTimer:
     current state and remaining time without any hardware dependencies.
     """
     
-    def __init__(self, work_mins=DEFAULT_WORK_DURATION_MIN, break_mins=DEFAULT_BREAK_SHORT_DURATION_MIN):
+    def __init__(self, work_mins=DEFAULT_WORK_DURATION_MIN, break_mins=DEFAULT_BREAK_SHORT_DURATION_MIN,
+                 clock=None, long_break_mins=DEFAULT_BREAK_LONG_DURATION_MIN,
+                 cycles_before_long_break=DEFAULT_CYCLES_BEFORE_LONG_BREAK, schedule=None):
         """
         Initialize the Pomodoro timer.
         
         Args:
             work_mins (int): Work session duration in minutes (default: 45)
             break_mins (int): Short break duration in minutes (default: 5)
+            clock: Time source (SystemClock or VirtualClock), defaults to the system clock
+            long_break_mins (int): Long break duration in minutes, or None for
+                                   plain work/short-break alternation (default: 15)
+            cycles_before_long_break (int): Work sessions before each long break (default: 4)
+            schedule (list): Custom (state, minutes) phase table; overrides the
+                             durations above
         """
-        # Convert minutes to seconds for internal use
-        self.work_duration_seconds = work_mins * 60
-        self.break_duration_seconds = break_mins * 60
+        self.clock = clock if clock is not None else system_clock
+        
+        if schedule is None:
+            schedule = build_schedule(work_mins, break_mins, long_break_mins, cycles_before_long_break)
+        self.set_schedule(schedule)
         
         # State management
         self.current_state = STATE_IDLE
         self.is_paused = False
         
-        # Time tracking
-        self.start_time_ms = 0
-        self.remaining_time_seconds = 0
+        # Time tracking (absolute deadline in ticks, so no error accumulates)
+        self.phase_index = 0
+        self.phase_duration_ms = 0
+        self.deadline_ms = 0
+        self.paused_remaining_ms = 0
+        self.paused_at_ms = 0
+        
+        # Completed work sessions (kept across resets by the snapshot)
+        self.session_count = 0
+        
+        # Session event listeners: listener(event, state, timestamp, value_ms)
+        self.listeners = []
+        
+        # Presence policies (see update_presence)
+        self.break_away_fraction = DEFAULT_BREAK_AWAY_FRACTION
+        self.abandon_after_ms = DEFAULT_ABANDON_AFTER_MIN * 60000
+        self._away_since_ms = None   # Tick the current absence started (clipped to the phase start)
+        self._phase_away_ms = 0      # Completed absences within the current phase
+        
+    def set_schedule(self, schedule):
+        """
+        Compile a phase table into the arrays the timer steps through.
+        
+        Takes effect from the next phase; the running phase keeps its duration.
+        
+        Args:
+            schedule (list): (state, minutes) phases; must contain a work phase
+        """
+        states = bytearray(len(schedule))
+        durations_ms = [0] * len(schedule)
+        for index, (state, minutes) in enumerate(schedule):
+            if state not in (STATE_WORK, STATE_BREAK_SHORT, STATE_BREAK_LONG) or minutes <= 0:
+                raise ValueError("Invalid schedule phase: %r" % ((state, minutes),))
+            states[index] = state
+            durations_ms[index] = int(minutes * 60000)
+        if STATE_WORK not in states:
+            raise ValueError("Schedule needs a work phase")
+        
+        self.phase_states = states
+        self.phase_durations_ms = durations_ms
+        self.cycle_ms = sum(durations_ms)
+        self.phase_index = 0
+        
+    def _find_phase(self, states, start_index):
+        """
+        Returns:
+            int: Index of the first phase at or after start_index (wrapping)
+                 whose state is in states
+        """
+        count = len(self.phase_states)
+        for offset in range(count):
+            index = (start_index + offset) % count
+            if self.phase_states[index] in states:
+                return index
+        return None
+        
+    def set_presence_policy(self, break_away_fraction=DEFAULT_BREAK_AWAY_FRACTION,
+                            abandon_after_mins=DEFAULT_ABANDON_AFTER_MIN):
+        """
+        Configure the presence policies.
+        
+        Args:
+            break_away_fraction (float): Share of a break spent away after which
+                                         the break ends when the user returns,
+                                         or None to disable
+            abandon_after_mins (float): Absence during work that abandons the
+                                        session, or None to disable
+        """
+        self.break_away_fraction = break_away_fraction
+        self.abandon_after_ms = None if abandon_after_mins is None else int(abandon_after_mins * 60000)
+        
+    def add_listener(self, listener):
+        """
+        Register a session event listener.
+        
+        Args:
+            listener (callable): Called as listener(event, state, timestamp, value_ms)
+                                 where timestamp is wall-clock seconds and the
+                                 meaning of value_ms depends on the event
+        """
+        self.listeners.append(listener)
+        
+    def _emit(self, event, state, value_ms, at_ms=None):
+        """
+        Report a session event to every listener.
+        
+        Args:
+            event (int): EVENT_* constant
+            state (int): Phase the event refers to
+            value_ms (int): Event-specific duration in milliseconds
+            at_ms (int): Tick at which the event happened, or None for now
+        """
+        if not self.listeners:
+            return
+        
+        timestamp = self.clock.time()
+        if at_ms is not None:
+            # Events found late by update() are dated when they happened
+            timestamp -= self.clock.ticks_diff(self.clock.ticks_ms(), at_ms) // 1000
+        
+        for listener in self.listeners:
+            listener(event, state, timestamp, value_ms)
+        
+    def _start_phase(self, index, start_ms=None):
+        """
+        Enter schedule phase index, ending its duration after start_ms.
+        
+        Args:
+            index (int): Position in the schedule table
+            start_ms (int): Tick at which the phase starts, or None for now
+        """
+        if start_ms is None:
+            start_ms = self.clock.ticks_ms()
+        
+        state = self.phase_states[index]
+        self.phase_index = index
+        self.current_state = state
+        self.phase_duration_ms = self.phase_durations_ms[index]
+        self.deadline_ms = self.clock.ticks_add(start_ms, self.phase_duration_ms)
+        self.paused_remaining_ms = 0
+        self.is_paused = False
+        
+        # Absence is accounted per phase
+        self._phase_away_ms = 0
+        if self._away_since_ms is not None and self.clock.ticks_diff(start_ms, self._away_since_ms) > 0:
+            self._away_since_ms = start_ms
+        
+        self._emit(EVENT_START, state, self.phase_duration_ms, start_ms)
         
     def start_work(self):
         """
         Start a work session.
         
-        Transitions to STATE_WORK and initializes timing.
+        Transitions to STATE_WORK and sets the session deadline. From IDLE the
+        schedule starts from the top; otherwise it skips to the next work phase.
         """
-        self.current_state = STATE_WORK
-        self.remaining_time_seconds = self.work_duration_seconds
-        self.start_time_ms = utime.ticks_ms()
-        self.is_paused = False
+        start = 0 if self.current_state == STATE_IDLE else self.phase_index + 1
+        self._start_phase(self._find_phase((STATE_WORK,), start))
         
     def start_break(self):
         """
         Start a short break session.
         
-        Transitions to STATE_BREAK_SHORT and initializes timing.
+        Skips to the next break in the schedule (short or long) and sets the
+        session deadline. A schedule without breaks restarts the work phase.
         """
-        self.current_state = STATE_BREAK_SHORT
-        self.remaining_time_seconds = self.break_duration_seconds
-        self.start_time_ms = utime.ticks_ms()
-        self.is_paused = False
+        start = 0 if self.current_state == STATE_IDLE else self.phase_index + 1
+        index = self._find_phase((STATE_BREAK_SHORT, STATE_BREAK_LONG), start)
+        if index is None:
+            index = self._find_phase((STATE_WORK,), start)
+        self._start_phase(index)
+        
     def pause(self):
         """
         Pause the current session.
         
         Can only pause when not in IDLE state and not already paused.
-        Preserves current remaining_time_seconds.
+        Freezes the remaining time in milliseconds.
         """
         if self.current_state != STATE_IDLE and not self.is_paused:
+            self.paused_remaining_ms = self.get_remaining_ms()
+            self.paused_at_ms = self.clock.ticks_ms()
             self.is_paused = True
+            self._emit(EVENT_PAUSE, self.current_state, self.paused_remaining_ms)
             
     def resume(self):
         """
         Resume a paused session.
         
-        Updates start_time_ms to current time to continue from where paused.
+        Moves the deadline forward so the session continues from where it paused.
         """
         if self.is_paused:
+            now_ms = self.clock.ticks_ms()
             self.is_paused = False
-            self.start_time_ms = utime.ticks_ms()
+            self.deadline_ms = self.clock.ticks_add(now_ms, self.paused_remaining_ms)
+            self.paused_remaining_ms = 0
+            self._emit(EVENT_RESUME, self.current_state, self.clock.ticks_diff(now_ms, self.paused_at_ms))
             
     def reset(self):
         """
         Reset the timer to IDLE state.
         
-        Clears all timing and state information.
+        Clears all timing and state information. Listeners are told after
+        the timer is IDLE, so a snapshot taken on the event is already idle.
+        """
+        self._clear_with_event(EVENT_RESET)
+        
+    def abandon(self):
+        """
+        End the current session because the user left, and return to IDLE.
+        
+        Same as reset(), but reported as EVENT_ABANDON.
+        """
+        self._clear_with_event(EVENT_ABANDON)
+        
+    def _clear_with_event(self, event):
+        """
+        Return to IDLE, then report the phase that ended and its elapsed time.
+        """
+        if self.current_state == STATE_IDLE:
+            self._clear()
+            return
+        state = self.current_state
+        elapsed_ms = self.phase_duration_ms - self.get_remaining_ms()
+        self._clear()
+        self._emit(event, state, elapsed_ms)
+        
+    def _clear(self):
+        """
+        Return to IDLE without reporting an event.
         """
         self.current_state = STATE_IDLE
         self.is_paused = False
-        self.start_time_ms = 0
-        self.remaining_time_seconds = 0
+        self.phase_duration_ms = 0
+        self.deadline_ms = 0
+        self.paused_remaining_ms = 0
+        
+    def get_snapshot(self):
+        """
+        Pack the timer state into a fixed-size snapshot.
+        
+        Tick values do not survive a reset, so the deadline is stored as the
+        remaining time together with the wall-clock time of the snapshot.
+        
+        Returns:
+            bytes: SNAPSHOT_SIZE bytes for restore_snapshot()
+        """
+        return struct.pack(SNAPSHOT_FORMAT, SNAPSHOT_VERSION, self.current_state,
+                           1 if self.is_paused else 0, self.phase_index & 0xFF, self.session_count & 0xFFFF,
+                           self.phase_duration_ms, self.get_remaining_ms(),
+                           self.clock.time() & 0xFFFFFFFF)
+        
+    def restore_snapshot(self, data):
+        """
+        Continue the session described by a snapshot from get_snapshot().
+        
+        A running phase loses the wall-clock time that passed since the
+        snapshot; phases that ended meanwhile are completed by the next
+        update(). If the wall clock is not trustworthy (it went backwards, as
+        after a power-on reset), the session is restored paused instead. No
+        listener events are emitted.
+        
+        Args:
+            data (bytes): Snapshot contents
+            
+        Returns:
+            bool: True if a session was resumed, False if the timer stays IDLE
+        """
+        if data is None or len(data) != SNAPSHOT_SIZE:
+            return False
+        
+        (version, state, paused, phase_index, session_count,
+         phase_duration_ms, remaining_ms, saved_at) = struct.unpack(SNAPSHOT_FORMAT, data)
+        if version != SNAPSHOT_VERSION:
+            return False
+        
+        self.session_count = session_count
+        if state == STATE_IDLE:
+            return False
+        
+        # The schedule may have changed since; fall back to any phase of that state
+        if phase_index >= len(self.phase_states) or self.phase_states[phase_index] != state:
+            phase_index = self._find_phase((state,), 0)
+            if phase_index is None:
+                return False
+        
+        now_ms = self.clock.ticks_ms()
+        elapsed_ms = (self.clock.time() - saved_at) * 1000
+        if elapsed_ms < 0:
+            paused = 1
+        
+        if not paused:
+            remaining_ms -= elapsed_ms
+            # Too long ago to replay the missed phases; start fresh
+            if remaining_ms < -self.cycle_ms:
+                return False
+        
+        self.phase_index = phase_index
+        self.current_state = state
+        self.phase_duration_ms = phase_duration_ms
+        self.is_paused = bool(paused)
+        if self.is_paused:
+            self.paused_remaining_ms = max(0, remaining_ms)
+            self.paused_at_ms = now_ms
+            self.deadline_ms = 0
+        else:
+            self.paused_remaining_ms = 0
+            self.deadline_ms = self.clock.ticks_add(now_ms, remaining_ms)
+        return True
         
     def update(self):
         """
-        Update the timer state and remaining time.
+        Update the timer state.
         
-        This method should be called frequently from the main application loop.
-        Handles automatic state transitions when sessions complete.
+        This method should be called from the main application loop, at any rate.
+        Remaining time is derived from the absolute deadline, so neither frequent
+        nor infrequent calls accumulate error. Handles automatic state transitions
+        when sessions complete; the next phase starts at the previous deadline.
         """
         # Only update if not IDLE and not paused
         if self.current_state == STATE_IDLE or self.is_paused:
             return
             
-        # Calculate elapsed time since start or resume
-        current_time_ms = utime.ticks_ms()
-        elapsed_ms = utime.ticks_diff(current_time_ms, self.start_time_ms)
-        elapsed_seconds = elapsed_ms // 1000
+        current_time_ms = self.clock.ticks_ms()
         
-        # Only process if at least 1 second has elapsed
-        if elapsed_seconds == 0:
-            return
+        # Check for session completion and handle state transitions
+        while self.clock.ticks_diff(self.deadline_ms, current_time_ms) <= 0:
+            self._complete_phase(self.deadline_ms)
+            
+    def _complete_phase(self, end_ms):
+        """
+        Finish the current phase at end_ms and start the next one from the table.
         
-        # Update remaining time
-        self.remaining_time_seconds -= elapsed_seconds
+        Args:
+            end_ms (int): Tick at which the phase ended
+        """
+        if self.current_state == STATE_WORK:
+            self.session_count += 1
+        self._emit(EVENT_PHASE_COMPLETE, self.current_state, self.phase_duration_ms, end_ms)
         
-        # Update start time for next calculation
-        self.start_time_ms = current_time_ms
+        # The schedule repeats after its last phase
+        next_index = self.phase_index + 1
+        if next_index == len(self.phase_states):
+            next_index = 0
+        self._start_phase(next_index, end_ms)
         
-        # Check for session completion and handle state transitions
-        if self.remaining_time_seconds <= 0:
-            if self.current_state == STATE_WORK:
-                # Work session completed, start break
-                self.start_break()
-            elif self.current_state == STATE_BREAK_SHORT:
-                # Break completed, start new work session
-                self.start_work()
+    def update_presence(self, present):
+        """
+        Apply the presence policies to one filtered presence sample.
+        
+        O(1) per call; call it for every sample, not only on changes, so the
+        abandon timeout is noticed while the user stays away.
+        
+        Args:
+            present (bool): Whether the user is at the desk
+            
+        Returns:
+            int: POLICY_NONE, POLICY_BREAK_TAKEN or POLICY_SESSION_ABANDONED
+        """
+        now_ms = self.clock.ticks_ms()
+        
+        if not present:
+            if self._away_since_ms is None:
+                self._away_since_ms = now_ms
+            if (self.current_state == STATE_WORK and self.abandon_after_ms is not None
+                    and self.clock.ticks_diff(now_ms, self._away_since_ms) >= self.abandon_after_ms):
+                self.abandon()
+                return POLICY_SESSION_ABANDONED
+            return POLICY_NONE
+        
+        if self._away_since_ms is None:
+            return POLICY_NONE
+        
+        # Back at the desk: close the absence
+        self._phase_away_ms += self.clock.ticks_diff(now_ms, self._away_since_ms)
+        self._away_since_ms = None
+        
+        if ((self.current_state == STATE_BREAK_SHORT or self.current_state == STATE_BREAK_LONG)
+                and self.break_away_fraction is not None and not self.is_paused
+                and self._phase_away_ms >= self.phase_duration_ms * self.break_away_fraction):
+            self._complete_phase(now_ms)
+            return POLICY_BREAK_TAKEN
+        return POLICY_NONE
                 
+    def get_remaining_ms(self):
+        """
+        Get remaining time in milliseconds.
+        
+        Returns:
+            int: Remaining milliseconds (minimum 0), or 0 if IDLE
+        """
+        if self.current_state == STATE_IDLE:
+            return 0
+        if self.is_paused:
+            return self.paused_remaining_ms
+        return max(0, self.clock.ticks_diff(self.deadline_ms, self.clock.ticks_ms()))
+        
+    def get_ms_until_next_change(self):
+        """
+        Get the time until the next observable change of the timer.
+        
+        The next change is either the next whole-second step of the displayed
+        countdown or the end of the current phase, whichever comes first.
+        Callers can sleep until then instead of polling.
+        
+        Returns:
+            int: Milliseconds until the next change, or None if IDLE or paused
+                 (nothing changes until the user acts)
+        """
+        if self.current_state == STATE_IDLE or self.is_paused:
+            return None
+        
+        remaining_ms = self.get_remaining_ms()
+        if remaining_ms <= 0:
+            return 0
+        
+        # Displayed seconds round up, so they step down when crossing a multiple of 1000
+        return (remaining_ms - 1) % 1000 + 1
+        
     def get_state(self):
         """
         Get the current timer state.
         
         Returns:
-            int: Current state (STATE_IDLE, STATE_WORK, or STATE_BREAK_SHORT)        """
+            int: Current state (STATE_IDLE, STATE_WORK, STATE_BREAK_SHORT or STATE_BREAK_LONG)
+        """
         return self.current_state
         
     def get_remaining_time_str(self):
@@ -150,21 +549,24 @@ class PomodoroTimer:
         Returns:
             str: Time in "MM:SS" format, minimum "00:00"
         """
-        # Ensure we don't show negative time and convert to integer
-        remaining = max(0, int(self.remaining_time_seconds))
+        remaining = self.get_remaining_seconds()
         
         minutes = remaining // 60
         seconds = remaining % 60
         
         return f"{minutes:02d}:{seconds:02d}"
+        
     def get_remaining_seconds(self):
         """
         Get remaining time in seconds.
         
+        Partial seconds round up, so a fresh 25 minute session reads 25:00
+        until a full second has elapsed.
+        
         Returns:
             int: Remaining seconds (minimum 0)
         """
-        return max(0, int(self.remaining_time_seconds))
+        return (self.get_remaining_ms() + 999) // 1000
         
     def is_timer_paused(self):
         """
@@ -174,20 +576,33 @@ class PomodoroTimer:
             bool: True if paused, False otherwise
         """
         return self.is_paused
-          def get_state_name(self):
+        
+    def get_state_name(self):
         """
         Get human-readable state name.
         
         Returns:
-            str: State name ("IDLE", "WORK", "BREAK_SHORT")
+            str: State name ("IDLE", "WORK", "BREAK_SHORT", "BREAK_LONG")
         """
         state_names = {
             STATE_IDLE: "IDLE",
             STATE_WORK: "WORK",
-            STATE_BREAK_SHORT: "BREAK_SHORT"
+            STATE_BREAK_SHORT: "BREAK_SHORT",
+            STATE_BREAK_LONG: "BREAK_LONG"
         }
         return state_names.get(self.current_state, "UNKNOWN")
         
+    def get_phase_duration_seconds(self):
+        """
+        Get the full duration of the current phase.
+        
+        Returns:
+            int: Phase duration in seconds, or 0 if IDLE
+        """
+        if self.current_state == STATE_IDLE:
+            return 0
+        return self.phase_duration_ms // 1000
+        
     def get_session_progress_percent(self):
         """
         Get current session progress as a percentage.
@@ -195,17 +610,11 @@ class PomodoroTimer:
         Returns:
             float: Progress percentage (0.0 to 100.0), or 0.0 if IDLE
         """
-        if self.current_state == STATE_IDLE:
-            return 0.0
-        elif self.current_state == STATE_WORK:
-            total_duration = self.work_duration_seconds
-        elif self.current_state == STATE_BREAK_SHORT:
-            total_duration = self.break_duration_seconds
-        else:
+        if self.current_state == STATE_IDLE or self.phase_duration_ms <= 0:
             return 0.0
             
-        elapsed = total_duration - max(0, self.remaining_time_seconds)
-        return min(100.0, (elapsed / total_duration) * 100.0)
+        elapsed = self.phase_duration_ms - self.get_remaining_ms()
+        return min(100.0, (elapsed / self.phase_duration_ms) * 100.0)
 
 # Example usage (commented out - for reference only)
 """
@@ -213,7 +622,10 @@ class PomodoroTimer:
 timer = PomodoroTimer()
 
 # Or create with custom durations
-# timer = PomodoroTimer(work_mins=25, break_mins=5)
+# timer = PomodoroTimer(work_mins=25, break_mins=5, long_break_mins=15, cycles_before_long_break=4)
+
+# Or with a custom phase table
+# timer = PomodoroTimer(schedule=[(STATE_WORK, 50), (STATE_BREAK_SHORT, 10)])
 
 # Start a work session
 timer.start_work()
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Hot-Path Timing Instrumentation for StudyStreak ESP32 Project
+=============================================================
+
+This module records how long each subsystem takes per run, in microseconds,
+into fixed-bucket histograms. Recording is a short bucket search and a few
+integer increments on preallocated counters, so it never allocates and can
+stay enabled on the device.
+
+The Scheduler times every task callback when given a Profiler, and records
+how late each task started relative to its deadline as loop jitter. Reports
+give p50/p99/max per stage so a latency regression shows up immediately.
+
+Percentiles are resolved to the upper bound of their bucket; max is exact.
+
+Author: StudyStreak Project
+Environment: MicroPython for ESP32
+"""
+
+# Upper bounds (exclusive) of the histogram buckets in microseconds; one
+# extra overflow bucket holds everything above the last bound
+BUCKET_BOUNDS_US = (
+    50, 100, 200, 500,
+    1000, 2000, 5000,
+    10000, 20000, 50000,
+    100000, 200000, 500000,
+    1000000,
+)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram of durations in microseconds.
+    """
+
+    def __init__(self, name, bounds=BUCKET_BOUNDS_US):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            name (str): Stage name used in reports
+            bounds (tuple): Ascending exclusive upper bounds of the buckets in µs
+        """
+        self.name = name
+        self.bounds = bounds
+        self._num_bounds = len(bounds)
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def record(self, duration_us):
+        """
+        Add one sample.
+
+        Args:
+            duration_us (int): Measured duration in microseconds
+        """
+        bounds = self.bounds
+        n = self._num_bounds
+        i = 0
+        while i < n and duration_us >= bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total_us += duration_us
+        if duration_us > self.max_us:
+            self.max_us = duration_us
+
+    def percentile(self, percent):
+        """
+        Args:
+            percent (float): Percentile to compute (0-100)
+
+        Returns:
+            int: Upper bound in µs of the bucket holding the percentile
+                 (capped at the maximum sample), or 0 with no samples
+        """
+        if self.count == 0:
+            return 0
+
+        # Rank of the sample at this percentile, rounded up
+        rank = (self.count * percent + 99) // 100
+        if rank < 1:
+            rank = 1
+
+        cumulative = 0
+        for i in range(len(self.counts)):
+            cumulative += self.counts[i]
+            if cumulative >= rank:
+                if i < self._num_bounds:
+                    return min(self.bounds[i], self.max_us)
+                return self.max_us
+        return self.max_us
+
+    def mean_us(self):
+        """
+        Returns:
+            int: Mean sample in µs, or 0 with no samples
+        """
+        if self.count == 0:
+            return 0
+        return self.total_us // self.count
+
+    def reset(self):
+        """
+        Drop all samples.
+        """
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def summary(self):
+        """
+        Returns:
+            dict: Sample count, mean, p50, p99 and max in µs
+        """
+        return {
+            'count': self.count,
+            'mean_us': self.mean_us(),
+            'p50_us': self.percentile(50),
+            'p99_us': self.percentile(99),
+            'max_us': self.max_us
+        }
+
+
+class Profiler:
+    """
+    Collection of per-stage histograms plus the loop jitter histogram.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty profiler.
+        """
+        self.stages = []
+        self._by_name = {}
+        self.jitter = Histogram("jitter")
+
+    def stage(self, name):
+        """
+        Get the histogram for a stage, creating it on first use.
+
+        Hold on to the returned histogram in hot paths instead of looking it
+        up by name each time.
+
+        Args:
+            name (str): Stage name
+
+        Returns:
+            Histogram: The stage's histogram
+        """
+        histogram = self._by_name.get(name)
+        if histogram is None:
+            histogram = Histogram(name)
+            self._by_name[name] = histogram
+            self.stages.append(histogram)
+        return histogram
+
+    def reset(self):
+        """
+        Drop the samples of every stage and of the jitter histogram.
+        """
+        for histogram in self.stages:
+            histogram.reset()
+        self.jitter.reset()
+
+    def report(self):
+        """
+        Format a timing table.
+
+        Returns:
+            list: Report lines, one per stage, with jitter last
+        """
+        lines = ["%-12s %7s %8s %8s %8s" % ("stage", "runs", "p50us", "p99us", "maxus")]
+        for histogram in self.stages + [self.jitter]:
+            lines.append("%-12s %7d %8d %8d %8d" % (
+                histogram.name,
+                histogram.count,
+                histogram.percentile(50),
+                histogram.percentile(99),
+                histogram.max_us
+            ))
+        return lines
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: Summary of every stage keyed by name, plus 'jitter'
+        """
+        stats = {}
+        for histogram in self.stages:
+            stats[histogram.name] = histogram.summary()
+        stats['jitter'] = self.jitter.summary()
+        return stats
+
+
+# Example usage (commented out for module import)
+"""
+# Example of timing a stage by hand
+
+profiler = Profiler()
+update_stage = profiler.stage("update")
+
+start = clock.ticks_us()
+timer.update()
+update_stage.record(clock.ticks_diff(clock.ticks_us(), start))
+
+for line in profiler.report():
+    print(line)
+"""
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+StudyStreak Cooperative Task Scheduler
+======================================
+
+This module provides a small cooperative scheduler for the ESP32-based StudyStreak
+project. Each subsystem (timer tick, touch scan, presence sampling, OLED rendering,
+LED animation) runs as its own periodic task with its own period instead of being
+polled in lockstep from a single fixed-rate loop.
+
+The scheduler can either drive itself with a blocking loop (run) or be awaited
+from uasyncio/asyncio (run_async) so it can share an event loop with other tasks.
+Between deadlines the CPU idles instead of spinning at a fixed rate. A task can
+return the delay until it next needs to run, so event-driven tasks sleep exactly
+until something changes, and wake() cuts an idle period short on input.
+
+Author: StudyStreak Project
+Environment: MicroPython for ESP32
+"""
+
+from clock import system_clock
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    try:
+        import asyncio
+    except ImportError:
+        asyncio = None
+
+# Upper bound on a single idle sleep when no task is enabled
+MAX_IDLE_MS = 1000
+
+
+class Task:
+    """
+    A periodic task registered with the Scheduler.
+    """
+
+    def __init__(self, name, callback, period_ms):
+        """
+        Initialize a task.
+
+        Args:
+            name (str): Unique task name
+            callback (callable): Function called with no arguments when the task is due.
+                                 May return an int delay in ms until its next run,
+                                 or None to use period_ms.
+            period_ms (int): Interval between runs in milliseconds
+        """
+        self.name = name
+        self.callback = callback
+        self.period_ms = period_ms
+        self.next_run_ms = 0
+        self.enabled = True
+        self.run_count = 0
+        self.histogram = None
+
+
+class Scheduler:
+    """
+    Cooperative periodic task scheduler.
+
+    Tasks are run in registration order whenever their deadline has passed.
+    Deadlines are anchored to the previous deadline so periodic tasks do not
+    drift, but a task that overran is never scheduled into the past.
+    """
+
+    def __init__(self, clock=None, profiler=None):
+        """
+        Initialize an empty scheduler.
+
+        Args:
+            clock: Time source (SystemClock or VirtualClock), defaults to the system clock
+            profiler (Profiler): Optional profiler; when given, every task run is
+                                 timed and its start lateness recorded as jitter
+        """
+        self.clock = clock if clock is not None else system_clock
+        self.profiler = profiler
+        self.tasks = []
+        # Called as idle_sleep(ms) by run() between passes instead of clock.sleep_ms
+        self.idle_sleep = None
+        # Longest single clock.sleep_ms in run(); set while interrupts can call
+        # wake(), since a plain sleep cannot be cut short by an ISR
+        self.wake_slice_ms = None
+        self._running = False
+        self._wake_requested = False
+        self._wake_flag = None
+
+    def add_task(self, name, callback, period_ms, start_delay_ms=0):
+        """
+        Register a periodic task.
+
+        Args:
+            name (str): Unique task name
+            callback (callable): Function called with no arguments when due
+            period_ms (int): Interval between runs in milliseconds
+            start_delay_ms (int): Delay before the first run in milliseconds
+
+        Returns:
+            Task: The registered task
+        """
+        task = Task(name, callback, period_ms)
+        if self.profiler is not None:
+            task.histogram = self.profiler.stage(name)
+        task.next_run_ms = self.clock.ticks_add(self.clock.ticks_ms(), start_delay_ms)
+        self.tasks.append(task)
+        return task
+
+    def get_task(self, name):
+        """
+        Look up a task by name.
+
+        Args:
+            name (str): Task name
+
+        Returns:
+            Task: The matching task, or None if not registered
+        """
+        for task in self.tasks:
+            if task.name == name:
+                return task
+        return None
+
+    def set_period(self, name, period_ms):
+        """
+        Change the period of a registered task.
+
+        Args:
+            name (str): Task name
+            period_ms (int): New interval between runs in milliseconds
+
+        Returns:
+            bool: True if the task exists, False otherwise
+        """
+        task = self.get_task(name)
+        if task is None:
+            return False
+        task.period_ms = period_ms
+        return True
+
+    def set_enabled(self, name, enabled):
+        """
+        Enable or disable a registered task. A re-enabled task runs on the next pass.
+
+        Args:
+            name (str): Task name
+            enabled (bool): Whether the task should run
+
+        Returns:
+            bool: True if the task exists, False otherwise
+        """
+        task = self.get_task(name)
+        if task is None:
+            return False
+        if enabled and not task.enabled:
+            task.next_run_ms = self.clock.ticks_ms()
+        task.enabled = enabled
+        return True
+
+    def trigger(self, name):
+        """
+        Make a task due immediately so it runs on the next scheduler pass.
+
+        Args:
+            name (str): Task name
+
+        Returns:
+            bool: True if the task exists, False otherwise
+        """
+        task = self.get_task(name)
+        if task is None:
+            return False
+        self.trigger_task(task)
+        return True
+
+    def trigger_task(self, task):
+        """
+        Make a task due immediately and wake the scheduler.
+
+        Safe to call from an interrupt handler: it only sets fields.
+
+        Args:
+            task (Task): Task returned by add_task()
+        """
+        task.next_run_ms = self.clock.ticks_ms()
+        self.wake()
+
+    def wake(self):
+        """
+        Cut the current idle period short and start a scheduler pass.
+
+        Safe to call from an interrupt handler: it only sets flags. Under
+        run_async() the waiting coroutine wakes at once; under run() the
+        wake is seen at the end of the current wake_slice_ms slice.
+        """
+        self._wake_requested = True
+        if self._wake_flag is not None:
+            self._wake_flag.set()
+
+    def run_pending(self):
+        """
+        Run every task whose deadline has passed.
+
+        Returns:
+            int: Milliseconds until the next task is due (0 if one is already due)
+        """
+        now = self.clock.ticks_ms()
+        next_delay = None
+
+        for task in self.tasks:
+            if not task.enabled:
+                continue
+
+            lateness_ms = self.clock.ticks_diff(now, task.next_run_ms)
+            if lateness_ms >= 0:
+                if task.histogram is not None:
+                    self.profiler.jitter.record(lateness_ms * 1000)
+                    start_us = self.clock.ticks_us()
+                    delay_ms = task.callback()
+                    task.histogram.record(self.clock.ticks_diff(self.clock.ticks_us(), start_us))
+                else:
+                    delay_ms = task.callback()
+                task.run_count += 1
+
+                now = self.clock.ticks_ms()
+                if delay_ms is None:
+                    next_run = self.clock.ticks_add(task.next_run_ms, task.period_ms)
+                else:
+                    next_run = self.clock.ticks_add(now, delay_ms)
+                if self.clock.ticks_diff(next_run, now) < 0:
+                    # Task overran its period; skip the missed runs
+                    next_run = now
+                task.next_run_ms = next_run
+
+            remaining = self.clock.ticks_diff(task.next_run_ms, now)
+            if next_delay is None or remaining < next_delay:
+                next_delay = remaining
+
+        if next_delay is None:
+            return MAX_IDLE_MS
+        return max(0, next_delay)
+
+    def run(self, duration_ms=None):
+        """
+        Run the scheduler with a blocking loop until stop() is called.
+
+        Args:
+            duration_ms (int): Optional time limit in milliseconds. With a
+                               VirtualClock this simulates duration_ms instantly.
+        """
+        end_ms = None
+        if duration_ms is not None:
+            end_ms = self.clock.ticks_add(self.clock.ticks_ms(), duration_ms)
+
+        self._running = True
+        while self._running:
+            delay_ms = self.run_pending()
+
+            if end_ms is not None:
+                remaining_ms = self.clock.ticks_diff(end_ms, self.clock.ticks_ms())
+                if remaining_ms <= 0:
+                    break
+                delay_ms = min(delay_ms, remaining_ms)
+
+            if delay_ms > 0 and not self._wake_requested:
+                if self.idle_sleep is not None:
+                    self.idle_sleep(delay_ms)
+                else:
+                    self._sleep_until_wake(delay_ms)
+            self._wake_requested = False
+
+        self._running = False
+
+    def _sleep_until_wake(self, delay_ms):
+        """
+        Sleep for delay_ms, in slices of wake_slice_ms when set, returning
+        early once wake() was called. An ISR is noticed within one slice.
+        """
+        slice_ms = self.wake_slice_ms
+        if not slice_ms:
+            self.clock.sleep_ms(delay_ms)
+            return
+        while delay_ms > 0 and not self._wake_requested:
+            step_ms = min(slice_ms, delay_ms)
+            self.clock.sleep_ms(step_ms)
+            delay_ms -= step_ms
+
+    async def run_async(self):
+        """
+        Run the scheduler as a uasyncio/asyncio coroutine until stop() is called.
+
+        Yields to the event loop between passes so other coroutines can run.
+        Idle periods end early when wake() is called, including from an ISR.
+        The event loop sleeps in real time, so use run() with a VirtualClock.
+        """
+        if asyncio is None:
+            raise RuntimeError("asyncio is not available")
+
+        if hasattr(asyncio, 'ThreadSafeFlag'):
+            self._wake_flag = asyncio.ThreadSafeFlag()
+        else:
+            self._wake_flag = asyncio.Event()
+
+        self._running = True
+        while self._running:
+            delay_ms = self.run_pending()
+            if delay_ms > 0 and not self._wake_requested:
+                await self._wait_for_wake(delay_ms)
+            else:
+                await _sleep_ms(0)
+            self._wake_requested = False
+
+    async def _wait_for_wake(self, delay_ms):
+        """
+        Wait until wake() is called or delay_ms elapses, whichever comes first.
+        """
+        try:
+            if hasattr(asyncio, 'wait_for_ms'):
+                await asyncio.wait_for_ms(self._wake_flag.wait(), delay_ms)
+            else:
+                await asyncio.wait_for(self._wake_flag.wait(), delay_ms / 1000)
+        except asyncio.TimeoutError:
+            pass
+
+        if hasattr(self._wake_flag, 'clear'):
+            self._wake_flag.clear()
+
+    def stop(self):
+        """
+        Stop the scheduler loop after the current pass.
+        """
+        self._running = False
+
+
+def _sleep_ms(delay_ms):
+    """
+    Return an awaitable that sleeps for delay_ms on uasyncio or asyncio.
+    """
+    if hasattr(asyncio, 'sleep_ms'):
+        return asyncio.sleep_ms(delay_ms)
+    return asyncio.sleep(delay_ms / 1000)
+
+
+# Example usage (commented out for module import)
+"""
+# Example of how to use the Scheduler class
+
+def blink():
+    print("blink")
+
+def poll_sensor():
+    print("poll")
+
+scheduler = Scheduler()
+scheduler.add_task("blink", blink, period_ms=500)
+scheduler.add_task("sensor", poll_sensor, period_ms=100)
+
+# Blocking loop
+scheduler.run()
+
+# Or share an event loop with other uasyncio tasks
+# asyncio.run(scheduler.run_async())
+"""
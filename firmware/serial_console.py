@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Serial Debug Console for StudyStreak ESP32 Project
+==================================================
+
+This module reads short text commands from the USB/UART REPL without blocking
+the scheduler. poll() drains whatever characters have arrived and runs a
+command once a full line is received, e.g. "timing" to print the loop timing
+histograms or "log" to dump the in-RAM log buffer.
+
+Polling stdin is only enabled on MicroPython (uselect); on a host the console
+stays inactive so simulations are never blocked on the terminal.
+
+Author: StudyStreak Project
+Environment: MicroPython for ESP32
+"""
+
+import sys
+
+try:
+    import uselect
+except ImportError:
+    uselect = None
+
+# Longest accepted command line; extra characters are dropped
+MAX_LINE_LENGTH = 64
+
+
+class SerialConsole:
+    """
+    Non-blocking line-based command reader.
+    """
+
+    def __init__(self, stream=None):
+        """
+        Initialize the console.
+
+        Args:
+            stream: Input stream to read, defaults to sys.stdin
+        """
+        self.stream = stream if stream is not None else sys.stdin
+        self.commands = {}
+        self._poller = None
+        self._line = ""
+        self.is_active = False
+
+        self.register("help", self._help, "List available commands")
+
+    def setup(self):
+        """
+        Start polling the input stream.
+
+        Returns:
+            bool: True if the console is active, False if polling is unavailable
+        """
+        if uselect is None:
+            return False
+
+        self._poller = uselect.poll()
+        self._poller.register(self.stream, uselect.POLLIN)
+        self.is_active = True
+        return True
+
+    def register(self, name, callback, help_text=""):
+        """
+        Register a command.
+
+        Args:
+            name (str): Command word
+            callback (callable): Called with the remaining words as arguments
+            help_text (str): One-line description for "help"
+        """
+        self.commands[name] = (callback, help_text)
+
+    def poll(self):
+        """
+        Read pending characters and run any completed command line.
+
+        Never blocks; call it periodically from a scheduler task.
+        """
+        if not self.is_active:
+            return
+
+        while self._poller.poll(0):
+            char = self.stream.read(1)
+            if not char:
+                break
+            if char in "\r\n":
+                line = self._line
+                self._line = ""
+                if line:
+                    self.execute(line)
+            elif len(self._line) < MAX_LINE_LENGTH:
+                self._line += char
+
+    def execute(self, line):
+        """
+        Run one command line.
+
+        Args:
+            line (str): Command word followed by optional arguments
+
+        Returns:
+            bool: True if the command exists
+        """
+        words = line.split()
+        if not words:
+            return False
+
+        command = self.commands.get(words[0])
+        if command is None:
+            print("Unknown command: %s (try 'help')" % words[0])
+            return False
+
+        try:
+            command[0](*words[1:])
+        except Exception as e:
+            print("Command '%s' failed: %s" % (words[0], e))
+        return True
+
+    def _help(self, *args):
+        """
+        Print the registered commands.
+        """
+        for name in sorted(self.commands):
+            print("%-10s %s" % (name, self.commands[name][1]))
+
+
+# Example usage (commented out for module import)
+"""
+# Example of exposing a debug command over the REPL
+
+console = SerialConsole()
+console.register("ping", lambda *args: print("pong"), "Check the console")
+
+if console.setup():
+    scheduler.add_task("serial", console.poll, 200)
+"""
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent Session History Log for StudyStreak ESP32 Project
+============================================================
+
+This module stores every Pomodoro session event (start, pause, resume, phase
+complete, reset) on the flash filesystem as an append-only log of fixed-width
+16-byte binary records:
+
+    seq (u32) | timestamp (u32) | event (u8) | state (u8) | sessions (u16) | value_ms (u32)
+
+Records are packed into a preallocated RAM block and only appended to the
+file, never rewritten. A full block goes out in a single write; flush() writes
+just the records not yet on flash, at their final offset, so block boundaries
+in the file never move and a record never straddles a block. When the file
+reaches its size limit it is renamed to "<path>.1" (replacing the previous
+one) and a new file is started, which bounds flash usage to two files.
+
+A power loss costs at most the records still in RAM; a torn write at the end
+of the file is detected on the next boot and the file is rotated. A failed
+write keeps its records buffered for the next flush and never shifts the
+write position; a failed rotation stops the file from growing past its limit.
+
+Author: StudyStreak Project
+Environment: MicroPython for ESP32
+"""
+
+import struct
+
+try:
+    import uos as os
+except ImportError:
+    import os
+
+from logger import log
+
+# Record layout: seq, timestamp, event, state, session_count, value_ms
+RECORD_FORMAT = "<IIBBHI"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+# RAM buffer size; a multiple of RECORD_SIZE
+BLOCK_SIZE = 512
+
+# Size at which the log is rotated (two files on flash at most)
+DEFAULT_MAX_BYTES = 64 * 1024
+
+# Default log location on the flash filesystem
+DEFAULT_LOG_PATH = "sessions.log"
+
+
+class SessionLog:
+    """
+    Append-only fixed-width binary session event log with rotation.
+    """
+
+    def __init__(self, path=DEFAULT_LOG_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Open the log and recover the write position from the existing file.
+
+        Args:
+            path (str): Log file path on the flash filesystem
+            max_bytes (int): File size at which the log is rotated
+        """
+        self.path = path
+        self.rotated_path = path + ".1"
+        self.records_per_block = BLOCK_SIZE // RECORD_SIZE
+        # Rotation happens on a block boundary
+        self.max_bytes = max(BLOCK_SIZE, max_bytes - max_bytes % BLOCK_SIZE)
+
+        self._block = bytearray(self.records_per_block * RECORD_SIZE)
+        self._fill = 0          # Records in the current block
+        self._written = 0       # Records of the current block already on flash
+        self.file_size = 0
+        self.next_seq = 0
+        self.write_errors = 0
+        self._rotate_pending = False   # Rotation failed and must happen before the next block
+
+        self._recover()
+
+    def _recover(self):
+        """
+        Continue after the last record of an existing log file.
+        """
+        size = self._file_size(self.path)
+        if size is None:
+            return
+
+        if size % RECORD_SIZE:
+            # Torn write at the tail: keep the old file, start a clean one
+            log.error("history", "Torn record in %s, rotating", self.path)
+            size -= size % RECORD_SIZE
+            self.next_seq = self._read_last_seq(self.path, size)
+            self._rotate()
+            return
+
+        self.file_size = size
+        self.next_seq = self._read_last_seq(self.path, size)
+
+        # Resume inside a partially written block so boundaries stay aligned
+        self._fill = (size % BLOCK_SIZE) // RECORD_SIZE
+        self._written = self._fill
+
+    def _file_size(self, path):
+        try:
+            return os.stat(path)[6]
+        except OSError:
+            return None
+
+    def _read_last_seq(self, path, size):
+        """
+        Returns:
+            int: Sequence number following the last complete record in path
+        """
+        if size < RECORD_SIZE:
+            return 0
+        try:
+            with open(path, "rb") as f:
+                f.seek(size - RECORD_SIZE)
+                record = f.read(RECORD_SIZE)
+        except OSError as e:
+            log.error("history", "Cannot read %s: %s", path, e)
+            return 0
+        if len(record) < RECORD_SIZE:
+            return 0
+        return struct.unpack_from(RECORD_FORMAT, record)[0] + 1
+
+    def append(self, event, state, timestamp, session_count, value_ms):
+        """
+        Add one record. Only touches flash when the block fills up.
+
+        Args:
+            event (int): EVENT_* constant from pomodoro_logic
+            state (int): Phase the event refers to
+            timestamp (int): Wall-clock seconds
+            session_count (int): Completed work sessions at the time of the event
+            value_ms (int): Event-specific duration in milliseconds
+
+        Returns:
+            int: Sequence number of the record
+        """
+        seq = self.next_seq
+        struct.pack_into(RECORD_FORMAT, self._block, self._fill * RECORD_SIZE,
+                         seq & 0xFFFFFFFF, timestamp & 0xFFFFFFFF, event, state,
+                         session_count & 0xFFFF, max(0, value_ms) & 0xFFFFFFFF)
+        self.next_seq = seq + 1
+        self._fill += 1
+
+        if self._fill == self.records_per_block:
+            self.flush()
+        return seq
+
+    def flush(self):
+        """
+        Append the buffered records that are not yet on flash.
+
+        Returns:
+            int: Number of records written
+        """
+        count = self._fill - self._written
+        if count <= 0:
+            return 0
+
+        if self._written == 0 and (self._rotate_pending or self.file_size >= self.max_bytes):
+            if not self._rotate():
+                # Losing history beats letting the file grow without bound
+                self.write_errors += 1
+                self._fill = 0
+                return 0
+
+        start = self._written * RECORD_SIZE
+        end = self._fill * RECORD_SIZE
+        try:
+            with open(self.path, "ab") as f:
+                f.write(memoryview(self._block)[start:end])
+        except OSError as e:
+            self.write_errors += 1
+            log.error("history", "Write to %s failed: %s", self.path, e)
+            self._resync_after_error()
+            return 0
+
+        self.file_size += end - start
+        self._written = self._fill
+        if self._fill == self.records_per_block:
+            self._fill = 0
+            self._written = 0
+        return count
+
+    def _resync_after_error(self):
+        """
+        Keep the write position aligned with the file after a failed write.
+
+        The unwritten records stay buffered for the next flush, unless the
+        block is full and there is no room to keep them.
+        """
+        size = self._file_size(self.path)
+        if size is None:
+            size = 0
+
+        if size != self.file_size:
+            # Part of the write landed, so the file's tail is torn: skip the
+            # whole records that made it and move the rest to the start of
+            # the block for a fresh file
+            log.error("history", "Partial write to %s, rotating", self.path)
+            if size > self.file_size:
+                self._written = min(self._fill, self._written + (size - self.file_size) // RECORD_SIZE)
+            block = self._block
+            block[:(self._fill - self._written) * RECORD_SIZE] = \
+                block[self._written * RECORD_SIZE:self._fill * RECORD_SIZE]
+            self._fill -= self._written
+            self._written = 0
+            self._rotate_pending = True
+        elif self._fill == self.records_per_block:
+            self._fill = self._written
+
+    def _rotate(self):
+        """
+        Move the current file to the rotated path and start an empty one.
+
+        Returns:
+            bool: True if the next write starts a new file
+        """
+        if self._file_size(self.path) is not None:
+            try:
+                os.remove(self.rotated_path)
+            except OSError:
+                pass
+            try:
+                os.rename(self.path, self.rotated_path)
+            except OSError as e:
+                log.error("history", "Rotation of %s failed: %s", self.path, e)
+                self._rotate_pending = True
+                return False
+        self.file_size = 0
+        self._rotate_pending = False
+        return True
+
+    def pending(self):
+        """
+        Returns:
+            int: Records buffered in RAM and not yet on flash
+        """
+        return self._fill - self._written
+
+    def iter_records(self):
+        """
+        Yield every stored record, oldest first: the rotated file, the current
+        file, then the records still buffered in RAM.
+
+        Yields:
+            tuple: (seq, timestamp, event, state, session_count, value_ms)
+        """
+        scratch = bytearray(BLOCK_SIZE)
+        for path in (self.rotated_path, self.path):
+            try:
+                f = open(path, "rb")
+            except OSError:
+                continue
+            try:
+                while True:
+                    n = f.readinto(scratch)
+                    if not n:
+                        break
+                    for offset in range(0, n - n % RECORD_SIZE, RECORD_SIZE):
+                        yield struct.unpack_from(RECORD_FORMAT, scratch, offset)
+            finally:
+                f.close()
+
+        for index in range(self._written, self._fill):
+            yield struct.unpack_from(RECORD_FORMAT, self._block, index * RECORD_SIZE)
+
+    def get_status(self):
+        """
+        Get log status information.
+
+        Returns:
+            dict: Log status
+        """
+        return {
+            'path': self.path,
+            'file_size': self.file_size,
+            'next_seq': self.next_seq,
+            'pending_records': self.pending(),
+            'write_errors': self.write_errors
+        }
+
+
+# Example usage (commented out for module import)
+"""
+# Example of recording timer events and reading them back
+
+from pomodoro_logic import PomodoroTimer, EVENT_NAMES
+
+timer = PomodoroTimer(work_mins=25, break_mins=5)
+history = SessionLog("sessions.log")
+
+timer.add_listener(lambda event, state, timestamp, value_ms:
+                   history.append(event, state, timestamp, timer.session_count, value_ms))
+
+timer.start_work()
+history.flush()
+
+for seq, timestamp, event, state, sessions, value_ms in history.iter_records():
+    print(seq, timestamp, EVENT_NAMES[event], state, sessions, value_ms)
+"""
@@ -11,11 +11,190 @@ The TCRT5000 is an infrared reflective sensor that can detect the presence of
 objects by measuring reflected IR light. Higher ADC readings typically indicate
 closer objects or better reflection.
 
+Raw readings pass through a streaming filter chain before a presence decision
+is made: N-sample oversampling, a ring-buffer median (or EMA), and dual
+thresholds with a minimum dwell time, so a reading jittering around the
+threshold cannot make the reported presence flap. Every stage is O(1) per
+sample and works on preallocated buffers.
+
+When the IR emitter is wired to a GPIO it is only pulsed around each reading,
+and an emitter-off reading of the ambient light is subtracted from the lit
+reading, which rejects desk lamps and daylight. The sampling interval adapts:
+fast right after a change, backing off exponentially while nothing changes.
+
 Author: StudyStreak Project
 Version: 1.0
 """
 
-import time
+import random
+
+from clock import system_clock
+from logger import log, DEBUG
+
+try:
+    from machine import Pin
+except ImportError:
+    Pin = None
+
+# Time for the phototransistor to settle after switching the emitter on
+EMITTER_SETTLE_US = 200
+
+# Adaptive sampling: fastest rate after a change, slowest while stable
+MIN_SAMPLE_INTERVAL_MS = 100
+MAX_SAMPLE_INTERVAL_MS = 2000
+
+# Smoothing stages available in PresenceFilter
+FILTER_MEDIAN = "median"
+FILTER_EMA = "ema"
+FILTER_NONE = "none"
+
+
+class PresenceFilter:
+    """
+    Streaming smoothing plus hysteresis and dwell time for presence readings.
+    
+    Values above the upper threshold mean presence, values below the lower
+    threshold mean absence, and anything in between keeps the current state.
+    A change is only reported once the new state has held for dwell_ms.
+    """
+    
+    def __init__(self, threshold, hysteresis=200, mode=FILTER_MEDIAN, window=5,
+                 ema_alpha=0.25, dwell_ms=1500, initial_state=True, clock=None):
+        """
+        Initialize the filter.
+        
+        Args:
+            threshold (int): Center threshold between absence and presence
+            hysteresis (int): Gap between the lower and upper thresholds
+            mode (str): "median", "ema" or "none"
+            window (int): Median window size in samples (odd sizes work best)
+            ema_alpha (float): EMA weight of each new sample
+            dwell_ms (int): Time a new state must hold before it is reported
+            initial_state (bool): Presence state reported before any change
+            clock: Time source (SystemClock or VirtualClock), defaults to the system clock
+        """
+        self.clock = clock if clock is not None else system_clock
+        self.mode = mode
+        self.ema_alpha = ema_alpha
+        self.dwell_ms = dwell_ms
+        self.initial_state = initial_state
+        self.hysteresis = hysteresis
+        self.set_threshold(threshold)
+        
+        # Median ring buffer and a scratch copy for sorting, preallocated
+        self.window = max(1, window)
+        self._ring = [0] * self.window
+        self._scratch = [0] * self.window
+        self.reset()
+    
+    def set_threshold(self, threshold, hysteresis=None):
+        """
+        Move the thresholds.
+        
+        Args:
+            threshold (int): Center threshold
+            hysteresis (int): Gap between the thresholds, or None to keep it
+        """
+        if hysteresis is not None:
+            self.hysteresis = hysteresis
+        self.threshold = threshold
+        self.upper_threshold = threshold + self.hysteresis // 2
+        self.lower_threshold = threshold - self.hysteresis // 2
+    
+    def reset(self):
+        """
+        Forget all history and return to the initial state.
+        """
+        self._index = 0
+        self._filled = 0
+        self._ema = 0.0
+        self.value = 0
+        self.state = self.initial_state
+        self._pending = False
+        self._pending_since_ms = 0
+    
+    def _median(self, sample):
+        """
+        Push a sample into the ring buffer and return the window median.
+        """
+        self._ring[self._index] = sample
+        self._index += 1
+        if self._index == self.window:
+            self._index = 0
+        if self._filled < self.window:
+            self._filled += 1
+        
+        # Insertion sort of the small, fixed-size window into the scratch buffer
+        n = self._filled
+        ring = self._ring
+        scratch = self._scratch
+        for i in range(n):
+            value = ring[i]
+            j = i - 1
+            while j >= 0 and scratch[j] > value:
+                scratch[j + 1] = scratch[j]
+                j -= 1
+            scratch[j + 1] = value
+        return scratch[n // 2]
+    
+    def _smooth(self, sample):
+        """
+        Apply the configured smoothing stage to one sample.
+        """
+        if self.mode == FILTER_MEDIAN:
+            return self._median(sample)
+        if self.mode == FILTER_EMA:
+            if self._filled == 0:
+                self._filled = 1
+                self._ema = float(sample)
+            else:
+                self._ema += self.ema_alpha * (sample - self._ema)
+            return int(self._ema)
+        return sample
+    
+    def update(self, sample, now_ms=None):
+        """
+        Feed one (oversampled) reading.
+        
+        Args:
+            sample (int): ADC reading
+            now_ms (int): Tick of the reading, defaults to now
+        
+        Returns:
+            bool: Debounced presence state
+        """
+        if now_ms is None:
+            now_ms = self.clock.ticks_ms()
+        
+        value = self._smooth(sample)
+        self.value = value
+        
+        # Dual thresholds: between them the current state is kept
+        if value > self.upper_threshold:
+            candidate = True
+        elif value < self.lower_threshold:
+            candidate = False
+        else:
+            candidate = self.state
+        
+        if candidate == self.state:
+            self._pending = False
+        elif not self._pending:
+            self._pending = True
+            self._pending_since_ms = now_ms
+        
+        if self._pending and self.clock.ticks_diff(now_ms, self._pending_since_ms) >= self.dwell_ms:
+            self.state = candidate
+            self._pending = False
+        
+        return self.state
+    
+    def is_settling(self):
+        """
+        Returns:
+            bool: True while a state change is waiting out its dwell time
+        """
+        return self._pending
 
 
 class PresenceSensor:
@@ -27,7 +206,10 @@ class PresenceSensor:
     would interface with an ESP32's ADC pin to read sensor values.
     """
     
-    def __init__(self, conceptual_adc_pin, threshold=2500):
+    def __init__(self, conceptual_adc_pin, threshold=2500, clock=None, oversample=4,
+                 filter_mode=FILTER_MEDIAN, filter_window=5, hysteresis=200, dwell_ms=1500,
+                 emitter_pin=None, min_interval_ms=MIN_SAMPLE_INTERVAL_MS,
+                 max_interval_ms=MAX_SAMPLE_INTERVAL_MS):
         """
         Initialize the presence sensor handler.
         
@@ -35,14 +217,45 @@ class PresenceSensor:
             conceptual_adc_pin (int): GPIO pin number the sensor would be connected to
             threshold (int): ADC reading threshold above which presence is detected
                            (typical ESP32 ADC range: 0-4095 for 12-bit resolution)
+            clock: Time source (SystemClock or VirtualClock), defaults to the system clock
+            oversample (int): ADC reads averaged into each filter sample
+            filter_mode (str): Smoothing stage: "median", "ema" or "none"
+            filter_window (int): Median window size in samples
+            hysteresis (int): Gap between the absence and presence thresholds
+            dwell_ms (int): Time a new presence state must hold before it is reported
+            emitter_pin (int): GPIO switching the IR emitter, or None if it is
+                               always on (no duty cycling or ambient subtraction)
+            min_interval_ms (int): Sampling interval right after a change
+            max_interval_ms (int): Longest sampling interval while stable
         """
+        self.clock = clock if clock is not None else system_clock
         self.adc_pin_number = conceptual_adc_pin
         self.presence_threshold = threshold
         self.is_initialized = False
         
+        # Streaming filter chain: oversampling -> median/EMA -> hysteresis + dwell
+        self.oversample = max(1, oversample)
+        self.filter = PresenceFilter(threshold, hysteresis=hysteresis, mode=filter_mode,
+                                     window=filter_window, dwell_ms=dwell_ms, clock=self.clock)
+        
+        # Duty-cycled emitter: on only while a lit reading is taken
+        self.emitter_pin = emitter_pin
+        self._emitter = None
+        self._emitter_on = emitter_pin is None
+        self.emitter_pulses = 0
+        
+        # Adaptive sampling interval with exponential backoff
+        self.min_interval_ms = min_interval_ms
+        self.max_interval_ms = max_interval_ms
+        self.sample_interval_ms = min_interval_ms
+        self.activity_delta = max(1, hysteresis // 2)
+        self._last_value = None
+        self.samples_taken = 0
+        
         # Simulation variables for testing
         self._simulation_mode = "presence"  # "presence", "no_presence", or "cycle"
         self._cycle_counter = 0
+        self._ambient_level = 0
         
         print(f"PresenceSensor: Created for conceptual ADC pin {self.adc_pin_number}")
         print(f"PresenceSensor: Presence threshold set to {self.presence_threshold}")
@@ -63,8 +276,13 @@ class PresenceSensor:
         print("Conceptual: Configuring ADC parameters...")
         print("Conceptual: Performing sensor warm-up...")
         
+        if self.emitter_pin is not None:
+            print(f"Conceptual: Duty-cycling IR emitter on pin {self.emitter_pin}")
+            if Pin is not None:
+                self._emitter = Pin(self.emitter_pin, Pin.OUT, value=0)
+        
         # Simulate initialization delay
-        time.sleep(0.1)
+        self.clock.sleep(0.1)
         
         self.is_initialized = True
         print("Conceptual: TCRT5000 sensor initialized successfully")
@@ -81,13 +299,14 @@ class PresenceSensor:
             int: Raw ADC reading (0-4095 for ESP32 12-bit ADC), or None if error
         """
         if not self.is_initialized:
-            print("ERROR: TCRT5000 sensor not initialized! Call setup_sensor() first.")
+            log.error("presence", "TCRT5000 sensor not initialized! Call setup_sensor() first.")
             return None
         
-        print("Conceptual: Reading raw value from TCRT5000...")
-        
         # Simulate different sensor readings based on simulation mode
-        if self._simulation_mode == "presence":
+        if not self._emitter_on:
+            # Emitter off: only ambient light reaches the phototransistor
+            raw_value = 0
+        elif self._simulation_mode == "presence":
             # Simulate presence detected (above threshold)
             raw_value = self.presence_threshold + 500
         elif self._simulation_mode == "no_presence":
@@ -101,44 +320,124 @@ class PresenceSensor:
                 raw_value = self.presence_threshold - 300
             self._cycle_counter += 1
         
+        # Ambient IR (lamps, daylight) adds to every reading
+        raw_value += self._ambient_level
+        
         # Add some realistic noise to the reading
-        import random
         noise = random.randint(-50, 50)
         raw_value += noise
         
         # Ensure value stays within valid ADC range
         raw_value = max(0, min(4095, raw_value))
         
-        print(f"Conceptual: Raw ADC reading = {raw_value}")
+        if log.level <= DEBUG:
+            log.debug("presence", "Raw ADC reading = %d", raw_value)
         return raw_value
     
     def is_present(self):
         """
         Determine if presence is detected based on sensor reading.
         
+        Takes one oversampled reading and runs it through the filter chain.
+        
         Returns:
             bool: True if presence detected, False otherwise
         """
         if not self.is_initialized:
-            print("ERROR: TCRT5000 sensor not initialized! Call setup_sensor() first.")
+            log.error("presence", "TCRT5000 sensor not initialized! Call setup_sensor() first.")
             return False
         
-        raw_value = self.read_raw_value()
+        # Oversample: average several ambient-corrected reads into one filter sample
+        total = 0
+        for i in range(self.oversample):
+            value = self._read_reflectance()
+            if value is None:
+                log.error("presence", "Failed to read sensor value")
+                return False
+            total += value
         
-        if raw_value is None:
-            print("ERROR: Failed to read sensor value")
-            return False
+        # Smoothing, dual thresholds and dwell time give a debounced state
+        sample = total // self.oversample
+        previous_state = self.filter.state
+        presence_detected = self.filter.update(sample)
+        self._adapt_interval(sample, previous_state)
         
-        # Compare against threshold to determine presence
-        presence_detected = raw_value > self.presence_threshold
+        if log.level <= DEBUG:
+            log.debug("presence", "Filtered value %d (thresholds %d/%d): %s", self.filter.value,
+                      self.filter.lower_threshold, self.filter.upper_threshold,
+                      "present" if presence_detected else "absent")
         
-        print(f"Conceptual: Raw value {raw_value} vs threshold {self.presence_threshold}")
-        if presence_detected:
-            print("Conceptual: PRESENCE DETECTED")
+        return presence_detected
+    
+    def _set_emitter(self, on):
+        """
+        Switch the IR emitter.
+        """
+        self._emitter_on = on
+        if self._emitter is not None:
+            self._emitter.value(1 if on else 0)
+    
+    def _read_reflectance(self):
+        """
+        Take one reading of reflected IR with ambient light removed.
+        
+        With a switchable emitter, an emitter-off (ambient) reading is
+        subtracted from an emitter-on reading and the emitter is pulsed only
+        for the lit reading. Without one, the raw reading is returned.
+        
+        Returns:
+            int: Reflected signal, or None if error
+        """
+        if self.emitter_pin is None:
+            return self.read_raw_value()
+        
+        ambient = self.read_raw_value()
+        self._set_emitter(True)
+        self.clock.sleep_us(EMITTER_SETTLE_US)
+        lit = self.read_raw_value()
+        self._set_emitter(False)
+        self.emitter_pulses += 1
+        
+        if ambient is None or lit is None:
+            return None
+        return max(0, lit - ambient)
+    
+    def _adapt_interval(self, sample, previous_state):
+        """
+        Sample fast after a change and back off exponentially while stable.
+        
+        The unfiltered sample is compared, since the median would hide the
+        first readings of a change.
+        """
+        changed = (
+            self.filter.state != previous_state
+            or self.filter.is_settling()
+            or self._last_value is None
+            or abs(sample - self._last_value) >= self.activity_delta
+        )
+        self._last_value = sample
+        self.samples_taken += 1
+        
+        if changed:
+            self.sample_interval_ms = self.min_interval_ms
         else:
-            print("Conceptual: No presence detected")
+            self.sample_interval_ms = min(self.sample_interval_ms * 2, self.max_interval_ms)
+    
+    def get_next_sample_ms(self):
+        """
+        Returns:
+            int: Milliseconds until is_present() should be called again
+        """
+        return self.sample_interval_ms
+    
+    def set_ambient_level(self, level):
+        """
+        Set the simulated ambient IR level (e.g. a desk lamp) for testing.
         
-        return presence_detected
+        Args:
+            level (int): ADC counts added to every reading
+        """
+        self._ambient_level = level
     
     def set_simulation_mode(self, mode):
         """
@@ -151,7 +450,7 @@ class PresenceSensor:
             self._simulation_mode = mode
             print(f"PresenceSensor: Simulation mode set to '{mode}'")
         else:
-            print(f"ERROR: Invalid simulation mode '{mode}'. Use 'presence', 'no_presence', or 'cycle'")
+            log.error("presence", "Invalid simulation mode '%s'. Use 'presence', 'no_presence', or 'cycle'", mode)
     
     def get_threshold(self):
         """
@@ -171,9 +470,10 @@ class PresenceSensor:
         """
         if 0 <= new_threshold <= 4095:
             self.presence_threshold = new_threshold
+            self.filter.set_threshold(new_threshold)
             print(f"PresenceSensor: Threshold updated to {new_threshold}")
         else:
-            print("ERROR: Threshold must be between 0 and 4095")
+            log.error("presence", "Threshold must be between 0 and 4095")
     
     def get_status(self):
         """
@@ -186,6 +486,11 @@ class PresenceSensor:
             'initialized': self.is_initialized,
             'adc_pin': self.adc_pin_number,
             'threshold': self.presence_threshold,
+            'filtered_value': self.filter.value,
+            'present': self.filter.state,
+            'sample_interval_ms': self.sample_interval_ms,
+            'samples_taken': self.samples_taken,
+            'emitter_pulses': self.emitter_pulses,
             'simulation_mode': self._simulation_mode
         }
 
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Text Layout Cache for StudyStreak ESP32 Project
+===============================================
+
+This module memoizes OLED text layout: truncation and centering of single
+lines, and word wrapping of message dialogs. The controller shows the same
+handful of fixed strings ("Work Complete!", "Break Over!", ...) over and over,
+so repeated text skips layout entirely and reuses the cached result. Lines
+that change every tick (the progress bar, the countdown footer) are laid out
+with layout_line() directly so they never push the fixed strings out.
+
+The cache is a bounded LRU keyed by (text, width, font). A hit costs one dict
+lookup; the least recently used entry is evicted only on a miss when the cache
+is full. Hit/miss counters are kept so the cache can be sized.
+
+Author: StudyStreak Project
+Version: 1.0
+"""
+
+from framebuffer import CHAR_WIDTH, FONT_NAME, text_width
+
+# Default number of cached layouts
+DEFAULT_MAX_ENTRIES = 24
+
+
+def wrap_words(text, max_chars):
+    """
+    Greedy word wrap.
+
+    Args:
+        text (str): Text to wrap
+        max_chars (int): Maximum characters per line
+
+    Returns:
+        list: Wrapped lines
+    """
+    lines = []
+    current_line = ""
+
+    for word in text.split():
+        if len(current_line + " " + word) <= max_chars:
+            if current_line:
+                current_line += " " + word
+            else:
+                current_line = word
+        else:
+            if current_line:
+                lines.append(current_line)
+            current_line = word
+
+    if current_line:
+        lines.append(current_line)
+
+    return lines
+
+
+def layout_line(text, width, center=False):
+    """
+    Lay out a single line: truncate to the width and optionally center it.
+
+    Args:
+        text (str): Line text
+        width (int): Available width in pixels
+        center (bool): Whether to center the text
+
+    Returns:
+        tuple: (text, display_text, x) where text is what gets drawn,
+               display_text is the space-padded console mirror and x is
+               the left pixel column
+    """
+    max_chars = width // CHAR_WIDTH
+    if len(text) > max_chars:
+        text = text[:max_chars - 3] + "..."
+
+    display_text = text
+    x = 0
+    if center and len(text) < max_chars:
+        padding = (max_chars - len(text)) // 2
+        display_text = " " * padding + text
+        x = (width - text_width(text)) // 2
+
+    return (text, display_text, x)
+
+
+class LayoutCache:
+    """
+    Bounded LRU cache of text layouts.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, font=FONT_NAME):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries (int): Maximum number of cached layouts
+            font (str): Font identifier included in every key
+        """
+        self.max_entries = max(1, max_entries)
+        self.font = font
+        self._entries = {}  # key -> [last_used, layout]
+        self._use_counter = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key):
+        """
+        Return the cached layout for key and mark it recently used.
+
+        Returns:
+            The layout, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._use_counter += 1
+        entry[0] = self._use_counter
+        return entry[1]
+
+    def _store(self, key, layout):
+        """
+        Cache a layout, evicting the least recently used entry if full.
+        """
+        if len(self._entries) >= self.max_entries:
+            oldest_key = None
+            oldest_use = None
+            for k, entry in self._entries.items():
+                if oldest_use is None or entry[0] < oldest_use:
+                    oldest_key = k
+                    oldest_use = entry[0]
+            del self._entries[oldest_key]
+            self.evictions += 1
+
+        self._use_counter += 1
+        self._entries[key] = [self._use_counter, layout]
+        return layout
+
+    def line(self, text, width, center=False):
+        """
+        Cached layout_line().
+
+        Args:
+            text (str): Line text
+            width (int): Available width in pixels
+            center (bool): Whether to center the text
+
+        Returns:
+            tuple: (text, display_text, x) as returned by layout_line()
+        """
+        key = (text, width, self.font, center)
+        layout = self._lookup(key)
+        if layout is not None:
+            return layout
+
+        return self._store(key, layout_line(text, width, center))
+
+    def message(self, title, message, width, max_lines=3):
+        """
+        Lay out a message dialog: title, underline and wrapped body lines.
+
+        Args:
+            title (str): Message title
+            message (str): Message content
+            width (int): Available width in pixels
+            max_lines (int): Maximum number of body lines
+
+        Returns:
+            tuple: (line_number, text) pairs to draw centered
+        """
+        key = ((title, message), width, self.font)
+        layout = self._lookup(key)
+        if layout is not None:
+            return layout
+
+        # Leave one character of margin, as the dialog has always done
+        wrapped = wrap_words(message, width // CHAR_WIDTH - 1)
+
+        lines = [(1, title), (2, "-" * len(title))]
+        for i, line in enumerate(wrapped[:max_lines]):
+            lines.append((4 + i, line))
+
+        return self._store(key, tuple(lines))
+
+    def clear(self):
+        """
+        Drop all cached layouts (counters are kept).
+        """
+        self._entries = {}
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: Cache size and hit/miss counters
+        """
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+# Example usage (commented out for module import)
+"""
+# Example of sizing the layout cache
+
+layouts = LayoutCache(max_entries=16)
+
+layouts.line("Work Complete!", 128, center=True)   # Miss: laid out and cached
+layouts.line("Work Complete!", 128, center=True)   # Hit: no layout work
+
+print(layouts.get_stats())
+"""
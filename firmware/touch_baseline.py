@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Adaptive Touch Baseline Tracking for StudyStreak ESP32 Project
+==============================================================
+
+This module tracks the untouched reading of every capacitive touch pin and
+derives its touch threshold automatically. Each pin keeps an exponential
+moving average of its idle readings and an exponentially weighted variance
+(Welford-style update), both in O(1) per sample. The threshold is
+
+    threshold = baseline - k * sigma
+
+so it follows slow drift from humidity and temperature, and widens on noisy
+pins instead of producing false touches. Calibration happens continuously in
+the background from the readings the touch task already takes.
+
+Readings below the current threshold (a finger on the pad) are not fed into
+the baseline, so a long touch does not pull the threshold down with it.
+
+Author: StudyStreak Project
+Environment: MicroPython for ESP32
+"""
+
+import math
+
+# Samples averaged with equal weight before switching to the slow EMA
+DEFAULT_WARMUP_SAMPLES = 32
+
+# EMA weight of each new idle sample (time constant of 1/alpha samples)
+DEFAULT_ALPHA = 1 / 128
+
+# Threshold distance below the baseline, in standard deviations
+DEFAULT_K_SIGMA = 4.0
+
+# Lower bound on sigma so a very quiet pin still gets a usable margin
+DEFAULT_MIN_SIGMA = 5.0
+
+
+class BaselineTracker:
+    """
+    Per-pin streaming baseline and variance with derived touch thresholds.
+    """
+
+    def __init__(self, pins, alpha=DEFAULT_ALPHA, k_sigma=DEFAULT_K_SIGMA,
+                 min_sigma=DEFAULT_MIN_SIGMA, warmup_samples=DEFAULT_WARMUP_SAMPLES):
+        """
+        Initialize empty statistics for each pin.
+
+        Args:
+            pins (list): Pins to track
+            alpha (float): EMA weight of each sample once warmed up
+            k_sigma (float): Threshold distance below the baseline in sigmas
+            min_sigma (float): Lower bound on the sigma used for the threshold
+            warmup_samples (int): Samples averaged equally before the EMA takes over
+        """
+        self.alpha = alpha
+        self.k_sigma = k_sigma
+        self.min_sigma = min_sigma
+        self.warmup_samples = max(1, warmup_samples)
+
+        self._slots = {}
+        for pin in pins:
+            if pin not in self._slots:
+                self._slots[pin] = len(self._slots)
+        count = len(self._slots)
+        self._mean = [0.0] * count
+        self._var = [0.0] * count
+        self._count = [0] * count
+        self._threshold = [0] * count
+
+    def add_sample(self, pin, value):
+        """
+        Fold one idle reading into the pin's statistics.
+
+        Args:
+            pin (int): Pin the reading came from
+            value (int): Raw touch reading
+
+        Returns:
+            bool: False if the pin is not tracked
+        """
+        slot = self._slots.get(pin)
+        if slot is None:
+            return False
+
+        n = self._count[slot]
+        if n < self.warmup_samples:
+            n += 1
+            self._count[slot] = n
+            weight = 1.0 / n
+        else:
+            weight = self.alpha
+
+        # Exponentially weighted Welford update of mean and variance
+        mean = self._mean[slot]
+        diff = value - mean
+        increment = weight * diff
+        mean += increment
+        self._mean[slot] = mean
+        var = (1.0 - weight) * (self._var[slot] + diff * increment)
+        self._var[slot] = var
+
+        sigma = math.sqrt(var)
+        if sigma < self.min_sigma:
+            sigma = self.min_sigma
+        self._threshold[slot] = int(mean - self.k_sigma * sigma)
+        return True
+
+    def is_ready(self, pin):
+        """
+        Args:
+            pin (int): Pin to check
+
+        Returns:
+            bool: True once the pin has seen enough samples for a threshold
+        """
+        slot = self._slots.get(pin)
+        return slot is not None and self._count[slot] >= self.warmup_samples
+
+    def get_threshold(self, pin):
+        """
+        Args:
+            pin (int): Pin to query
+
+        Returns:
+            int: Adaptive threshold, or None until the pin is warmed up
+        """
+        if not self.is_ready(pin):
+            return None
+        return self._threshold[self._slots[pin]]
+
+    def get_baseline(self, pin):
+        """
+        Args:
+            pin (int): Pin to query
+
+        Returns:
+            tuple: (baseline, sigma) of the idle readings, or None if untracked
+        """
+        slot = self._slots.get(pin)
+        if slot is None or self._count[slot] == 0:
+            return None
+        return (self._mean[slot], math.sqrt(self._var[slot]))
+
+    def reset(self, pin=None):
+        """
+        Restart learning for one pin, or for every pin.
+
+        Args:
+            pin (int): Pin to reset, or None for all pins
+        """
+        if pin is None:
+            slots = range(len(self._count))
+        elif pin in self._slots:
+            slots = (self._slots[pin],)
+        else:
+            return
+        for slot in slots:
+            self._mean[slot] = 0.0
+            self._var[slot] = 0.0
+            self._count[slot] = 0
+            self._threshold[slot] = 0
+
+
+# Example usage (commented out for module import)
+"""
+# Example of learning a pin's threshold from idle readings
+
+baseline = BaselineTracker([4])
+
+for value in (702, 695, 710, 698, 701):
+    baseline.add_sample(4, value)
+
+print(baseline.get_baseline(4))    # (mean, sigma)
+print(baseline.get_threshold(4))   # None until warmed up
+"""
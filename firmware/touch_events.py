@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Touch Edge Event Queue for StudyStreak ESP32 Project
+====================================================
+
+This module provides the queue between touch interrupt handlers and the
+controller. An ISR pushes one (pin, edge, timestamp) record per pin change
+into a preallocated ring buffer; the controller drains the buffer once per
+tick. Pushing never allocates, so it is safe from a hard interrupt.
+
+There is exactly one producer (the ISRs) and one consumer (the touch task):
+the producer only advances the tail and the consumer only advances the head,
+so no locking is needed. When the buffer is full new edges are dropped and
+counted rather than overwriting edges not yet processed.
+
+Author: StudyStreak Project
+Environment: MicroPython for ESP32
+"""
+
+# Edge directions
+EDGE_RELEASE = 0
+EDGE_PRESS = 1
+
+# Default number of edges buffered between drains
+DEFAULT_QUEUE_SIZE = 32
+
+
+class EdgeQueue:
+    """
+    Fixed-size single-producer/single-consumer ring buffer of touch edges.
+    """
+
+    def __init__(self, capacity=DEFAULT_QUEUE_SIZE):
+        """
+        Preallocate the ring buffer.
+
+        Args:
+            capacity (int): Maximum number of edges buffered between drains
+        """
+        # One slot stays empty to tell a full buffer from an empty one
+        self._size = max(2, capacity + 1)
+        self._pins = bytearray(self._size)
+        self._edges = bytearray(self._size)
+        self._ticks = [0] * self._size
+        self._head = 0
+        self._tail = 0
+        self.dropped = 0
+
+    def push(self, pin, edge, ticks_ms):
+        """
+        Append an edge. Safe to call from an interrupt handler.
+
+        Args:
+            pin (int): GPIO pin number
+            edge (int): EDGE_PRESS or EDGE_RELEASE
+            ticks_ms (int): Tick at which the edge was seen
+
+        Returns:
+            bool: False if the buffer was full and the edge was dropped
+        """
+        tail = self._tail
+        next_tail = tail + 1
+        if next_tail == self._size:
+            next_tail = 0
+        if next_tail == self._head:
+            self.dropped += 1
+            return False
+
+        self._pins[tail] = pin
+        self._edges[tail] = edge
+        self._ticks[tail] = ticks_ms
+        self._tail = next_tail
+        return True
+
+    def drain(self, handler):
+        """
+        Pass every buffered edge to handler, oldest first, and empty the buffer.
+
+        Args:
+            handler (callable): Called as handler(pin, edge, ticks_ms)
+
+        Returns:
+            int: Number of edges handled
+        """
+        handled = 0
+        head = self._head
+        while head != self._tail:
+            handler(self._pins[head], self._edges[head], self._ticks[head])
+            head += 1
+            if head == self._size:
+                head = 0
+            self._head = head
+            handled += 1
+        return handled
+
+    def __len__(self):
+        return (self._tail - self._head) % self._size
+
+    def clear(self):
+        """
+        Drop all buffered edges.
+        """
+        self._head = self._tail
+
+
+# Example usage (commented out for module import)
+"""
+# Example of feeding the queue from a pin interrupt
+
+from machine import Pin
+import utime
+
+events = EdgeQueue()
+
+def on_change(p):
+    events.push(4, EDGE_PRESS if p.value() else EDGE_RELEASE, utime.ticks_ms())
+
+Pin(4, Pin.IN).irq(on_change, trigger=Pin.IRQ_RISING | Pin.IRQ_FALLING)
+
+# Later, once per tick
+events.drain(lambda pin, edge, ticks_ms: print(pin, edge, ticks_ms))
+"""
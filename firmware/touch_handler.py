@@ -7,11 +7,32 @@ This module provides control for capacitive touch sensors on ESP32 for user inpu
 in the Pomodoro timer. The ESP32 has built-in capacitive touch sensors that can
 detect touch through various materials.
 
+Touch input can be polled (every pin read on every scan) or interrupt driven:
+pin-change ISRs push edges into a preallocated EdgeQueue which poll() drains
+once per tick, so input latency no longer depends on the scan period and an
+idle device does not read any pins. Only pins explicitly wired to a digital
+touch output get an interrupt; the rest, and every pin when pin interrupts
+are unavailable, are polled.
+
 Author: StudyStreak Project
 Version: 1.0
 """
 
-import time
+import random
+
+from clock import system_clock
+from logger import log, DEBUG
+from touch_events import EdgeQueue, EDGE_PRESS, EDGE_RELEASE, DEFAULT_QUEUE_SIZE
+from gestures import GestureRecognizer
+from touch_baseline import BaselineTracker
+
+try:
+    from machine import Pin
+except ImportError:
+    Pin = None
+
+# Logic level of a touch module's output while touched (e.g. TTP223)
+TOUCH_ACTIVE_LEVEL = 1
 
 
 class TouchHandler:
@@ -23,14 +44,19 @@ class TouchHandler:
     would use the ESP32's built-in touch sensor capabilities.
     """
     
-    def __init__(self, touch_pins=None, threshold=500):
+    def __init__(self, touch_pins=None, threshold=500, clock=None, event_queue_size=DEFAULT_QUEUE_SIZE):
         """
         Initialize the touch handler.
         
         Args:
             touch_pins (list): List of touch-capable GPIO pins (T0-T9 on ESP32)
-            threshold (int): Touch detection threshold (lower = more sensitive)
+            threshold (int): Default touch threshold (lower = more sensitive), used
+                             until a pin's adaptive baseline has warmed up
+            clock: Time source (SystemClock or VirtualClock), defaults to the system clock
+            event_queue_size (int): Edges buffered between drains in interrupt mode
         """
+        self.clock = clock if clock is not None else system_clock
+        
         # Default touch pins if none provided (common ESP32 touch pins)
         if touch_pins is None:
             touch_pins = [4, 2, 15, 13, 12, 14, 27, 33, 32, 32]  # T0-T9
@@ -39,6 +65,12 @@ class TouchHandler:
         self.threshold = threshold
         self.is_initialized = False
         
+        # Per-pin thresholds: a manual override, else the adaptive baseline
+        # (idle mean - k*sigma, learned continuously), else the default
+        self.baseline = BaselineTracker(touch_pins)
+        self.adaptive_thresholds = True
+        self._manual_thresholds = {}
+        
         # Touch state tracking
         self.touch_states = {pin: False for pin in touch_pins}
         self.last_touch_time = {pin: 0 for pin in touch_pins}
@@ -54,6 +86,22 @@ class TouchHandler:
         self.double_tap_window = 0.5   # seconds
         self.debounce_time = 0.05      # seconds
         
+        # Non-blocking gestures fed by the debounced edges of every pin
+        self.gestures = GestureRecognizer(
+            touch_pins,
+            clock=self.clock,
+            long_press_ms=int(self.long_press_duration * 1000),
+            double_tap_ms=int(self.double_tap_window * 1000)
+        )
+        
+        # Interrupt mode: ISRs push edges, poll() drains them once per tick;
+        # interrupt_mode is set once no pin is left to poll
+        self.events = EdgeQueue(event_queue_size)
+        self.interrupt_mode = False
+        self._irq_pins = {}
+        self._polled_pins = list(touch_pins)
+        self._on_edge = None
+        
         print(f"TouchHandler: Created with pins {self.touch_pins}")
         print(f"TouchHandler: Touch threshold set to {self.threshold}")
     
@@ -76,7 +124,7 @@ class TouchHandler:
             print(f"Conceptual: Setting threshold to {self.threshold}")
         
         # Simulate initialization delay
-        time.sleep(0.1)
+        self.clock.sleep(0.1)
         
         self.is_initialized = True
         print("Conceptual: Touch sensors initialized successfully")
@@ -93,11 +141,11 @@ class TouchHandler:
             int: Raw touch value (lower values indicate touch), or None if error
         """
         if not self.is_initialized:
-            print("ERROR: Touch handler not initialized! Call setup() first.")
+            log.error("touch", "Touch handler not initialized! Call setup() first.")
             return None
         
         if pin not in self.touch_pins:
-            print(f"ERROR: Pin {pin} is not configured for touch sensing")
+            log.error("touch", "Pin %d is not configured for touch sensing", pin)
             return None
         
         # Simulate touch reading based on simulation mode
@@ -116,14 +164,14 @@ class TouchHandler:
             touch_value = self.threshold + 200
         
         # Add some noise for realism
-        import random
         noise = random.randint(-20, 20)
         touch_value += noise
         
         # Ensure positive value
         touch_value = max(0, touch_value)
         
-        print(f"Conceptual: Touch pin T{pin} raw value: {touch_value}")
+        if log.level <= DEBUG:
+            log.debug("touch", "T%d raw value: %d", pin, touch_value)
         return touch_value
     
     def is_touched(self, pin):
@@ -137,24 +185,48 @@ class TouchHandler:
             bool: True if pin is touched, False otherwise
         """
         if not self.is_initialized:
-            print("ERROR: Touch handler not initialized! Call setup() first.")
+            log.error("touch", "Touch handler not initialized! Call setup() first.")
             return False
         
+        if pin in self._irq_pins:
+            # Interrupt-driven pin: the state is kept current from its edges
+            self.process_events()
+            return self.touch_states[pin]
+        
         touch_value = self.read_touch_value(pin)
         if touch_value is None:
             return False
         
         # Touch detected when value is below threshold
-        is_touch = touch_value < self.threshold
+        is_touch = touch_value < self.get_threshold(pin)
+        
+        # Idle readings keep the pin's baseline current (background calibration)
+        if not is_touch:
+            self.baseline.add_sample(pin, touch_value)
+        
+        return self._apply_touch(pin, is_touch, self.clock.ticks_ms())
+    
+    def _apply_touch(self, pin, is_touch, ticks_ms):
+        """
+        Debounce a raw touch reading or edge and fire the pin's callback.
         
-        current_time = time.time()
+        Args:
+            pin (int): GPIO pin number
+            is_touch (bool): Raw touch state
+            ticks_ms (int): Tick at which the state was observed
         
+        Returns:
+            bool: Debounced touch state of the pin
+        """
         # Debounce logic
         if is_touch and not self.touch_states[pin]:
-            if current_time - self.last_touch_time[pin] > self.debounce_time:
+            elapsed_ms = self.clock.ticks_diff(ticks_ms, self.last_touch_time[pin])
+            if elapsed_ms > self.debounce_time * 1000:
                 self.touch_states[pin] = True
-                self.last_touch_time[pin] = current_time
-                print(f"Conceptual: Touch DETECTED on pin T{pin}")
+                self.last_touch_time[pin] = ticks_ms
+                if log.level <= DEBUG:
+                    log.debug("touch", "Touch DETECTED on pin T%d", pin)
+                self.gestures.on_edge(pin, True, ticks_ms)
                 
                 # Call callback if registered
                 if pin in self.touch_callbacks:
@@ -164,7 +236,9 @@ class TouchHandler:
         
         elif not is_touch and self.touch_states[pin]:
             self.touch_states[pin] = False
-            print(f"Conceptual: Touch RELEASED on pin T{pin}")
+            if log.level <= DEBUG:
+                log.debug("touch", "Touch RELEASED on pin T%d", pin)
+            self.gestures.on_edge(pin, False, ticks_ms)
             
             # Call callback if registered
             if pin in self.touch_callbacks:
@@ -172,6 +246,182 @@ class TouchHandler:
         
         return self.touch_states[pin]
     
+    def enable_interrupts(self, irq_pins, on_edge=None):
+        """
+        Switch the given pins to interrupt-driven input.
+        
+        Only pins wired to a digital touch output (e.g. a TTP223 module,
+        high while touched) should be listed; each gets a pull-down so an
+        unplugged module reads idle, and a pin-change IRQ. The other touch
+        pins keep being polled by poll().
+        
+        Args:
+            irq_pins (list): Touch pins wired to a digital touch output
+            on_edge (callable): Optional ISR-safe function called with no
+                                arguments after each edge is queued, e.g. to
+                                wake the scheduler
+        
+        Returns:
+            bool: True if every touch pin is interrupt-driven, so nothing
+                  needs polling any more
+        """
+        if not self.is_initialized:
+            log.error("touch", "Touch handler not initialized! Call setup() first.")
+            return False
+        
+        if Pin is None:
+            log.info("touch", "Pin interrupts unavailable, polling touch pins")
+            return False
+        
+        self._on_edge = on_edge
+        for pin in irq_pins:
+            if pin not in self.touch_states:
+                log.warning("touch", "Pin %d is not a configured touch pin", pin)
+                continue
+            if pin in self._irq_pins:
+                continue
+            gpio = Pin(pin, Pin.IN, Pin.PULL_DOWN)
+            gpio.irq(handler=self._make_irq_handler(pin), trigger=Pin.IRQ_RISING | Pin.IRQ_FALLING)
+            self._irq_pins[pin] = gpio
+            self._polled_pins.remove(pin)
+        
+        self.interrupt_mode = not self._polled_pins
+        log.info("touch", "Interrupt-driven touch on %d pins, %d polled",
+                 len(self._irq_pins), len(self._polled_pins))
+        return self.interrupt_mode
+    
+    def is_polled_press_active(self):
+        """
+        Returns:
+            bool: True while a polled (not interrupt-driven) pin is touched,
+                  so its release is only seen by scanning
+        """
+        for pin in self._polled_pins:
+            if self.touch_states[pin]:
+                return True
+        return False
+    
+    def get_irq_pins(self):
+        """
+        Returns:
+            list: Touch pins that are interrupt-driven
+        """
+        return list(self._irq_pins)
+    
+    def sync_irq_pins(self):
+        """
+        Queue a press for each interrupt-driven pin that reads touched but is
+        not tracked as touched, e.g. after a touch woke the MCU from light
+        sleep before its edge interrupt could be taken.
+        """
+        for pin, gpio in self._irq_pins.items():
+            if gpio.value() == TOUCH_ACTIVE_LEVEL and not self.touch_states[pin]:
+                self.push_edge(pin, EDGE_PRESS)
+    
+    def disable_interrupts(self):
+        """
+        Detach the pin interrupts and fall back to polling.
+        """
+        for gpio in self._irq_pins.values():
+            gpio.irq(handler=None)
+        self._irq_pins = {}
+        self._polled_pins = list(self.touch_pins)
+        self.interrupt_mode = False
+        self.events.clear()
+    
+    def _make_irq_handler(self, pin):
+        """
+        Build the ISR for one pin; it only reads the level and queues an edge.
+        """
+        def handler(gpio):
+            edge = EDGE_PRESS if gpio.value() == TOUCH_ACTIVE_LEVEL else EDGE_RELEASE
+            self.push_edge(pin, edge)
+        return handler
+    
+    def push_edge(self, pin, edge, ticks_ms=None):
+        """
+        Queue a touch edge. Safe to call from an interrupt handler.
+        
+        Also used to inject edges when simulating interrupt-driven input.
+        
+        Args:
+            pin (int): GPIO pin number
+            edge (int): EDGE_PRESS or EDGE_RELEASE
+            ticks_ms (int): Tick of the edge, defaults to now
+        """
+        if ticks_ms is None:
+            ticks_ms = self.clock.ticks_ms()
+        self.events.push(pin, edge, ticks_ms)
+        if self._on_edge is not None:
+            self._on_edge()
+    
+    def process_events(self):
+        """
+        Drain queued edges, updating pin states and firing callbacks.
+        
+        Returns:
+            int: Number of edges processed
+        """
+        return self.events.drain(self._handle_edge)
+    
+    def _handle_edge(self, pin, edge, ticks_ms):
+        """
+        Apply one queued edge.
+        """
+        if pin in self.touch_states:
+            self._apply_touch(pin, edge == EDGE_PRESS, ticks_ms)
+    
+    def poll(self):
+        """
+        Service touch input once per tick.
+        
+        Queued edges of interrupt-driven pins are drained and the remaining
+        pins are scanned. Time-based gestures (long press, hold repeat, a tap
+        whose double-tap window closed) are emitted here as well.
+        
+        Returns:
+            list: Pins that are currently touched
+        """
+        if not self.is_initialized:
+            log.error("touch", "Touch handler not initialized! Call setup() first.")
+            return []
+        
+        # Also drains edges injected with push_edge() when simulating
+        self.process_events()
+        for pin in self._polled_pins:
+            self.is_touched(pin)
+        touched_pins = [pin for pin in self.touch_pins if self.touch_states[pin]]
+        
+        self.gestures.update()
+        return touched_pins
+    
+    def set_gesture_callback(self, callback, long_press_ms=None, double_tap_ms=None, repeat_ms=None):
+        """
+        Receive gestures recognized on any touch pin.
+        
+        Args:
+            callback (callable): Called as callback(gesture, pin) with one of
+                                 'tap', 'double_tap', 'long_press', 'hold_repeat'
+            long_press_ms (int): Hold time for a long press, or None to keep
+            double_tap_ms (int): Double-tap window (0 reports taps on release
+                                 without waiting), or None to keep
+            repeat_ms (int): Hold-repeat interval (0 disables), or None to keep
+        """
+        self.gestures.callback = callback
+        if long_press_ms is not None:
+            self.gestures.long_press_ms = long_press_ms
+        if double_tap_ms is not None:
+            self.gestures.double_tap_ms = double_tap_ms
+        if repeat_ms is not None:
+            self.gestures.repeat_ms = repeat_ms
+    
+    def get_ms_until_gesture(self):
+        """
+        Returns:
+            int: Milliseconds until a pending gesture needs poll() again, or None
+        """
+        return self.gestures.ms_until_deadline()
+    
     def scan_all_pins(self):
         """
         Scan all configured touch pins and return active touches.
@@ -180,7 +430,7 @@ class TouchHandler:
             list: List of pins that are currently touched
         """
         if not self.is_initialized:
-            print("ERROR: Touch handler not initialized! Call setup() first.")
+            log.error("touch", "Touch handler not initialized! Call setup() first.")
             return []
         
         touched_pins = []
@@ -202,10 +452,10 @@ class TouchHandler:
             int: Pin number that was touched, or None if timeout
         """
         if not self.is_initialized:
-            print("ERROR: Touch handler not initialized! Call setup() first.")
+            log.error("touch", "Touch handler not initialized! Call setup() first.")
             return None
         
-        start_time = time.time()
+        start_time_ms = self.clock.ticks_ms()
         print(f"Conceptual: Waiting for touch on {'pin T' + str(pin) if pin else 'any pin'}...")
         
         while True:
@@ -220,16 +470,18 @@ class TouchHandler:
                     return touched_pins[0]
             
             # Check timeout
-            if timeout and (time.time() - start_time) > timeout:
+            if timeout and self.clock.ticks_diff(self.clock.ticks_ms(), start_time_ms) > timeout * 1000:
                 print("Conceptual: Touch wait timeout")
                 return None
             
-            time.sleep(0.01)  # Small delay to prevent busy waiting
+            self.clock.sleep(0.01)  # Small delay to prevent busy waiting
     
     def detect_long_press(self, pin, duration=None):
         """
         Detect a long press on a specific pin.
         
+        Blocks while the pin is held; the main loop uses set_gesture_callback().
+        
         Args:
             pin (int): GPIO pin to monitor
             duration (float): Minimum press duration, or None for default
@@ -243,14 +495,14 @@ class TouchHandler:
         if not self.is_touched(pin):
             return False
         
-        press_start = time.time()
+        press_start_ms = self.clock.ticks_ms()
         print(f"Conceptual: Monitoring for long press on pin T{pin}...")
         
         while self.is_touched(pin):
-            if (time.time() - press_start) >= duration:
+            if self.clock.ticks_diff(self.clock.ticks_ms(), press_start_ms) >= duration * 1000:
                 print(f"Conceptual: Long press detected on pin T{pin} ({duration}s)")
                 return True
-            time.sleep(0.01)
+            self.clock.sleep(0.01)
         
         return False
     
@@ -258,6 +510,8 @@ class TouchHandler:
         """
         Detect a double tap on a specific pin.
         
+        Blocks for up to the tap window; the main loop uses set_gesture_callback().
+        
         Args:
             pin (int): GPIO pin to monitor
             window (float): Maximum time between taps, or None for default
@@ -274,16 +528,16 @@ class TouchHandler:
         
         # Wait for release
         while self.is_touched(pin):
-            time.sleep(0.01)
+            self.clock.sleep(0.01)
         
-        first_tap_time = time.time()
+        first_tap_time_ms = self.clock.ticks_ms()
         
         # Wait for second tap within window
-        while (time.time() - first_tap_time) < window:
+        while self.clock.ticks_diff(self.clock.ticks_ms(), first_tap_time_ms) < window * 1000:
             if self.is_touched(pin):
                 print(f"Conceptual: Double tap detected on pin T{pin}")
                 return True
-            time.sleep(0.01)
+            self.clock.sleep(0.01)
         
         return False
     
@@ -297,7 +551,7 @@ class TouchHandler:
                                     (event_type, pin) -> None
         """
         if pin not in self.touch_pins:
-            print(f"ERROR: Pin {pin} is not configured for touch sensing")
+            log.error("touch", "Pin %d is not configured for touch sensing", pin)
             return False
         
         self.touch_callbacks[pin] = callback_func
@@ -317,21 +571,49 @@ class TouchHandler:
             return True
         return False
     
+    def get_threshold(self, pin):
+        """
+        Get the touch threshold currently applied to a pin.
+        
+        Args:
+            pin (int): GPIO pin to query
+        
+        Returns:
+            int: Manual threshold if set, else the adaptive threshold once the
+                 pin's baseline has warmed up, else the default threshold
+        """
+        threshold = self._manual_thresholds.get(pin)
+        if threshold is not None:
+            return threshold
+        
+        if self.adaptive_thresholds:
+            threshold = self.baseline.get_threshold(pin)
+            if threshold is not None:
+                return threshold
+        
+        return self.threshold
+    
     def set_threshold(self, pin, threshold):
         """
         Set touch threshold for a specific pin.
         
+        A manual threshold overrides the pin's adaptive threshold; pass None
+        to return the pin to adaptive tracking.
+        
         Args:
             pin (int): GPIO pin to configure
-            threshold (int): New threshold value
+            threshold (int): New threshold value, or None for adaptive
         """
         if pin not in self.touch_pins:
-            print(f"ERROR: Pin {pin} is not configured for touch sensing")
+            log.error("touch", "Pin %d is not configured for touch sensing", pin)
             return False
         
-        # For simplicity, we use global threshold in this conceptual implementation
-        self.threshold = threshold
-        print(f"TouchHandler: Threshold for pin T{pin} set to {threshold}")
+        if threshold is None:
+            self._manual_thresholds.pop(pin, None)
+            print(f"TouchHandler: Threshold for pin T{pin} is adaptive")
+        else:
+            self._manual_thresholds[pin] = threshold
+            print(f"TouchHandler: Threshold for pin T{pin} set to {threshold}")
         return True
     
     def set_simulation_mode(self, mode, pin=None):
@@ -348,47 +630,43 @@ class TouchHandler:
                 self._simulation_pin = pin
             print(f"TouchHandler: Simulation mode set to '{mode}' on pin T{self._simulation_pin}")
         else:
-            print(f"ERROR: Invalid simulation mode '{mode}'. Use 'idle', 'touch', or 'cycle'")
+            log.error("touch", "Invalid simulation mode '%s'. Use 'idle', 'touch', or 'cycle'", mode)
     
     def calibrate_pin(self, pin, samples=10):
         """
         Calibrate touch threshold for a specific pin.
         
+        Calibration runs continuously in the background from every idle
+        reading; this only folds in a few extra readings right away (without
+        sleeping) and returns the pin's current adaptive threshold.
+        
         Args:
             pin (int): GPIO pin to calibrate
-            samples (int): Number of samples to take for calibration
+            samples (int): Number of extra readings to take now
         
         Returns:
-            int: Suggested threshold value
+            int: Suggested threshold value, or None if the pin is not yet warmed up
         """
         if not self.is_initialized:
-            print("ERROR: Touch handler not initialized! Call setup() first.")
+            log.error("touch", "Touch handler not initialized! Call setup() first.")
             return None
         
         if pin not in self.touch_pins:
-            print(f"ERROR: Pin {pin} is not configured for touch sensing")
+            log.error("touch", "Pin %d is not configured for touch sensing", pin)
             return None
         
-        print(f"Conceptual: Calibrating pin T{pin} with {samples} samples...")
-        print("Conceptual: Make sure pin is not being touched during calibration")
-        
-        readings = []
         for i in range(samples):
             value = self.read_touch_value(pin)
-            if value is not None:
-                readings.append(value)
-            time.sleep(0.1)
+            if value is not None and value >= self.get_threshold(pin):
+                self.baseline.add_sample(pin, value)
         
-        if readings:
-            avg_value = sum(readings) / len(readings)
-            suggested_threshold = int(avg_value * 0.8)  # 80% of untouched value
-            
-            print(f"Conceptual: Average untouched value: {avg_value:.1f}")
-            print(f"Conceptual: Suggested threshold: {suggested_threshold}")
-            
-            return suggested_threshold
+        stats = self.baseline.get_baseline(pin)
+        suggested_threshold = self.baseline.get_threshold(pin)
+        if stats is not None:
+            log.info("touch", "T%d baseline %.1f sigma %.1f, threshold %s",
+                     pin, stats[0], stats[1], suggested_threshold)
         
-        return None
+        return suggested_threshold
     
     def get_status(self):
         """
@@ -401,7 +679,11 @@ class TouchHandler:
             'initialized': self.is_initialized,
             'touch_pins': self.touch_pins,
             'threshold': self.threshold,
+            'thresholds': {pin: self.get_threshold(pin) for pin in self.touch_pins},
             'touch_states': self.touch_states.copy(),
+            'interrupt_mode': self.interrupt_mode,
+            'events_queued': len(self.events),
+            'events_dropped': self.events.dropped,
             'simulation_mode': self._simulation_mode,
             'simulation_pin': self._simulation_pin,
             'callbacks_registered': list(self.touch_callbacks.keys())